@@ -1,16 +1,74 @@
+import time
+IMPORT_START = time.perf_counter()
+
 import pygame
+import argparse
+import hashlib
+import json
+import os
 import random
+import struct
 import sys
 import math
-import struct
+from array import array
+from collections import OrderedDict, deque
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import content
+from scores import ScoreStore, SessionStats
+from engine import (GameState, RushState, NewRound, Tick, Drop, Pick, MoveItem, CONTENT, TRASH_TYPES, BIN_LAYOUT,
+                    BIN_SIZE, RUSH_BIN_LAYOUT, RUSH_BIN_SCALE, ITEM_SIZE, STEP)
+
+# --- จับเวลาช่วงเปิดเกม (ดูผลด้วย --startup-report) ---
+class StartupTimer:
+    def __init__(self, start):
+        self.start = self.last = start
+        self.phases = []
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
 
-pygame.init()
-pygame.mixer.init(frequency=44100, size=-16, channels=1, buffer=512)
+    def report(self):
+        lines = [f"{name:28s} {dt * 1000:8.1f} ms" for name, dt in self.phases]
+        lines.append(f"{'total':28s} {(self.last - self.start) * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+STARTUP = StartupTimer(IMPORT_START)
+STARTUP.mark("import pygame/numpy")
+
+pygame.mixer.pre_init(frequency=44100, size=-16, channels=1, buffer=512)
 
 # --- การตั้งค่าหน้าจอ (ปรับขยายใหญ่ขึ้น) ---
 WIDTH, HEIGHT = 1024, 720
-SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Eco Hero: Ultra Thai Edition")
+SCREEN = None
+DISPLAY_MODES = ["window", "scaled", "fullscreen"]
+DISPLAY_MODE = "window"
+
+def init_display(size=(WIDTH, HEIGHT), mode="window", smooth=False):
+    # เปิดหน้าจอตอนเริ่มเกมจริง (ไม่ใช่ตอน import) ให้โปรแกรมอื่นนำโมดูลไปใช้ได้เร็ว
+    # scaled/fullscreen: เกมยังวาดที่ WIDTH x HEIGHT เสมอ (ต้นทุนต่อพิกเซลเท่าเดิม) แล้วให้ SDL ขยายเป็น texture ขึ้นจอ
+    # scaled = หน้าต่างขยายเป็นจำนวนเท่าที่ใหญ่ที่สุดที่พอดีจอ, fullscreen = เต็มจอ (เว้นขอบดำตามสัดส่วน)
+    # pygame แปลงตำแหน่งเมาส์ใน event กลับเป็นพิกัดของเกมให้เอง การลาก-วางจึงไม่ต้องแก้
+    global SCREEN, DISPLAY_MODE
+    if smooth: os.environ['SDL_RENDER_SCALE_QUALITY'] = 'linear'  # ค่าเริ่มต้น nearest: คมแต่ขอบหยักเมื่อขยายไม่ลงตัว
+    pygame.display.init()
+    pygame.font.init()
+    flags = {"window": 0, "scaled": pygame.SCALED, "fullscreen": pygame.SCALED | pygame.FULLSCREEN}[mode]
+    try:
+        SCREEN = pygame.display.set_mode(size, flags)
+    except pygame.error as e:
+        # ไดรเวอร์จอบางเครื่องสร้าง renderer ไม่ได้: เปิดหน้าต่างขนาดปกติแทน
+        print(f"{mode} display unavailable ({e}), using a normal window", file=sys.stderr)
+        SCREEN, mode = pygame.display.set_mode(size), "window"
+    DISPLAY_MODE = mode
+    pygame.display.set_caption("Eco Hero: Ultra Thai Edition")
+    return SCREEN
 
 # --- สี ---
 WHITE, OFF_WHITE, BLACK = (255, 255, 255), (240, 240, 245), (15, 15, 25)
@@ -18,71 +76,213 @@ SHADOW = (0, 0, 0, 60)
 SKY_TOP, SKY_BOTTOM = (10, 45, 60), (50, 120, 150)
 GRASS_DEEP, GRASS_LIGHT, GOLD = (15, 45, 15), (40, 95, 40), (255, 215, 0)
 
-# ถังขยะ
-BIN_COLORS = {
-    'organic': {'base': (76, 175, 80), 'light': (165, 214, 167), 'dark': (35, 90, 35), 'glow': (100, 255, 100), 'icon': (50, 120, 50)},
-    'recycle': {'base': (255, 193, 7), 'light': (255, 235, 150), 'dark': (180, 130, 0), 'glow': (255, 255, 150), 'icon': (150, 110, 0)},
-    'general': {'base': (33, 150, 243), 'light': (144, 202, 249), 'dark': (15, 80, 160), 'glow': (150, 200, 255), 'icon': (10, 60, 140)},
-    'hazardous': {'base': (244, 67, 54), 'light': (239, 154, 154), 'dark': (183, 28, 28), 'glow': (255, 100, 100), 'icon': (130, 10, 10)}
-}
+# ถังขยะ (base/light/dark/glow/icon ต่อประเภท จาก content pack)
+BIN_COLORS = CONTENT.bin_colors
 
-# ขยะประเภทต่างๆ
-TRASH_TYPES = [
-    ("ขวดพลาสติก", "recycle", (200, 240, 255), "bottle"),
-    ("กระป๋องโคล่า", "recycle", (220, 50, 50), "can"),
-    ("แก้วน้ำเย็น", "recycle", (230, 245, 255, 150), "cup"), 
-    ("แกนแอปเปิ้ล", "organic", (230, 80, 80), "food_waste"),
-    ("ใบไม้แห้ง", "organic", (160, 100, 40), "leaf"),
-    ("เปลือกกล้วย", "organic", (255, 220, 40), "banana"),
-    ("ซองมันฝรั่ง", "general", (255, 140, 50), "bag"),
-    ("กล่องโฟม", "general", (245, 245, 250), "foam"),
-    ("ทิชชู่ยับๆ", "general", (220, 220, 220), "tissue"),
-    ("ถ่านไฟฉาย", "hazardous", (50, 50, 50), "battery"),
-    ("หลอดไฟ", "hazardous", (255, 255, 255), "lightbulb")
-]
+
+# --- โฟลเดอร์แคช (เก็บไฟล์ที่สร้างครั้งแรกไว้ใช้รอบถัดไป) ---
+def get_cache_dir(*parts):
+    base = (os.environ.get('ECO_HERO_CACHE_DIR') or os.environ.get('LOCALAPPDATA')
+            or os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'))
+    path = os.path.join(base, 'eco_hero', *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
 
 # --- ระบบเสียงสังเคราะห์ ---
-def create_sound(frequency, duration, volume=0.1, type='sine'):
-    sample_rate = 44100
-    n_samples = int(sample_rate * duration)
-    samples = []
-    for i in range(n_samples):
-        t = i / sample_rate
-        if type == 'sine': val = math.sin(2.0 * math.pi * frequency * t)
-        elif type == 'square': val = 1.0 if math.sin(2.0 * math.pi * frequency * t) > 0 else -1.0
-        else: val = random.uniform(-1, 1)
-        envelope = (n_samples - i) / n_samples
-        samples.append(int(val * 32767 * volume * envelope))
-    return pygame.mixer.Sound(buffer=struct.pack('<' + ('h' * len(samples)), *samples))
-
-try: 
-    snd_correct = create_sound(880, 0.3)
-    snd_wrong = create_sound(110, 0.4, type='square')
-    snd_drag = create_sound(660, 0.05, 0.02)
-except: 
-    snd_correct = snd_wrong = snd_drag = None
-
-# --- ฟอนต์ระบบ ---
-def get_thai_font(size):
-    font_names = ['tahoma', 'leelawadee', 'thonburi', 'notosans']
-    matched = pygame.font.match_font(','.join(font_names))
-    return pygame.font.Font(matched, size) if matched else pygame.font.Font(None, size)
-
-font_xl = get_thai_font(90)
-font_lg = get_thai_font(55)
-font_md = get_thai_font(32)
-font_sm = get_thai_font(24)
-font_tiny = get_thai_font(18)
+SAMPLE_RATE = 44100
+SOUND_CACHE_VERSION = 1
+
+def _envelope_at(i, n, a, d, s, r):
+    if i < a: return i / a
+    if i < a + d: return 1 - (1 - s) * (i - a) / d
+    if i < n - r: return s
+    return s * (n - i) / r
+
+def synthesize(frequency, duration, volume=0.1, type='sine', adsr=None, sample_rate=SAMPLE_RATE, seed=0):
+    # คืนค่า PCM 16-bit mono (bytes) | adsr = (attack, decay, sustain, release) หน่วยวินาที
+    # ค่าเริ่มต้นคือเสียงค่อยๆ เบาลงแบบเส้นตรงตลอดความยาวเสียง
+    n = int(sample_rate * duration)
+    attack, decay, sustain, release = adsr if adsr else (0, duration, 0.0, 0)
+    a, d, r = int(attack * sample_rate), int(decay * sample_rate), int(release * sample_rate)
+    a, d = min(a, n), min(d, n - min(a, n))
+    r = min(r, n - a - d)
+    amp = 32767 * volume
+    if np is not None:
+        t = np.arange(n) / sample_rate
+        if type == 'sine': wave = np.sin(2.0 * math.pi * frequency * t)
+        elif type == 'square': wave = np.where(np.sin(2.0 * math.pi * frequency * t) > 0, 1.0, -1.0)
+        elif type == 'saw': wave = 2.0 * ((frequency * t) % 1.0) - 1.0
+        elif type == 'noise': wave = np.random.default_rng(seed).uniform(-1, 1, n)
+        else: raise ValueError(f"unknown waveform: {type}")
+        i = np.arange(n)
+        env = np.full(n, float(sustain))
+        if a: env[:a] = i[:a] / a
+        if d: env[a:a+d] = 1 - (1 - sustain) * (i[a:a+d] - a) / d
+        if r: env[n-r:] = sustain * (n - i[n-r:]) / r
+        return (wave * amp * env).astype('<i2').tobytes()
+
+    rng = random.Random(seed)
+    two_pi_f = 2.0 * math.pi * frequency
+    if type == 'sine': wave = lambda t: math.sin(two_pi_f * t)
+    elif type == 'square': wave = lambda t: 1.0 if math.sin(two_pi_f * t) > 0 else -1.0
+    elif type == 'saw': wave = lambda t: 2.0 * ((frequency * t) % 1.0) - 1.0
+    elif type == 'noise': wave = lambda t: rng.uniform(-1, 1)
+    else: raise ValueError(f"unknown waveform: {type}")
+    samples = array('h', (int(wave(i / sample_rate) * amp * _envelope_at(i, n, a, d, sustain, r)) for i in range(n)))
+    if sys.byteorder != 'little': samples.byteswap()
+    return samples.tobytes()
+
+def create_sound(frequency, duration, volume=0.1, type='sine', adsr=None, use_cache=True):
+    mixer_format = pygame.mixer.get_init()
+    sample_rate = mixer_format[0] if mixer_format else SAMPLE_RATE
+    params = (SOUND_CACHE_VERSION, mixer_format, frequency, duration, volume, type, adsr and tuple(adsr))
+    key = hashlib.sha1(repr(params).encode()).hexdigest()
+    path = pcm = None
+    if use_cache:
+        try:
+            path = os.path.join(get_cache_dir('sounds'), key + '.pcm')
+            if os.path.exists(path):
+                with open(path, 'rb') as f: pcm = f.read()
+        except OSError:
+            pass  # อ่านแคชไม่ได้: สังเคราะห์ใหม่
+    if pcm is None:
+        pcm = synthesize(frequency, duration, volume, type, adsr, sample_rate, seed=int(key[:8], 16))
+        if path:
+            try:
+                content.atomic_write(path, lambda f: f.write(pcm))
+            except OSError:
+                pass  # เขียนแคชไม่ได้: ใช้เสียงที่เพิ่งสังเคราะห์ไปก่อน
+    return pygame.mixer.Sound(buffer=pcm)
+
+# --- ตัวจัดการ asset: ฟอนต์และเสียงสร้างเมื่อใช้ครั้งแรก ---
+FONT_NAMES = ['tahoma', 'leelawadee', 'thonburi', 'notosans']
+FONT_SIZES = {'xl': 90, 'lg': 55, 'md': 32, 'sm': 24, 'tiny': 18}
+SOUND_SPECS = {
+    'correct': dict(frequency=880, duration=0.3),
+    'wrong': dict(frequency=110, duration=0.4, type='square'),
+    'drag': dict(frequency=660, duration=0.05, volume=0.02),
+}
+
+class Assets:
+    def __init__(self):
+        self.fonts, self.sounds = {}, {}
+        self.font_file, self.font_resolved = None, False
+        self.audio_ok = None
+
+    def resolve_font_file(self):
+        # match_font ต้องไล่รายชื่อฟอนต์ทั้งเครื่อง (ช้า) จึงค้นครั้งเดียวแล้วจำ path ไว้ในไฟล์แคช
+        if self.font_resolved: return self.font_file
+        cache_path = None
+        try:
+            cache_path = os.path.join(get_cache_dir(), 'font.json')
+            with open(cache_path, encoding='utf-8') as f: cached = json.load(f)
+            if cached.get('names') == FONT_NAMES and os.path.exists(cached.get('path') or ''):
+                self.font_file = cached['path']
+        except (OSError, ValueError):
+            pass
+        if self.font_file is None:
+            self.font_file = pygame.font.match_font(','.join(FONT_NAMES))
+            if self.font_file and cache_path:
+                try:
+                    content.atomic_write(cache_path, lambda f: json.dump({'names': FONT_NAMES, 'path': self.font_file}, f), 'w')
+                except OSError:
+                    pass  # แคชเขียนไม่ได้: ครั้งหน้าค้นฟอนต์ใหม่
+        self.font_resolved = True
+        return self.font_file
+
+    def font(self, name):
+        size = FONT_SIZES.get(name, name)
+        if size not in self.fonts:
+            if not pygame.font.get_init(): pygame.font.init()
+            path = self.resolve_font_file()
+            self.fonts[size] = pygame.font.Font(path, size) if path else pygame.font.Font(None, size)
+        return self.fonts[size]
+
+    def sound(self, name):
+        if name not in self.sounds:
+            try:
+                if not pygame.mixer.get_init(): pygame.mixer.init()
+                self.sounds[name] = create_sound(**SOUND_SPECS[name])  # แคชเสียงใช้ไม่ได้ create_sound ก็สังเคราะห์ใหม่เอง
+            except pygame.error:
+                self.sounds[name] = None
+        return self.sounds[name]
+
+    def play(self, name):
+        snd = self.sound(name)
+        if snd: snd.play()
+
+    def preload_sounds(self):
+        for name in SOUND_SPECS: self.sound(name)
+
+ASSETS = Assets()
+
+# --- แคชข้อความที่เรนเดอร์แล้ว (LRU) เพราะการจัดรูปอักษรไทยช้า ---
+class TextCache:
+    def __init__(self, max_size=512):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, text, font, color):
+        key = (text, font, tuple(color))
+        surf = self.entries.get(key)
+        if surf is None:
+            self.misses += 1
+            surf = font.render(text, True, color)
+            self.entries[key] = surf
+            if len(self.entries) > self.max_size: self.entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return surf
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'size': len(self.entries), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0}
+
+TEXT_CACHE = TextCache()
+
+def render_text(text, font, color):
+    return TEXT_CACHE.get(text, font, color)
 
 # --- Helper Functions ---
 def draw_text_with_shadow(surface, text, font, color, pos_center, shadow_offset=(2,2)):
-    shadow_surf = font.render(text, True, SHADOW)
-    surface.blit(shadow_surf, shadow_surf.get_rect(center=(pos_center[0]+shadow_offset[0], pos_center[1]+shadow_offset[1])))
-    text_surf = font.render(text, True, color)
-    surface.blit(text_surf, text_surf.get_rect(center=pos_center))
+    shadow_surf = render_text(text, font, SHADOW)
+    shadow_rect = surface.blit(shadow_surf, shadow_surf.get_rect(center=(pos_center[0]+shadow_offset[0], pos_center[1]+shadow_offset[1])))
+    text_surf = render_text(text, font, color)
+    return shadow_rect.union(surface.blit(text_surf, text_surf.get_rect(center=pos_center)))
 
+def draw_number_with_shadow(surface, prefix, value, font, color, pos_center, shadow_offset=(2,2)):
+    # ข้อความที่เปลี่ยนบ่อย เช่น "คะแนน: 120" ประกอบจากคำนำหน้า + ตัวเลขทีละหลักที่แคชไว้
+    # คะแนนเปลี่ยนก็ไม่ต้องจัดรูปข้อความไทยทั้งบรรทัดใหม่
+    pieces = [prefix] + list(str(value))
+    text_surfs = [render_text(p, font, color) for p in pieces]
+    shadow_surfs = [render_text(p, font, SHADOW) for p in pieces]
+    width = sum(s.get_width() for s in text_surfs)
+    height = max(s.get_height() for s in text_surfs)
+    x, y = pos_center[0] - width // 2, pos_center[1] - height // 2
+    dirty = pygame.Rect(x, y, width, height).union((x+shadow_offset[0], y+shadow_offset[1], width, height))
+    for surfs, (ox, oy) in ((shadow_surfs, shadow_offset), (text_surfs, (0, 0))):
+        px = x + ox
+        for s in surfs:
+            surface.blit(s, (px, y + oy))
+            px += s.get_width()
+    return dirty.clip(surface.get_rect())
+
+# ปุ่ม/กล่องขอบนูน วาดครั้งเดียวต่อ (ขนาด, สี, ความโค้ง, ความหนาขอบ) แล้ว blit ซ้ำ
+BEVEL_CACHE = {}
 def draw_beveled_rect(surface, rect, color, radius=15, bevel=5):
-    pygame.draw.rect(surface, color, rect, border_radius=radius)
+    rect = pygame.Rect(rect)
+    cache_key = (rect.size, tuple(color), radius, bevel)
+    if cache_key not in BEVEL_CACHE:
+        surf = pygame.Surface(rect.size, pygame.SRCALPHA)
+        render_beveled_rect(surf, pygame.Rect((0, 0), rect.size), color, radius, bevel)
+        BEVEL_CACHE[cache_key] = optimize_surf(surf, True)
+    return surface.blit(BEVEL_CACHE[cache_key], rect)
+
+def render_beveled_rect(surface, rect, color, radius=15, bevel=5):
+    dirty = pygame.draw.rect(surface, color, rect, border_radius=radius)
     hl = [min(c + 40, 255) for c in color]
     sh = [max(c - 40, 0) for c in color]
     pygame.draw.rect(surface, hl, (rect.x, rect.y, rect.width, bevel), border_top_left_radius=radius, border_top_right_radius=radius)
@@ -90,28 +290,135 @@ def draw_beveled_rect(surface, rect, color, radius=15, bevel=5):
     pygame.draw.rect(surface, sh, (rect.x, rect.bottom-bevel, rect.width, bevel), border_bottom_left_radius=radius, border_bottom_right_radius=radius)
     pygame.draw.rect(surface, sh, (rect.right-bevel, rect.y, bevel, rect.height), border_top_right_radius=radius, border_bottom_right_radius=radius)
     pygame.draw.rect(surface, color, (rect.x+bevel, rect.y+bevel, rect.width-bevel*2, rect.height-bevel*2), border_radius=max(0, radius-bevel))
+    return dirty
+
+def optimize_surf(surf, alpha=False):
+    # แปลงฟอร์แมตให้ตรงกับจอเพื่อให้ blit เร็วขึ้น (ทำได้เมื่อเปิดหน้าจอแล้วเท่านั้น)
+    if not pygame.display.get_surface(): return surf
+    return surf.convert_alpha() if alpha else surf.convert()
+
+# --- ระบบอนุภาค (เก็บข้อมูลเป็นอาร์เรย์ขนาน อัปเดตทีเดียวทั้งชุด) ---
+PARTICLE_SPRITES = {}
+def get_particle_sprite(diameter, color, alpha):
+    cache_key = (diameter, color, alpha)
+    if cache_key not in PARTICLE_SPRITES:
+        s = pygame.Surface((diameter, diameter), pygame.SRCALPHA)
+        pygame.draw.circle(s, (*color, alpha), (diameter // 2, diameter // 2), diameter // 2)
+        PARTICLE_SPRITES[cache_key] = s
+    return PARTICLE_SPRITES[cache_key]
+
+class ParticleSystem:
+    # แถวของข้อมูล: ตำแหน่ง, ความเร็ว, อายุ (ใช้เป็นค่า alpha), ขนาด, ลำดับสีใน palette,
+    # ตำแหน่งใน step ก่อนหน้า (ใช้ interpolate ตอนวาด)
+    X, Y, VX, VY, LIFE, SIZE, COLOR, PX, PY = range(9)
+    ROWS = 9
+    ALPHA_STEP = 8
+
+    def __init__(self, capacity=256):
+        self.count = 0
+        self.palette, self.palette_index = [], {}
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        if np is not None:
+            data = np.zeros((self.ROWS, capacity))
+            if self.count: data[:, :self.count] = self.data[:, :self.count]
+        else:
+            data = [array('d', [0.0]) * capacity for _ in range(self.ROWS)]
+            if self.count:
+                for row, old in zip(data, self.data): row[:self.count] = old[:self.count]
+        self.data, self.capacity = data, capacity
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def emit(self, x, y, color, amount=25):
+        if color not in self.palette_index:
+            self.palette_index[color] = len(self.palette)
+            self.palette.append(color)
+        if self.count + amount > self.capacity:
+            self._alloc(max(self.capacity * 2, self.count + amount))
+        d, c_idx = self.data, self.palette_index[color]
+        for i in range(self.count, self.count + amount):
+            angle = random.uniform(0, math.pi * 2)
+            speed = random.uniform(3, 8)
+            d[self.X][i], d[self.Y][i] = d[self.PX][i], d[self.PY][i] = x, y
+            d[self.VX][i], d[self.VY][i] = math.cos(angle) * speed, math.sin(angle) * speed
+            d[self.LIFE][i], d[self.SIZE][i], d[self.COLOR][i] = 255, random.randint(6, 12), c_idx
+        self.count += amount
 
-class Particle:
-    def __init__(self, x, y, color):
-        self.x, self.y, self.color = x, y, color
-        angle = random.uniform(0, math.pi * 2)
-        speed = random.uniform(3, 8)
-        self.vx, self.vy = math.cos(angle) * speed, math.sin(angle) * speed
-        self.life, self.size = 255, random.randint(6, 12)
-        
     def update(self):
-        self.vx *= 0.95
-        self.vy += 0.2
-        self.x += self.vx
-        self.y += self.vy
-        self.life -= 8
-        self.size *= 0.95
-        
-    def draw(self, surface):
-        if self.life > 0 and self.size > 1:
-            s = pygame.Surface((int(self.size*2), int(self.size*2)), pygame.SRCALPHA)
-            pygame.draw.circle(s, (*self.color, self.life), (int(self.size), int(self.size)), int(self.size))
-            surface.blit(s, (self.x-self.size, self.y-self.size))
+        # 1 ครั้ง = 1 simulation step (STEP วินาที)
+        n, d = self.count, self.data
+        if not n: return
+        if np is not None:
+            d[self.PX, :n] = d[self.X, :n]
+            d[self.PY, :n] = d[self.Y, :n]
+            d[self.VX, :n] *= 0.95
+            d[self.VY, :n] += 0.2
+            d[self.X, :n] += d[self.VX, :n]
+            d[self.Y, :n] += d[self.VY, :n]
+            d[self.LIFE, :n] -= 8
+            d[self.SIZE, :n] *= 0.95
+            dead = np.flatnonzero(d[self.LIFE, :n] <= 0)
+            if dead.size:
+                # swap-remove: ย้ายตัวที่ยังมีชีวิตจากท้ายอาร์เรย์มาเติมช่องว่าง
+                new_n = n - dead.size
+                holes = dead[dead < new_n]
+                donors = np.flatnonzero(d[self.LIFE, new_n:n] > 0) + new_n
+                d[:, holes] = d[:, donors]
+                self.count = new_n
+        else:
+            x, y, vx, vy, life, size, _, prev_x, prev_y = d
+            for i in range(n):
+                prev_x[i], prev_y[i] = x[i], y[i]
+                vx[i] *= 0.95
+                vy[i] += 0.2
+                x[i] += vx[i]
+                y[i] += vy[i]
+                life[i] -= 8
+                size[i] *= 0.95
+            i = 0
+            while i < n:
+                if life[i] <= 0:
+                    n -= 1
+                    for row in d: row[i] = row[n]
+                else:
+                    i += 1
+            self.count = n
+
+    def draw(self, surface, blend=1.0):
+        # คืนค่ารายการพื้นที่ที่วาด | blend = สัดส่วนระหว่าง step ก่อนหน้ากับปัจจุบัน
+        n, d = self.count, self.data
+        if not n: return []
+        if np is not None:
+            size, life = d[self.SIZE, :n], d[self.LIFE, :n]
+            x = d[self.PX, :n] + (d[self.X, :n] - d[self.PX, :n]) * blend
+            y = d[self.PY, :n] + (d[self.Y, :n] - d[self.PY, :n]) * blend
+            visible = size > 1
+            diam = (size * 2).astype(int)[visible].tolist()
+            alpha = (255 - ((255 - life.astype(int)) // self.ALPHA_STEP) * self.ALPHA_STEP)[visible].tolist()
+            px = (x - size).astype(int)[visible].tolist()
+            py = (y - size).astype(int)[visible].tolist()
+            cols = d[self.COLOR, :n].astype(int)[visible].tolist()
+        else:
+            diam, alpha, px, py, cols = [], [], [], [], []
+            for i in range(n):
+                s = d[self.SIZE][i]
+                if s <= 1: continue
+                x = d[self.PX][i] + (d[self.X][i] - d[self.PX][i]) * blend
+                y = d[self.PY][i] + (d[self.Y][i] - d[self.PY][i]) * blend
+                diam.append(int(s * 2))
+                alpha.append(255 - ((255 - int(d[self.LIFE][i])) // self.ALPHA_STEP) * self.ALPHA_STEP)
+                px.append(int(x - s))
+                py.append(int(y - s))
+                cols.append(int(d[self.COLOR][i]))
+        palette = self.palette
+        return surface.blits([(get_particle_sprite(dm, palette[c], a), (x, y))
+                              for dm, a, x, y, c in zip(diam, alpha, px, py, cols)])
 
 class TrashItem:
     def __init__(self):
@@ -120,394 +427,1225 @@ class TrashItem:
         self.base_y = 250
         self.rect = pygame.Rect(WIDTH//2 - 45, self.base_y, 90, 90)
         self.is_dragging = False
+        self.prev_y, self.prev_angle = self.rect.y, self.angle
+
+    def reset_position(self):
+        # กลับจุดเริ่มต้นทันที (ไม่ interpolate จากตำแหน่งเดิม)
+        self.rect.topleft = (WIDTH//2 - 45, self.base_y)
+        self.prev_y, self.prev_angle = self.rect.y, self.angle
 
     def load_item(self, data):
         self.name, self.type, self.color, self.shape = data
         self.is_dragging = False
-        self.rect.topleft = (WIDTH//2 - 45, self.base_y)
-        self.model_surf = pygame.Surface((100, 100), pygame.SRCALPHA)
-        self.draw_to_surface(self.model_surf, self.color)
+        self.reset_position()
+        self.atlas = get_atlas(data)
         self.rot_speed = random.uniform(-2, 2)
         if abs(self.rot_speed) < 0.5: self.rot_speed = 1.5
 
     def draw_to_surface(self, surf, color):
-        if self.shape == "bottle":
-            pygame.draw.rect(surf, (30, 100, 200), (40, 10, 20, 12), border_radius=3)
-            pygame.draw.rect(surf, color, (43, 22, 14, 15))
-            pygame.draw.rect(surf, color, (32, 35, 36, 55), border_radius=10)
-            pygame.draw.rect(surf, (255, 80, 80), (32, 50, 36, 20))
-            pygame.draw.line(surf, (255, 255, 255), (38, 40), (38, 80), 3)
-            
-        elif self.shape == "can":
-            pygame.draw.rect(surf, color, (30, 25, 40, 55), border_radius=5)
-            pygame.draw.rect(surf, (180, 180, 180), (30, 20, 40, 8), border_radius=3)
-            pygame.draw.rect(surf, (180, 180, 180), (30, 75, 40, 8), border_radius=3)
-            pygame.draw.polygon(surf, (255, 255, 255), [(30, 45), (70, 35), (70, 50), (30, 60)])
-            pygame.draw.line(surf, (255, 200, 200), (38, 30), (38, 70), 4)
-            
-        elif self.shape == "cup":
-            pygame.draw.polygon(surf, color, [(30, 35), (70, 35), (60, 80), (40, 80)])
-            pygame.draw.arc(surf, (200, 200, 200), (30, 15, 40, 40), 0, math.pi, 3)
-            pygame.draw.line(surf, (220, 50, 50), (50, 35), (65, 5), 4)
-            pygame.draw.circle(surf, (80, 180, 80), (50, 55), 10)
-            
-        elif self.shape == "food_waste":
-            pygame.draw.rect(surf, (240, 230, 180), (42, 30, 16, 40), border_radius=8)
-            pygame.draw.ellipse(surf, color, (30, 15, 40, 25))
-            pygame.draw.ellipse(surf, color, (30, 60, 40, 25))
-            pygame.draw.line(surf, (100, 50, 20), (50, 15), (55, 0), 3)
-            pygame.draw.circle(surf, (50, 20, 10), (47, 45), 2)
-            pygame.draw.circle(surf, (50, 20, 10), (53, 55), 2)
-            
-        elif self.shape == "banana":
-            pygame.draw.polygon(surf, color, [(20, 25), (45, 75), (80, 85), (85, 70), (55, 55), (35, 15)])
-            pygame.draw.polygon(surf, (120, 150, 50), [(20, 25), (35, 15), (25, 10), (15, 18)])
-            pygame.draw.line(surf, (160, 120, 20), (35, 30), (55, 60), 2)
-            pygame.draw.circle(surf, (139, 69, 19), (60, 70), 3)
-            pygame.draw.circle(surf, (139, 69, 19), (45, 45), 2)
-            
-        elif self.shape == "leaf":
-            pygame.draw.ellipse(surf, color, (20, 20, 60, 50))
-            pygame.draw.line(surf, (90, 60, 20), (10, 45), (80, 45), 3)
-            pygame.draw.line(surf, (90, 60, 20), (40, 45), (50, 30), 2)
-            pygame.draw.line(surf, (90, 60, 20), (50, 45), (60, 60), 2)
-            pygame.draw.line(surf, (90, 60, 20), (60, 45), (70, 35), 2)
-            
-        elif self.shape == "bag":
-            for i in range(5):
-                pygame.draw.polygon(surf, color, [(25+(i*10), 25), (30+(i*10), 20), (35+(i*10), 25)])
-                pygame.draw.polygon(surf, color, [(25+(i*10), 75), (30+(i*10), 80), (35+(i*10), 75)])
-            pygame.draw.rect(surf, color, (25, 25, 50, 50))
-            pygame.draw.circle(surf, (255, 220, 50), (50, 50), 15)
-            pygame.draw.line(surf, (255, 255, 255), (30, 30), (30, 70), 3)
-            
-        elif self.shape == "battery":
-            pygame.draw.rect(surf, (40, 40, 40), (35, 25, 30, 50), border_radius=4)
-            pygame.draw.rect(surf, (220, 180, 40), (35, 25, 30, 15), border_top_left_radius=4, border_top_right_radius=4)
-            pygame.draw.rect(surf, (180, 180, 180), (45, 18, 10, 7))
-            pygame.draw.rect(surf, (100, 100, 100), (38, 25, 5, 50))
-            pygame.draw.line(surf, (0,0,0), (46, 32), (54, 32), 2)
-            pygame.draw.line(surf, (0,0,0), (50, 28), (50, 36), 2)
-            pygame.draw.line(surf, (255,255,255), (46, 60), (54, 60), 2)
-            
-        elif self.shape == "lightbulb":
-            pygame.draw.circle(surf, color, (50, 40), 22)
-            pygame.draw.line(surf, (255, 200, 0), (45, 40), (50, 30), 2)
-            pygame.draw.line(surf, (255, 200, 0), (50, 30), (55, 40), 2)
-            pygame.draw.line(surf, (100, 100, 100), (45, 40), (45, 55), 2)
-            pygame.draw.line(surf, (100, 100, 100), (55, 40), (55, 55), 2)
-            pygame.draw.rect(surf, (160, 160, 160), (40, 58, 20, 18), border_radius=3)
-            pygame.draw.line(surf, (100, 100, 100), (40, 62), (60, 62), 2)
-            pygame.draw.line(surf, (100, 100, 100), (40, 68), (60, 68), 2)
-            pygame.draw.rect(surf, (50, 50, 50), (45, 76, 10, 6), border_radius=2)
-            pygame.draw.arc(surf, (255, 255, 255), (32, 22, 36, 36), 1.5, 3.0, 3)
-            
-        else: 
-            pts = [(25, 30), (48, 22), (73, 33), (80, 65), (52, 78), (22, 68)]
-            pygame.draw.polygon(surf, color, pts)
-            pygame.draw.line(surf, (180, 180, 180), (25, 30), (52, 50), 2)
-            pygame.draw.line(surf, (180, 180, 180), (48, 22), (52, 50), 2)
-            pygame.draw.line(surf, (180, 180, 180), (73, 33), (52, 50), 2)
-            pygame.draw.line(surf, (180, 180, 180), (80, 65), (52, 50), 2)
-
-    def draw(self, surface, paused=False):
-        if not paused:
-            if not self.is_dragging:
-                self.rect.y = self.base_y + math.sin(pygame.time.get_ticks() * 0.004) * 15
-                self.angle = (self.angle + self.rot_speed) % 360
-            else:
-                glow = pygame.Surface((150, 150), pygame.SRCALPHA)
-                pygame.draw.circle(glow, (255,255,200,50), (75,75), 60)
-                surface.blit(glow, (self.rect.centerx-75, self.rect.centery-75))
-                self.angle = (self.angle + self.rot_speed * 3) % 360
-
-        pygame.draw.ellipse(surface, (0,0,0,40), (self.rect.x+15, self.base_y + 90, 60, 15))
-        rotated_image = pygame.transform.rotate(self.model_surf, self.angle)
-        new_rect = rotated_image.get_rect(center=self.rect.center)
+        # วาดสดจากคำสั่งใน content pack (ตอนเล่นใช้ภาพจาก sprite sheet แทน)
+        content.draw_shape(surf, CONTENT.shape_ops(self.shape), color)
+
+    def update(self, sim_time):
+        self.prev_y, self.prev_angle = self.rect.y, self.angle
+        if not self.is_dragging:
+            self.rect.y = self.base_y + math.sin(sim_time * 4) * 15
+            self.angle = (self.angle + self.rot_speed) % 360
+        else:
+            self.angle = (self.angle + self.rot_speed * 3) % 360
+
+    def draw(self, surface, paused=False, blend=1.0, glow=True):
+        # คืนค่าพื้นที่ที่วาด (None ถ้าหยุดเกมอยู่ เพราะภาพไม่เปลี่ยน)
+        dirty = None
+        draw_rect = self.rect.copy()
+        if self.is_dragging:
+            if glow and not paused:
+                dirty = surface.blit(get_drag_glow_surf(), (self.rect.centerx-75, self.rect.centery-75))
+        else:
+            draw_rect.y = self.prev_y + (self.rect.y - self.prev_y) * blend
+        angle = self.prev_angle + ((self.angle - self.prev_angle + 180) % 360 - 180) * blend
+
+        shadow_rect = pygame.draw.ellipse(surface, (0,0,0,40), (draw_rect.x+15, self.base_y + 90, 60, 15))
+        rotated_image = self.atlas.frame(angle)
+        new_rect = rotated_image.get_rect(center=draw_rect.center)
         surface.blit(rotated_image, new_rect.topleft)
-        lbl_y = new_rect.top - 15 if not self.is_dragging else self.rect.y - 30
-        draw_text_with_shadow(surface, self.name, font_sm, WHITE, (self.rect.centerx, lbl_y))
+        # ป้ายชื่อวางตามขอบของภาพเต็ม MODEL_SIZE ที่หมุนแล้ว (ไม่ใช่ภาพที่ตัดขอบ) ตำแหน่งจึงเท่าเดิมทุกรูปทรง
+        # ขนาดเดียวกับที่ pygame.transform.rotate ให้: int(w|sin| + h|cos|)
+        rad = math.radians(angle)
+        model_h = int(content.MODEL_SIZE * (abs(math.sin(rad)) + abs(math.cos(rad))))
+        lbl_y = draw_rect.centery - model_h // 2 - 15 if not self.is_dragging else draw_rect.y - 30
+        lbl_rect = draw_text_with_shadow(surface, self.name, ASSETS.font('sm'), WHITE, (draw_rect.centerx, lbl_y))
+        if paused: return None
+        return shadow_rect.unionall([r for r in (dirty, new_rect, lbl_rect) if r])
+
+# --- sprite sheet ของ content pack: ถอดรหัส PNG ครั้งเดียว ทุกรูปทรงเป็น subsurface ของภาพนี้ ---
+SPRITE_SHEET = {}
+def get_sprite_sheet():
+    if not SPRITE_SHEET:
+        try:
+            cache = get_cache_dir('atlas')
+        except OSError:
+            cache = None  # โฟลเดอร์แคชเขียนไม่ได้: วาดในหน่วยความจำทุกครั้งที่เปิดเกม
+        dirs = [content.BAKED_DIR] + ([cache] if cache else [])
+        sheet, index = content.load_atlas(CONTENT, dirs, save=cache is not None)
+        SPRITE_SHEET.update(sheet=optimize_surf(sheet, True), index=index)
+    return SPRITE_SHEET['sheet'], SPRITE_SHEET['index']
+
+# --- Sprite atlas ต่อ (รูปทรง, สี): ภาพตัดขอบใสและภาพคิว 45x45 จาก sprite sheet และภาพหมุนล่วงหน้า ---
+ROTATION_STEP = 4  # องศาต่อ 1 เฟรมหมุน (ยิ่งน้อยยิ่งลื่นแต่กินหน่วยความจำมากขึ้น)
+
+class SpriteAtlas:
+    def __init__(self, shape, color, rotation_step=None):
+        self.shape, self.color = shape, color
+        sheet, index = get_sprite_sheet()
+        entry = index['sprites'][content.sprite_key(shape, color)]
+        self.cropped = sheet.subsurface(entry['sprite'])  # ขอบใสถูกตัดไว้ตอน build
+        self.preview = sheet.subsurface(entry['preview'])
+        self.set_rotation_step(rotation_step or ROTATION_STEP)
+
+    def set_rotation_step(self, rotation_step):
+        self.frame_count = max(1, round(360 / rotation_step))
+        self.rotation_step = 360 / self.frame_count
+        self.frames = [None] * self.frame_count
+
+    def frame(self, angle):
+        idx = int(round(angle / self.rotation_step)) % self.frame_count
+        surf = self.frames[idx]
+        if surf is None:
+            surf = self.frames[idx] = pygame.transform.rotate(self.cropped, idx * self.rotation_step)
+        return surf
+
+    def missing_frames(self):
+        return [i for i, f in enumerate(self.frames) if f is None]
+
+    def memory_bytes(self):
+        # ภาพตัดขอบ/ภาพคิวเป็นส่วนของ sprite sheet นับรวมไว้ที่ atlas_memory_report แล้ว
+        return sum(f.get_width() * f.get_height() * f.get_bytesize() for f in self.frames if f is not None)
+
+ATLAS_CACHE = {}
+def get_atlas(data):
+    cache_key = (data[3], data[2])
+    if cache_key not in ATLAS_CACHE:
+        ATLAS_CACHE[cache_key] = SpriteAtlas(data[3], data[2])
+    return ATLAS_CACHE[cache_key]
+
+def set_rotation_step(rotation_step):
+    global ROTATION_STEP
+    ROTATION_STEP = rotation_step
+    for atlas in ATLAS_CACHE.values(): atlas.set_rotation_step(rotation_step)
+
+def warm_up_atlases(budget=0.004, items=None):
+    # สร้างภาพหมุนที่ยังขาดทีละนิดภายในเวลาที่กำหนด (เรียกระหว่างหน้า START)
+    # คืนค่า True เมื่อสร้างครบทุกภาพแล้ว
+    deadline = time.perf_counter() + budget
+    for data in items or TRASH_TYPES:
+        atlas = get_atlas(data)
+        for idx in atlas.missing_frames():
+            if time.perf_counter() >= deadline: return False
+            atlas.frame(idx * atlas.rotation_step)
+    return True
+
+def atlas_memory_report():
+    atlases = {f"{shape}:{color}": {'frames_built': a.frame_count - len(a.missing_frames()),
+                                    'frame_count': a.frame_count, 'bytes': a.memory_bytes()}
+               for (shape, color), a in ATLAS_CACHE.items()}
+    sheet = SPRITE_SHEET.get('sheet')
+    sheet_bytes = sheet.get_width() * sheet.get_height() * sheet.get_bytesize() if sheet else 0
+    return {'rotation_step': ROTATION_STEP, 'sheet_bytes': sheet_bytes,
+            'total_bytes': sheet_bytes + sum(a['bytes'] for a in atlases.values()), 'atlases': atlases}
 
-# Cache จำภาพคิวล่วงหน้า
-PREVIEW_CACHE = {}
 def get_preview_surf(data):
-    cache_key = (data[3], data[2]) 
-    if cache_key not in PREVIEW_CACHE:
-        surf = pygame.Surface((100, 100), pygame.SRCALPHA)
-        dummy = TrashItem()
-        dummy.shape = data[3]
-        dummy.draw_to_surface(surf, data[2])
-        PREVIEW_CACHE[cache_key] = pygame.transform.scale(surf, (45, 45))
-    return PREVIEW_CACHE[cache_key]
+    return get_atlas(data).preview
 
 class Bin:
-    def __init__(self, x, y, type_key, name):
-        self.rect = pygame.Rect(x, y, 170, 220)
+    # scale < 1 ใช้ในโหมด rush: วาดขนาดเต็มครั้งเดียวแล้วย่อ
+    def __init__(self, x, y, type_key, name, scale=1.0):
+        self.scale = scale
+        self.rect = pygame.Rect(x, y, int(BIN_SIZE[0] * scale), int(BIN_SIZE[1] * scale))
         self.type = type_key
         self.name = name
         self.colors = BIN_COLORS[type_key]
-        self.lid_offset = 0
+        self.lid_offset = self.prev_lid_offset = 0
+        self.hover = False
+        self.body_surf = self.lid_surf = None
+        self.lid_y = None  # แถวที่วาดฝาครั้งล่าสุด
+        # พื้นที่ทั้งหมดที่ฝาและแสงเรืองอาจวาดทับ
+        self.dirty_rect = pygame.Rect(x - int(25 * scale), y - int(40 * scale), int(220 * scale), int(285 * scale))
 
-    def draw(self, surface, hover=False, paused=False):
-        target_offset = -15 if hover and not paused else 0
-        if not paused: 
-            self.lid_offset += (target_offset - self.lid_offset) * 0.2
+    def update(self, hover):
+        self.hover, self.prev_lid_offset = hover, self.lid_offset
+        target_offset = -15 * self.scale if hover else 0
+        self.lid_offset += (target_offset - self.lid_offset) * 0.2
+        # หยุดที่เป้าหมายพอดี ไม่เช่นนั้นค่าจะเข้าใกล้ 0 ไปเรื่อยๆ และตำแหน่งฝาเลื่อน 1px ตอนปัดเศษ
+        if abs(target_offset - self.lid_offset) < 0.01: self.lid_offset = target_offset
 
-        if hover and not paused:
-            glow = pygame.Surface((220, 270), pygame.SRCALPHA)
-            pygame.draw.rect(glow, (*self.colors['glow'], 60), (0,0,220,270), border_radius=30)
-            surface.blit(glow, (self.rect.x-25, self.rect.y-25 + self.lid_offset))
-
-        draw_beveled_rect(surface, pygame.Rect(self.rect.x, self.rect.y + 40, 170, 180), self.colors['dark'], radius=15, bevel=6)
-        front_rect = pygame.Rect(self.rect.x+15, self.rect.y + 70, 140, 130)
-        draw_beveled_rect(surface, front_rect, self.colors['base'], radius=10, bevel=4)
-        lid_rect = pygame.Rect(self.rect.x-5, self.rect.y + self.lid_offset, 180, 45)
-        draw_beveled_rect(surface, lid_rect, self.colors['dark'], radius=10, bevel=5)
-        pygame.draw.rect(surface, self.colors['base'], (self.rect.centerx-25, lid_rect.y+5, 50, 10), border_radius=5)
+    def build_surfaces(self):
+        # ตัวถัง + ไอคอน + ป้ายชื่อ เป็นภาพนิ่ง วาดครั้งเดียว ส่วนฝาแยกอีกภาพเพราะต้องขยับ
+        body = pygame.Surface(BIN_SIZE, pygame.SRCALPHA)
+        draw_beveled_rect(body, pygame.Rect(0, 40, 170, 180), self.colors['dark'], radius=15, bevel=6)
+        front_rect = pygame.Rect(15, 70, 140, 130)
+        draw_beveled_rect(body, front_rect, self.colors['base'], radius=10, bevel=4)
 
         ic_col, ic_x, ic_y = self.colors['icon'], front_rect.centerx, front_rect.centery - 15
         if self.type == 'organic': 
-            pygame.draw.circle(surface, ic_col, (ic_x-8, ic_y), 12)
-            pygame.draw.circle(surface, ic_col, (ic_x+8, ic_y), 12)
-            pygame.draw.polygon(surface, ic_col, [(ic_x-18, ic_y+5), (ic_x+18, ic_y+5), (ic_x, ic_y+25)])
+            pygame.draw.circle(body, ic_col, (ic_x-8, ic_y), 12)
+            pygame.draw.circle(body, ic_col, (ic_x+8, ic_y), 12)
+            pygame.draw.polygon(body, ic_col, [(ic_x-18, ic_y+5), (ic_x+18, ic_y+5), (ic_x, ic_y+25)])
         elif self.type == 'recycle': 
-            pygame.draw.arc(surface, ic_col, (ic_x-15, ic_y-15, 30, 30), 0, math.pi*1.5, 5)
-            pygame.draw.polygon(surface, ic_col, [(ic_x+15, ic_y), (ic_x+5, ic_y-10), (ic_x+25, ic_y-10)])
+            pygame.draw.arc(body, ic_col, (ic_x-15, ic_y-15, 30, 30), 0, math.pi*1.5, 5)
+            pygame.draw.polygon(body, ic_col, [(ic_x+15, ic_y), (ic_x+5, ic_y-10), (ic_x+25, ic_y-10)])
         elif self.type == 'general': 
-            pygame.draw.rect(surface, ic_col, (ic_x-12, ic_y-5, 24, 30))
-            pygame.draw.rect(surface, ic_col, (ic_x-15, ic_y-10, 30, 5))
+            pygame.draw.rect(body, ic_col, (ic_x-12, ic_y-5, 24, 30))
+            pygame.draw.rect(body, ic_col, (ic_x-15, ic_y-10, 30, 5))
         elif self.type == 'hazardous':
-             pygame.draw.line(surface, ic_col, (ic_x-15, ic_y-10), (ic_x+15, ic_y+15), 4)
-             pygame.draw.line(surface, ic_col, (ic_x-15, ic_y+15), (ic_x+15, ic_y-10), 4)
-             pygame.draw.circle(surface, ic_col, (ic_x, ic_y-5), 10)
-             pygame.draw.rect(surface, ic_col, (ic_x-6, ic_y+2, 12, 6))
-
-        draw_text_with_shadow(surface, self.name, font_md, WHITE, (self.rect.centerx, self.rect.bottom - 30))
-
-def draw_bg(surface, clouds, shift_x, paused=False):
-    for y in range(HEIGHT):
-        r = SKY_TOP[0] + (SKY_BOTTOM[0] - SKY_TOP[0]) * (y / HEIGHT)
-        g = SKY_TOP[1] + (SKY_BOTTOM[1] - SKY_TOP[1]) * (y / HEIGHT)
-        b = SKY_TOP[2] + (SKY_BOTTOM[2] - SKY_TOP[2]) * (y / HEIGHT)
-        pygame.draw.line(surface, (int(r), int(g), int(b)), (0, y), (WIDTH, y))
-    
-    pygame.draw.ellipse(surface, (40, 90, 110), (-100 + shift_x*0.2, HEIGHT-220, WIDTH+200, 180))
-    pygame.draw.ellipse(surface, (50, 100, 120), (200 + shift_x*0.1, HEIGHT-190, WIDTH+200, 150))
+             pygame.draw.line(body, ic_col, (ic_x-15, ic_y-10), (ic_x+15, ic_y+15), 4)
+             pygame.draw.line(body, ic_col, (ic_x-15, ic_y+15), (ic_x+15, ic_y-10), 4)
+             pygame.draw.circle(body, ic_col, (ic_x, ic_y-5), 10)
+             pygame.draw.rect(body, ic_col, (ic_x-6, ic_y+2, 12, 6))
+
+        draw_text_with_shadow(body, self.name, ASSETS.font('md'), WHITE, (85, 190))
+
+        lid = pygame.Surface((180, 45), pygame.SRCALPHA)
+        draw_beveled_rect(lid, pygame.Rect(0, 0, 180, 45), self.colors['dark'], radius=10, bevel=5)
+        pygame.draw.rect(lid, self.colors['base'], (65, 5, 50, 10), border_radius=5)
+        if self.scale != 1:
+            body = pygame.transform.smoothscale(body, self.rect.size)
+            lid = pygame.transform.smoothscale(lid, (int(180 * self.scale), int(45 * self.scale)))
+        self.body_surf, self.lid_surf = optimize_surf(body, True), optimize_surf(lid, True)
+
+    def draw(self, surface, paused=False, blend=1.0, glow=True):
+        # คืนค่าพื้นที่ที่เปลี่ยนเมื่อฝากำลังขยับหรือมีแสงเรือง ไม่เช่นนั้นคืน None
+        if self.body_surf is None: self.build_surfaces()
+        hover = self.hover
+        lid_offset = self.prev_lid_offset + (self.lid_offset - self.prev_lid_offset) * blend
+
+        scale = self.scale
+        if glow and hover and not paused:
+            surface.blit(get_glow_surf(self.colors['glow'], scale),
+                         (self.rect.x - int(25 * scale), self.rect.y - int(25 * scale) + lid_offset))
+
+        lid_y = int(self.rect.y + lid_offset)
+        surface.blit(self.body_surf, self.rect.topleft)
+        surface.blit(self.lid_surf, (self.rect.x - int(5 * scale), lid_y))
+        moved, self.lid_y = lid_y != self.lid_y, lid_y
+        if not paused and (hover or moved):
+            return self.dirty_rect
+        return None
+
+# แสงเรืองรอบถัง ใช้ร่วมกันทุกถังที่สีเดียวกัน
+GLOW_CACHE = {}
+def get_glow_surf(color, scale=1.0):
+    cache_key = color if scale == 1 else (color, scale)
+    if cache_key not in GLOW_CACHE:
+        w, h = int(220 * scale), int(270 * scale)
+        glow = pygame.Surface((w, h), pygame.SRCALPHA)
+        pygame.draw.rect(glow, (*color, 60), (0, 0, w, h), border_radius=int(30 * scale))
+        GLOW_CACHE[cache_key] = optimize_surf(glow, True)
+    return GLOW_CACHE[cache_key]
+
+# แสงรอบขยะที่กำลังลาก
+def get_drag_glow_surf():
+    if 'drag' not in GLOW_CACHE:
+        glow = pygame.Surface((150, 150), pygame.SRCALPHA)
+        pygame.draw.circle(glow, (255,255,200,50), (75,75), 60)
+        GLOW_CACHE['drag'] = optimize_surf(glow, True)
+    return GLOW_CACHE['drag']
+
+# --- เลเยอร์พื้นหลัง (วาดครั้งเดียวแล้วเก็บไว้ สร้างใหม่เมื่อเปลี่ยนขนาดจอ) ---
+BG_LAYER_CACHE = {}
+def get_bg_layers(size):
+    cache_key = (size, SKY_TOP, SKY_BOTTOM, GRASS_DEEP, GRASS_LIGHT)
+    if cache_key not in BG_LAYER_CACHE:
+        BG_LAYER_CACHE.clear()
+        w, h = size
+        sky = pygame.Surface(size)
+        for y in range(h):
+            r = SKY_TOP[0] + (SKY_BOTTOM[0] - SKY_TOP[0]) * (y / h)
+            g = SKY_TOP[1] + (SKY_BOTTOM[1] - SKY_TOP[1]) * (y / h)
+            b = SKY_TOP[2] + (SKY_BOTTOM[2] - SKY_TOP[2]) * (y / h)
+            pygame.draw.line(sky, (int(r), int(g), int(b)), (0, y), (w, y))
+
+        # เนินเขา parallax เป็นแถบสำเร็จรูป ใช้ blit ตามค่า offset
+        hill_far = pygame.Surface((w+200, 180), pygame.SRCALPHA)
+        pygame.draw.ellipse(hill_far, (40, 90, 110), (0, 0, w+200, 180))
+        hill_near = pygame.Surface((w+200, 150), pygame.SRCALPHA)
+        pygame.draw.ellipse(hill_near, (50, 100, 120), (0, 0, w+200, 150))
+
+        grass = pygame.Surface((w, 135), pygame.SRCALPHA)
+        pygame.draw.rect(grass, GRASS_DEEP, (0, 15, w, 120))
+        pygame.draw.rect(grass, GRASS_LIGHT, (0, 0, w, 30), border_radius=15)
+
+        BG_LAYER_CACHE[cache_key] = {
+            'sky': optimize_surf(sky), 'hill_far': optimize_surf(hill_far, True),
+            'hill_near': optimize_surf(hill_near, True), 'grass': optimize_surf(grass, True)}
+    return BG_LAYER_CACHE[cache_key]
+
+# ก้อนเมฆ 1 ก้อน = สไปรต์เดียว (จุดอ้างอิงของก้อนเมฆอยู่ที่ CLOUD_ANCHOR)
+CLOUD_ANCHOR = (70, 60)
+CLOUD_CACHE = {}
+def get_cloud_surf():
+    if 'cloud' not in CLOUD_CACHE:
+        surf = pygame.Surface((156, 101), pygame.SRCALPHA)
+        ax, ay = CLOUD_ANCHOR
+        pygame.draw.circle(surf, WHITE, (ax, ay), 40)
+        pygame.draw.circle(surf, WHITE, (ax+35, ay-10), 50)
+        pygame.draw.circle(surf, WHITE, (ax-35, ay+5), 35)
+        CLOUD_CACHE['cloud'] = optimize_surf(surf, True)
+    return CLOUD_CACHE['cloud']
+
+class Cloud:
+    def __init__(self, x, y):
+        self.x = self.prev_x = x
+        self.y = y
+
+    def update(self, width):
+        self.prev_x = self.x
+        self.x += 0.3
+        if self.x > width + 100: self.x = self.prev_x = -200
+
+def draw_bg(surface, clouds, shift_x, paused=False, blend=1.0, parallax=True):
+    # คืนค่ารายการพื้นที่ที่เปลี่ยน (เมฆที่ลอยอยู่ และแถบเนินเขาเมื่อเลื่อน)
+    # parallax=False: ท้องฟ้า+เนินเขานิ่ง รวมเป็นภาพเดียว blit ครั้งเดียว
+    w, h = surface.get_size()
+    layers = get_bg_layers((w, h))
+    dirty = []
+    if parallax:
+        surface.blit(layers['sky'], (0, 0))
+        hill_x = (int(-100 + shift_x*0.2), int(200 + shift_x*0.1))
+        surface.blit(layers['hill_far'], (hill_x[0], h-220))
+        surface.blit(layers['hill_near'], (hill_x[1], h-190))
+        if layers.get('hill_x', hill_x) != hill_x:
+            dirty.append(pygame.Rect(0, h-220, w, 180))
+        layers['hill_x'] = hill_x
+    else:
+        if 'static' not in layers:
+            static = layers['sky'].copy()
+            static.blit(layers['hill_far'], (-100, h-220))
+            static.blit(layers['hill_near'], (200, h-190))
+            layers['static'] = static
+        surface.blit(layers['static'], (0, 0))
+
+    cloud_surf = get_cloud_surf()
     for c in clouds:
-        if not paused: c.x += 0.3
-        if c.x > WIDTH + 100: c.x = -200
-        pygame.draw.circle(surface, (255,255,255,180), (int(c.x), c.y), 40)
-        pygame.draw.circle(surface, (255,255,255,180), (int(c.x)+35, c.y-10), 50)
-        pygame.draw.circle(surface, (255,255,255,180), (int(c.x)-35, c.y+5), 35)
-    
-    pygame.draw.rect(surface, GRASS_DEEP, (0, HEIGHT-120, WIDTH, 120))
-    pygame.draw.rect(surface, GRASS_LIGHT, (0, HEIGHT-135, WIDTH, 30), border_radius=15)
-
-def main():
-    clock = pygame.time.Clock()
-    score, time_left, game_state = 0, 60.0, "START"
-    clouds = [type('Cloud', (), {'x': random.randint(0, WIDTH), 'y': random.randint(50, 150)})() for _ in range(7)]
-    
-    # วางถัง 4 ใบให้กระจายพอดีหน้าจอ 1024px (ตั้ง y ต่ำลงเพื่อให้บาลานซ์)
-    bins = [Bin(75, 480, "organic", "ขยะเปียก"), 
-            Bin(310, 480, "recycle", "รีไซเคิล"), 
-            Bin(545, 480, "general", "ทั่วไป"), 
-            Bin(780, 480, "hazardous", "อันตราย")]
-    
-    trash, particles, upcoming_trash, bg_shift = TrashItem(), [], [], 0
-    
-    # ปุ่มหน้าเริ่มเกม (จัดตำแหน่งใหม่)
-    btn_start = pygame.Rect(WIDTH//2-130, 400, 260, 70)
-    btn_knowledge = pygame.Rect(WIDTH//2-130, 490, 260, 70)
-    btn_back = pygame.Rect(80, 30, 120, 45)
-    btn_pause = pygame.Rect(15, 10, 50, 50)
-    
-    # ปุ่มหน้าหยุดเกม
-    btn_resume = pygame.Rect(WIDTH//2-125, 280, 250, 60)
-    btn_restart = pygame.Rect(WIDTH//2-125, 360, 250, 60)
-    btn_exit = pygame.Rect(WIDTH//2-125, 440, 250, 60)
-
-    while True:
-        mx, my = pygame.mouse.get_pos()
-        if game_state == "PLAYING": bg_shift -= 0.5 
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: 
-                pygame.quit()
-                sys.exit()
+        x = c.prev_x + (c.x - c.prev_x) * blend
+        cloud_rect = surface.blit(cloud_surf, (int(x) - CLOUD_ANCHOR[0], c.y - CLOUD_ANCHOR[1]))
+        if not paused: dirty.append(cloud_rect)
+
+    surface.blit(layers['grass'], (0, h-135))
+    return dirty
+
+# --- Dirty-rect renderer (ส่งขึ้นจอเฉพาะส่วนที่เปลี่ยน ลดการใช้ CPU ในโหมด kiosk) ---
+class DirtyRenderer:
+    def __init__(self, size, enabled=True, full_ratio=0.5):
+        self.screen_rect = pygame.Rect((0, 0), size)
+        self.enabled, self.full_ratio = enabled, full_ratio
+        self.rects, self.prev_rects, self.full = [], [], True
+        self.full_frames = self.partial_frames = 0
+
+    def invalidate(self):
+        self.full = True
+
+    def add(self, rect):
+        if self.enabled and rect: self.rects.append(pygame.Rect(rect))
+
+    def extend(self, rects):
+        for r in rects: self.add(r)
+
+    def present(self):
+        if not self.enabled:
+            pygame.display.flip()
+            return
+        # ต้องอัปเดตทั้งตำแหน่งเดิม (เฟรมก่อน) และตำแหน่งใหม่ของสิ่งที่ขยับ
+        rects = [r.clip(self.screen_rect) for r in self.prev_rects + self.rects]
+        rects = [r for r in rects if r.width and r.height]
+        area = sum(r.width * r.height for r in rects)
+        if self.full or area > self.full_ratio * self.screen_rect.width * self.screen_rect.height:
+            pygame.display.flip()
+            self.full_frames += 1
+        else:
+            if rects: pygame.display.update(rects)
+            self.partial_frames += 1
+        self.prev_rects, self.rects, self.full = self.rects, [], False
+
+    def stats(self):
+        total = self.full_frames + self.partial_frames
+        return {'full_frames': self.full_frames, 'partial_frames': self.partial_frames,
+                'partial_ratio': self.partial_frames / total if total else 0.0}
+
+# --- ฉากของแต่ละหน้าจอ: ส่วนที่นิ่งวาดครั้งเดียวเก็บเป็นเลเยอร์ ทุกเฟรมวาดเฉพาะส่วนที่เปลี่ยน ---
+KNOWLEDGE_DATA = CONTENT.knowledge
+
+def draw_button(surface, game, rect, color, hover_color, label, font, radius):
+    dirty = draw_beveled_rect(surface, rect, hover_color if rect.collidepoint(game.mouse_pos) else color, radius)
+    draw_text_with_shadow(surface, label, font, WHITE, rect.center)
+    game.renderer.add(dirty)
+
+class Scene:
+    overlay_color = (0, 0, 0, 0)
+
+    def __init__(self):
+        self.layer, self.layer_key = None, None
+
+    def invalidate(self):
+        self.layer = None
+
+    def enter(self, game):
+        pass
+
+    def cache_key(self, game):
+        return ()
+
+    def get_layer(self, surface, game):
+        key = (surface.get_size(),) + self.cache_key(game)
+        if self.layer is None or key != self.layer_key:
+            self.layer, self.layer_key = self.build_layer(surface.get_size(), game), key
+            game.renderer.invalidate()  # เช่น คะแนนสูงสุดโหลดเสร็จขณะอยู่หน้านี้
+        return self.layer
+
+    def build_layer(self, size, game):
+        layer = pygame.Surface(size, pygame.SRCALPHA)
+        layer.fill(self.overlay_color)
+        self.draw_static(layer, game)
+        return optimize_surf(layer, True)
+
+    def draw_static(self, layer, game):
+        pass
+
+    def draw(self, surface, game):
+        surface.blit(self.get_layer(surface, game), (0, 0))
+        self.draw_dynamic(surface, game)
+
+    def draw_dynamic(self, surface, game):
+        pass
+
+class StartScene(Scene):
+    overlay_color = (0, 10, 30, 180)
+
+    def cache_key(self, game):
+        return (game.high_score("classic"), game.high_score("rush"))
+
+    def draw_static(self, layer, game):
+        draw_text_with_shadow(layer, "ฮีโร่รักษ์โลก", ASSETS.font('xl'), GOLD, (WIDTH//2, 220), (5,5))
+        best, rush_best = self.cache_key(game)
+        if best or rush_best:
+            draw_text_with_shadow(layer, f"คะแนนสูงสุด {best}   โหมดเร่งด่วน {rush_best}", ASSETS.font('sm'), OFF_WHITE, (WIDTH//2, 330))
+
+    def draw_dynamic(self, surface, game):
+        draw_button(surface, game, game.btn_start, (36, 140, 60), (46, 180, 80), "เริ่มภารกิจ", ASSETS.font('lg'), 25)
+        draw_button(surface, game, game.btn_knowledge, (20, 90, 180), (30, 120, 220), "ศูนย์การเรียนรู้", ASSETS.font('lg'), 25)
+        draw_button(surface, game, game.btn_rush, (200, 100, 0), (255, 140, 0), "โหมดเร่งด่วน", ASSETS.font('lg'), 25)
+
+class KnowledgeScene(Scene):
+    overlay_color = (0, 15, 40, 230)
+
+    def draw_static(self, layer, game):
+        panel = pygame.Rect(80, 100, 864, 568) # ขยาย Panel
+        draw_beveled_rect(layer, panel, (245, 250, 255), 35, 8)
+        draw_text_with_shadow(layer, "ศูนย์การเรียนรู้เรื่องขยะ", ASSETS.font('lg'), (20, 50, 100), (WIDTH//2, 150))
+
+        for i, d in enumerate(KNOWLEDGE_DATA):
+            col, row = i % 2, i // 2
+            x, y = 112 + (col * 420), 220 + (row * 210)
+            c_rect = pygame.Rect(x, y, 380, 180) 
+            color = BIN_COLORS[d['type']]
             
-            if game_state == "START":
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if btn_start.collidepoint(event.pos): 
-                        game_state, time_left, score = "PLAYING", 60, 0
-                        upcoming_trash = [random.choice(TRASH_TYPES) for _ in range(3)]
-                        trash.load_item(upcoming_trash.pop(0))
-                        upcoming_trash.append(random.choice(TRASH_TYPES))
-                    if btn_knowledge.collidepoint(event.pos): 
-                        game_state = "KNOWLEDGE"
+            pygame.draw.rect(layer, WHITE, c_rect, border_radius=15)
+            pygame.draw.rect(layer, color['base'], c_rect, 4, border_radius=15)
+            pygame.draw.rect(layer, color['base'], (x, y, 380, 45), border_top_left_radius=15, border_top_right_radius=15)
+            draw_text_with_shadow(layer, d['title'], ASSETS.font('md'), WHITE, (x + 190, y + 22), (1,1))
             
-            elif game_state == "KNOWLEDGE":
-                if event.type == pygame.MOUSEBUTTONDOWN and btn_back.collidepoint(event.pos): 
-                    game_state = "START"
+            layer.blit(render_text("ตัวอย่าง:", ASSETS.font('sm'), (100,100,100)), (x + 20, y + 65))
+            layer.blit(render_text(d['info'], ASSETS.font('sm'), BLACK), (x + 110, y + 65))
             
-            elif game_state == "PLAYING":
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if btn_pause.collidepoint(event.pos): 
-                        game_state = "PAUSED"
-                    elif trash.rect.collidepoint(event.pos):
-                        trash.is_dragging = True
-                        off_x, off_y = trash.rect.x - mx, trash.rect.y - my
-                        if snd_drag: snd_drag.play()
-                
-       # --- นำโค้ดชุดนี้ไปวางแทนที่ ---
-                elif event.type == pygame.MOUSEBUTTONUP and trash.is_dragging:
-                    trash.is_dragging = False
-                    found = False
-                    for b in bins:
-                        if b.rect.colliderect(trash.rect):
-                            if b.type == trash.type:
-                                score += 20
-                                if snd_correct: snd_correct.play()
-                                for _ in range(25): particles.append(Particle(trash.rect.centerx, trash.rect.centery, b.colors['light']))
-                                trash.load_item(upcoming_trash.pop(0))
-                                upcoming_trash.append(random.choice(TRASH_TYPES))
-                            else:
-                                time_left -= 8
-                                trash.rect.topleft = (WIDTH//2 - 45, trash.base_y) 
-                                if snd_wrong: snd_wrong.play()
-                            found = True
-                            break
-                    if not found: 
-                        trash.rect.topleft = (WIDTH//2 - 45, trash.base_y)
-                
-                elif event.type == pygame.MOUSEMOTION and trash.is_dragging:
-                    trash.rect.x, trash.rect.y = mx + off_x, my + off_y
-                    
-            elif game_state == "PAUSED":
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if btn_resume.collidepoint(event.pos): 
-                        game_state = "PLAYING"
-                    elif btn_restart.collidepoint(event.pos):
-                        score, time_left, game_state = 0, 60, "PLAYING"
-                        upcoming_trash = [random.choice(TRASH_TYPES) for _ in range(3)]
-                        trash.load_item(upcoming_trash.pop(0))
-                        upcoming_trash.append(random.choice(TRASH_TYPES))
-                    elif btn_exit.collidepoint(event.pos): 
-                        game_state = "START"
+            layer.blit(render_text("วิธีจัดการ:", ASSETS.font('sm'), (100,100,100)), (x + 20, y + 105))
             
-            elif game_state == "GAMEOVER":
-                if event.type == pygame.MOUSEBUTTONDOWN: 
-                    game_state = "START"
+            for line_idx, line_text in enumerate(d['use']):
+                layer.blit(render_text(line_text, ASSETS.font('sm'), BLACK), (x + 110, y + 105 + (line_idx * 28)))
+
+    def draw_dynamic(self, surface, game):
+        draw_button(surface, game, game.btn_back, (180, 50, 50), (220, 60, 60), "ย้อนกลับ", ASSETS.font('sm'), 10)
+
+class PauseScene(Scene):
+    # ตอนหยุดเกมทุกอย่างด้านหลังนิ่ง จึงเก็บภาพทั้งจอ (ฉากเกม + ม่านดำ + หัวข้อ) ไว้ตอนเข้าหน้านี้
+    overlay_color = (0, 0, 0, 200)
+
+    def enter(self, game):
+        self.invalidate()
+
+    def build_layer(self, size, game):
+        layer = pygame.Surface(size)
+        q = game.quality
+        draw_bg(layer, game.clouds[:q['clouds']], game.bg_shift, paused=True, parallax=q['parallax'])
+        game.draw_playfield(layer, paused=True)
+        overlay = pygame.Surface(size, pygame.SRCALPHA)
+        overlay.fill(self.overlay_color)
+        layer.blit(overlay, (0, 0))
+        draw_text_with_shadow(layer, "หยุดพัก", ASSETS.font('xl'), WHITE, (WIDTH//2, 160), (4,4))
+        return optimize_surf(layer)
+
+    def draw_dynamic(self, surface, game):
+        draw_button(surface, game, game.btn_resume, (36, 140, 60), (46, 180, 80), "ทำต่อ (Resume)", ASSETS.font('md'), 20)
+        draw_button(surface, game, game.btn_restart, (200, 100, 0), (255, 140, 0), "เริ่มใหม่ (Restart)", ASSETS.font('md'), 20)
+        draw_button(surface, game, game.btn_exit, (180, 50, 50), (220, 60, 60), "ออก (Exit)", ASSETS.font('md'), 20)
+
+class GameOverScene(Scene):
+    overlay_color = (0, 0, 0, 220)
+
+    def cache_key(self, game):
+        return (game.score, game.prev_best, game.class_rank())
+
+    def draw_static(self, layer, game):
+        draw_text_with_shadow(layer, "จบภารกิจ!", ASSETS.font('xl'), (255, 80, 80), (WIDTH//2, 280), (4,4))
+        draw_number_with_shadow(layer, "คะแนนรวม: ", game.score, ASSETS.font('xl'), GOLD, (WIDTH//2, 380), (4,4))
+        if game.score > game.prev_best:
+            draw_text_with_shadow(layer, "สถิติใหม่!", ASSETS.font('md'), GOLD, (WIDTH//2, 450))
+        else:
+            draw_number_with_shadow(layer, "คะแนนสูงสุด: ", game.prev_best, ASSETS.font('md'), OFF_WHITE, (WIDTH//2, 450))
+        rank = game.class_rank()
+        if rank:
+            draw_text_with_shadow(layer, f"อันดับในห้อง {rank[0]} จาก {rank[1]} คน", ASSETS.font('sm'), OFF_WHITE, (WIDTH//2, 485))
+
+    def draw_dynamic(self, surface, game):
+        if game.sim_time % 1.0 < 0.5:
+            game.renderer.add(draw_text_with_shadow(surface, "- คลิกเพื่อเริ่มใหม่ -", ASSETS.font('sm'), OFF_WHITE, (WIDTH//2, 520)))
+
+# --- วัดเวลาแต่ละช่วงของเฟรม (กด F3 เพื่อดู, --profile-log เพื่อบันทึกลงไฟล์) ---
+# mark(ช่วง) = เวลาตั้งแต่ mark ครั้งก่อนนับให้ช่วงนั้น (ช่วงเดียวกันหลายครั้งในเฟรมจะรวมกัน)
+PROFILE_PHASES = ["events", "update", "draw_bg", "bins", "particles", "trash", "hud",
+                  "scene", "flip+tick", "deferred", "overlay"]
+PROFILE_WINDOW = 120          # จำนวนเฟรมที่ใช้คำนวณค่าเฉลี่ย/percentile
+PROFILE_OVERLAY_REFRESH = 15  # วาดตัวเลขบน overlay ใหม่ทุกกี่เฟรม
+
+class NullProfiler:
+    # ใช้ตอนปิด profiler: ทุกเมธอดไม่ทำอะไร
+    enabled = overlay = False
+    def begin_frame(self): pass
+    def mark(self, phase): pass
+    def end_frame(self): pass
+    def close(self): pass
+
+NULL_PROFILER = NullProfiler()
+
+class SurfaceCounter:
+    # นับ Surface ที่สร้างใหม่: pygame.Surface(), convert/copy/subsurface, pygame.transform และข้อความที่ไม่อยู่ในแคช
+    # ติดตั้งเมื่อเปิด profiler และถอดคืนของเดิมตอน profiler.close() ตอนไม่ได้ profile จึงไม่มีค่าใช้จ่าย
+    TRANSFORMS = ["rotate", "rotozoom", "scale", "smoothscale", "flip"]
+
+    def __init__(self):
+        self.created = 0
+        self.originals = None  # (pygame.Surface, {ชื่อ: ฟังก์ชันเดิมใน pygame.transform}) ระหว่างติดตั้ง
+
+    @property
+    def installed(self):
+        return self.originals is not None
+
+    @property
+    def count(self):
+        return self.created + TEXT_CACHE.misses
+
+    def install(self):
+        if self.installed: return
+        counter, base = self, pygame.Surface
+        self.originals = (base, {name: getattr(pygame.transform, name) for name in self.TRANSFORMS})
+
+        def counted(fn):
+            def wrapper(*args, **kwargs):
+                counter.created += 1
+                return fn(*args, **kwargs)
+            return wrapper
+
+        class CountingSurface(base):
+            def __init__(self, *args, **kwargs):
+                counter.created += 1
+                super().__init__(*args, **kwargs)
+            convert, convert_alpha = counted(base.convert), counted(base.convert_alpha)
+            copy, subsurface = counted(base.copy), counted(base.subsurface)
+
+        pygame.Surface = CountingSurface
+        for name in self.TRANSFORMS:
+            setattr(pygame.transform, name, counted(getattr(pygame.transform, name)))
+
+    def uninstall(self):
+        # Surface ที่สร้างระหว่างติดตั้งยังเป็น CountingSurface อยู่ แต่ Surface ใหม่หลังจากนี้ไม่ถูกนับแล้ว
+        if not self.installed: return
+        pygame.Surface, transforms = self.originals
+        for name, fn in transforms.items(): setattr(pygame.transform, name, fn)
+        self.originals = None
+
+SURFACE_COUNTER = SurfaceCounter()
+
+class FrameProfiler:
+    enabled = True
+
+    def __init__(self, log_path=None, window=PROFILE_WINDOW):
+        self.history = {p: deque(maxlen=window) for p in PROFILE_PHASES + ["total"]}
+        self.surfaces = deque(maxlen=window)
+        self.current = dict.fromkeys(PROFILE_PHASES, 0.0)
+        self.frames, self.overlay, self.overlay_surf = 0, False, None
+        self.frame_start = self.last = time.perf_counter()
+        self.surface_start = 0
+        self.log, self.log_format = None, None
+        if log_path:
+            self.log_format = 'jsonl' if log_path.endswith('.jsonl') else 'csv'
+            self.log = open(log_path, 'w', encoding='utf-8')
+            if self.log_format == 'csv':
+                self.log.write(",".join(["frame"] + [f"{p}_ms" for p in PROFILE_PHASES] + ["total_ms", "surfaces"]) + "\n")
+        SURFACE_COUNTER.install()
+
+    def begin_frame(self):
+        self.frame_start = self.last = time.perf_counter()
+        self.surface_start = SURFACE_COUNTER.count
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        current, history = self.current, self.history
+        for phase, dt in current.items():
+            history[phase].append(dt * 1000)
+            current[phase] = 0.0
+        total = (self.last - self.frame_start) * 1000
+        surfaces = SURFACE_COUNTER.count - self.surface_start
+        history["total"].append(total)
+        self.surfaces.append(surfaces)
+        if self.log:
+            row = [history[p][-1] for p in PROFILE_PHASES]
+            if self.log_format == 'csv':
+                self.log.write(f"{self.frames}," + ",".join(f"{v:.3f}" for v in row) + f",{total:.3f},{surfaces}\n")
+            else:
+                self.log.write(json.dumps({'frame': self.frames, **{p: round(v, 3) for p, v in zip(PROFILE_PHASES, row)},
+                                           'total': round(total, 3), 'surfaces': surfaces}) + "\n")
+        self.frames += 1
+        if self.overlay and self.frames % PROFILE_OVERLAY_REFRESH == 0: self.overlay_surf = None
+
+    def stats(self):
+        result = {}
+        for phase, values in self.history.items():
+            ms = sorted(values)
+            if not ms: continue
+            result[phase] = {'avg_ms': sum(ms) / len(ms), 'p95_ms': ms[int(0.95 * (len(ms) - 1))],
+                             'p99_ms': ms[int(0.99 * (len(ms) - 1))]}
+        if self.surfaces:
+            result['surfaces'] = {'avg': sum(self.surfaces) / len(self.surfaces), 'max': max(self.surfaces)}
+        return result
+
+    def toggle_overlay(self):
+        self.overlay, self.overlay_surf = not self.overlay, None
+
+    def build_overlay(self, renderer=None):
+        # พื้นทึบ (ไม่โปร่งแสง) เพื่อให้วาดซ้ำทับที่เดิมได้ในโหมด dirty rects
+        font, stats = ASSETS.font('tiny'), self.stats()
+        rows = [("phase (ms)", "avg", "p95", "p99")]
+        for phase in PROFILE_PHASES + ["total"]:
+            s = stats.get(phase)
+            if s: rows.append((phase, f"{s['avg_ms']:.2f}", f"{s['p95_ms']:.2f}", f"{s['p99_ms']:.2f}"))
+        footers = []
+        if 'surfaces' in stats:
+            footers.append(f"surfaces/frame avg {stats['surfaces']['avg']:.1f} max {stats['surfaces']['max']}")
+        text = TEXT_CACHE.stats()
+        footers.append(f"text cache hit {text['hit_rate']:.1%}  {text['size']}/{TEXT_CACHE.max_size}")
+        if renderer and renderer.enabled:
+            dirty = renderer.stats()
+            footers.append(f"dirty rects partial {dirty['partial_ratio']:.1%} of {dirty['full_frames'] + dirty['partial_frames']}")
+        surf = pygame.Surface((290, len(rows) * 20 + 16 + len(footers) * 20))
+        surf.fill((20, 24, 36))
+        for i, row in enumerate(rows):
+            surf.blit(font.render(row[0], True, GOLD if i == 0 else WHITE), (8, 6 + i * 20))
+            for j, cell in enumerate(row[1:]):
+                text = font.render(cell, True, GOLD if i == 0 else WHITE)
+                surf.blit(text, (150 + j * 65 - text.get_width(), 6 + i * 20))
+        for i, footer in enumerate(footers):
+            surf.blit(font.render(footer, True, WHITE), (8, 10 + (len(rows) + i) * 20))
+        return surf
+
+    def draw_overlay(self, surface, renderer=None, pos=(10, 80)):
+        if self.overlay_surf is None: self.overlay_surf = self.build_overlay(renderer)
+        return surface.blit(self.overlay_surf, pos)
+
+    def close(self):
+        if self.log: self.log.close()
+        self.log = None
+        SURFACE_COUNTER.uninstall()
+
+# --- ระดับคุณภาพภาพ (ปรับอัตโนมัติตามเวลาที่ใช้ต่อเฟรม หรือเลือกเองด้วย --quality) ---
+# rotation_scale คูณกับ ROTATION_STEP (ภาพหมุนห่างขึ้น = ลื่นน้อยลงแต่สร้าง/เก็บภาพน้อยลง)
+QUALITY_TIERS = [
+    {'name': 'low', 'particles': 8, 'rotation_scale': 3, 'glow': False, 'clouds': 3, 'parallax': False},
+    {'name': 'medium', 'particles': 15, 'rotation_scale': 1.5, 'glow': True, 'clouds': 5, 'parallax': True},
+    {'name': 'high', 'particles': 25, 'rotation_scale': 1, 'glow': True, 'clouds': 7, 'parallax': True},
+]
+QUALITY_NAMES = [t['name'] for t in QUALITY_TIERS]
+
+def load_quality_tier(default=len(QUALITY_TIERS) - 1):
+    try:
+        with open(os.path.join(get_cache_dir(), 'quality.json'), encoding='utf-8') as f:
+            return QUALITY_NAMES.index(json.load(f)['tier'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return default
+
+def save_quality_tier(tier):
+    try:
+        cache_path = os.path.join(get_cache_dir(), 'quality.json')
+        content.atomic_write(cache_path, lambda f: json.dump({'tier': QUALITY_NAMES[tier]}, f), 'w')
+    except OSError:
+        pass  # จำระดับไม่ได้: ครั้งหน้าเริ่มจากระดับสูงสุดแล้วปรับใหม่
+
+class QualityGovernor:
+    # ดูเวลาทำงานต่อเฟรม (Clock.get_rawtime ไม่รวมเวลารอ) เฉพาะระหว่างเล่น แล้วเลื่อนระดับทีละขั้น
+    # hysteresis: ลดระดับเมื่อ p90 เกิน 90% ของงบเวลา แต่เพิ่มระดับเมื่อต่ำกว่า 50% ต่อเนื่องนานกว่า
+    # และระดับที่เคยต้องลดลงมาแล้ว จะต้องรอนานขึ้นเท่าตัวก่อนลองขึ้นไปใหม่
+    DOWN_RATIO, UP_RATIO = 0.9, 0.5
+    DOWN_WINDOW, UP_WINDOW = 90, 300  # จำนวนเฟรม
+    COOLDOWN = 120                    # เฟรมหลังเปลี่ยนระดับที่ไม่นับ (กำลังสร้างภาพหมุนชุดใหม่)
+
+    def __init__(self, tier, target_fps=60):
+        self.tier = tier
+        self.budget_ms = 1000 / (target_fps or 60)
+        self.samples = deque(maxlen=self.DOWN_WINDOW)
+        self.quiet = 0  # จำนวนเฟรมล่าสุดติดกันที่ใช้เวลาต่ำกว่าเกณฑ์เพิ่มระดับ
+        self.cooldown = self.COOLDOWN
+        self.failures = [0] * len(QUALITY_TIERS)
+
+    def observe(self, work_ms):
+        # คืนค่าระดับใหม่เมื่อควรเปลี่ยน ไม่เช่นนั้นคืน None
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return None
+        samples = self.samples
+        samples.append(work_ms)
+        self.quiet = self.quiet + 1 if work_ms < self.budget_ms * self.UP_RATIO else 0
+        if self.tier > 0 and len(samples) == samples.maxlen:
+            recent = sorted(samples)
+            if recent[int(0.9 * (len(recent) - 1))] > self.budget_ms * self.DOWN_RATIO:
+                self.failures[self.tier] += 1
+                return self.change(self.tier - 1)
+        up = self.tier + 1
+        if up < len(QUALITY_TIERS) and self.quiet >= self.UP_WINDOW * 2 ** self.failures[up]:
+            return self.change(up)
+        return None
+
+    def change(self, tier):
+        self.tier, self.cooldown, self.quiet = tier, self.COOLDOWN, 0
+        self.samples.clear()
+        return tier
+
+# --- บันทึก input เพื่อเล่นซ้ำ (ไฟล์ .ecorec) ---
+# header: magic + เวอร์ชัน + seed | record ละ 14 ไบต์: ชนิด, step, เวลาจริง (ms), x, y, ปุ่ม
+# record สุดท้าย (ชนิด END) ตามด้วยคะแนนและหน้าจอตอนจบ ใช้ตรวจผลตอนเล่นซ้ำ (ดู replay.py)
+RECORD_MAGIC = b'ECOR'
+RECORD_VERSION = 1
+RECORD_HEADER = struct.Struct('<4sBQ')
+RECORD_EVENT = struct.Struct('<BIIhhB')
+RECORD_END = struct.Struct('<iB')
+REC_END, REC_QUIT, REC_DOWN, REC_UP, REC_MOTION = range(5)
+RECORDED_EVENTS = {pygame.QUIT: REC_QUIT, pygame.MOUSEBUTTONDOWN: REC_DOWN,
+                   pygame.MOUSEBUTTONUP: REC_UP, pygame.MOUSEMOTION: REC_MOTION}
+GAME_STATES = ["START", "KNOWLEDGE", "PLAYING", "PAUSED", "GAMEOVER"]
+RECORD_FLUSH_INTERVAL = 1.0  # วินาที: ถ้าเกมค้างจนต้องปิดทิ้ง ไฟล์ยังมี input จนถึงก่อนค้าง
+
+def new_record_path():
+    return os.path.join(get_cache_dir('recordings'), time.strftime('%Y%m%d-%H%M%S') + '.ecorec')
+
+class Recorder:
+    def __init__(self, path, seed):
+        self.path, self.seed = path, seed
+        self.file = open(path, 'wb')
+        self.file.write(RECORD_HEADER.pack(RECORD_MAGIC, RECORD_VERSION, seed))
+        self.start = self.last_flush = time.perf_counter()
+
+    def record(self, step, event):
+        kind = RECORDED_EVENTS.get(event.type)
+        if kind is None: return
+        x, y = getattr(event, 'pos', (0, 0))
+        now = time.perf_counter()
+        self.file.write(RECORD_EVENT.pack(kind, step, int((now - self.start) * 1000),
+                                          max(-32768, min(32767, x)), max(-32768, min(32767, y)),
+                                          getattr(event, 'button', 0)))
+        if now - self.last_flush >= RECORD_FLUSH_INTERVAL:
+            self.file.flush()
+            self.last_flush = now
+
+    def close(self, game):
+        ms = int((time.perf_counter() - self.start) * 1000)
+        self.file.write(RECORD_EVENT.pack(REC_END, game.steps, ms, 0, 0, 0))
+        self.file.write(RECORD_END.pack(game.score, GAME_STATES.index(game.game_state)))
+        self.file.close()
 
-        # --- DRAWING ---
+class Recording:
+    def __init__(self, seed, events, end_step=None, end_ms=None, score=None, state=None):
+        self.seed, self.events = seed, events  # events: [(step, ms, pygame.event.Event)]
+        self.end_step, self.end_ms, self.score, self.state = end_step, end_ms, score, state
+
+    @property
+    def complete(self):
+        return self.end_step is not None
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f: data = f.read()
+        magic, version, seed = RECORD_HEADER.unpack_from(data)
+        if magic != RECORD_MAGIC or version != RECORD_VERSION:
+            raise ValueError(f"{path}: not an Eco Hero recording (v{RECORD_VERSION})")
+        rec, offset = cls(seed, []), RECORD_HEADER.size
+        while offset + RECORD_EVENT.size <= len(data):
+            kind, step, ms, x, y, button = RECORD_EVENT.unpack_from(data, offset)
+            offset += RECORD_EVENT.size
+            if kind == REC_END:
+                if offset + RECORD_END.size > len(data): break
+                score, state = RECORD_END.unpack_from(data, offset)
+                rec.end_step, rec.end_ms, rec.score, rec.state = step, ms, score, GAME_STATES[state]
+                break
+            if kind == REC_QUIT: event = pygame.event.Event(pygame.QUIT)
+            elif kind == REC_MOTION: event = pygame.event.Event(pygame.MOUSEMOTION, pos=(x, y), rel=(0, 0), buttons=(0, 0, 0))
+            else: event = pygame.event.Event(pygame.MOUSEBUTTONDOWN if kind == REC_DOWN else pygame.MOUSEBUTTONUP, pos=(x, y), button=button)
+            rec.events.append((step, ms, event))
+        return rec
+
+# --- Game loop แบบ fixed timestep (จำลองเกมทีละ STEP วินาที แยกจากการวาดภาพ) ---
+MAX_FRAME_TIME = 0.25  # กันเกมพยายามไล่ step ไม่ทันเมื่อเครื่องค้าง
+
+class Game:
+    def __init__(self, screen, dirty_rects=False, seed=None):
+        self.screen = screen
+        self.renderer = DirtyRenderer(screen.get_size(), enabled=dirty_rects)
+        # กติกา/คะแนน/เวลา อยู่ใน engine.py: โหมดปกติ (ทีละชิ้น) และโหมดเร่งด่วน (หลายชิ้นพร้อมกัน)
+        self.engines = {"classic": GameState(seed), "rush": RushState(seed)}
+        self.mode, self.engine, self.seed = "classic", self.engines["classic"], seed
+        self.store = None  # ScoreStore เมื่อรันจาก main() (บันทึกคะแนน/สถิติลงดิสก์)
+        self.leaderboard = None  # LeaderboardClient เมื่อรันด้วย --leaderboard (ตารางคะแนนของห้อง)
+        self.session, self.prev_best = None, 0
+        self.game_state = "START"
+        self.last_state = None
+        self.running = True
+        self.atlas_ready = False
+        self.deferred = []  # งานที่ไม่เร่งด่วน ทำทีละงานหลังจากแสดงเฟรมแรกแล้ว
+        self.recorder = None  # Recorder เมื่อรันด้วย --record
+        self.profiler = NULL_PROFILER  # เปลี่ยนเป็น FrameProfiler เมื่อกด F3 หรือรันด้วย --profile-log
+        self.quality, self.governor = QUALITY_TIERS[-1], None  # governor = None คือระดับคงที่
+        self.base_rotation_step = ROTATION_STEP
+        self.sim_time, self.steps = 0.0, 0
+        self.clouds = [Cloud(random.randint(0, WIDTH), random.randint(50, 150)) for _ in range(7)]
+
+        self.bin_sets = {"classic": [Bin(x, y, type_key, name) for x, y, type_key, name in BIN_LAYOUT],
+                         "rush": [Bin(x, y, type_key, name, RUSH_BIN_SCALE) for x, y, type_key, name in RUSH_BIN_LAYOUT]}
+        self.bins = self.bin_sets["classic"]
+        self.trash, self.particles = TrashItem(), ParticleSystem()
+        self.held_id = None  # โหมด rush: id ของชิ้นที่กำลังลาก
+        self.bg_shift = self.prev_bg_shift = 0
+        self.mouse_pos, self.drag_offset = pygame.mouse.get_pos(), (0, 0)
+
+        # ปุ่มหน้าเริ่มเกม (จัดตำแหน่งใหม่)
+        self.btn_start = pygame.Rect(WIDTH//2-130, 400, 260, 70)
+        self.btn_knowledge = pygame.Rect(WIDTH//2-130, 490, 260, 70)
+        self.btn_rush = pygame.Rect(WIDTH//2-130, 580, 260, 70)
+        self.btn_back = pygame.Rect(100, 120, 120, 45)
+        self.btn_pause = pygame.Rect(15, 10, 50, 50)
+
+        # ปุ่มหน้าหยุดเกม
+        self.btn_resume = pygame.Rect(WIDTH//2-125, 280, 250, 60)
+        self.btn_restart = pygame.Rect(WIDTH//2-125, 360, 250, 60)
+        self.btn_exit = pygame.Rect(WIDTH//2-125, 440, 250, 60)
+
+        self.scenes = {"START": StartScene(), "KNOWLEDGE": KnowledgeScene(),
+                       "PAUSED": PauseScene(), "GAMEOVER": GameOverScene()}
+
+    @property
+    def score(self):
+        return self.engine.score
+
+    @property
+    def time_left(self):
+        return self.engine.time_left
+
+    @property
+    def upcoming_trash(self):
+        return self.engine.upcoming
+
+    def new_round(self, mode=None):
+        self.game_state = "PLAYING"
+        self.mode = mode or self.mode
+        self.engine, self.bins = self.engines[self.mode], self.bin_sets[self.mode]
+        self.engine.step(NewRound())
+        self.session = SessionStats(self.mode, self.seed)
+        self.held_id = None
+        self.particles.clear()
+        if self.mode == "classic": self.trash.load_item(self.engine.current)
+
+    # --- รับ input ---
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            self.running = False
+            return
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED):
+            self.renderer.invalidate()
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.toggle_profiler_overlay()
+            return
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F11 and DISPLAY_MODE != "window":
+            pygame.display.toggle_fullscreen()
+            self.renderer.invalidate()
+            return
+        if hasattr(event, 'pos'):
+            self.mouse_pos = event.pos
+        mx, my = self.mouse_pos
+        trash = self.trash
+
+        if self.game_state == "START":
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if self.btn_start.collidepoint(event.pos): 
+                    self.new_round("classic")
+                if self.btn_knowledge.collidepoint(event.pos): 
+                    self.game_state = "KNOWLEDGE"
+                if self.btn_rush.collidepoint(event.pos):
+                    self.new_round("rush")
+
+        elif self.game_state == "KNOWLEDGE":
+            if event.type == pygame.MOUSEBUTTONDOWN and self.btn_back.collidepoint(event.pos): 
+                self.game_state = "START"
+
+        elif self.game_state == "PLAYING":
+            if event.type == pygame.MOUSEBUTTONDOWN and self.btn_pause.collidepoint(event.pos):
+                self.game_state = "PAUSED"
+            elif self.mode == "rush":
+                self.handle_rush_event(event)
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                if trash.rect.collidepoint(event.pos):
+                    trash.is_dragging = True
+                    self.drag_offset = (trash.rect.x - mx, trash.rect.y - my)
+                    ASSETS.play('drag')
+
+            elif event.type == pygame.MOUSEBUTTONUP and trash.is_dragging:
+                trash.is_dragging = False
+                result = self.engine.step(Drop(tuple(trash.rect)))
+                self.record_drop(result)
+                if result.outcome == 'correct':
+                    ASSETS.play('correct')
+                    self.particles.emit(trash.rect.centerx, trash.rect.centery, self.bins[result.bin_index].colors['light'],
+                                        self.quality['particles'])
+                    trash.load_item(self.engine.current)
+                else:
+                    trash.reset_position()
+                    if result.outcome == 'wrong': ASSETS.play('wrong')
+
+            elif event.type == pygame.MOUSEMOTION and trash.is_dragging:
+                trash.rect.x, trash.rect.y = mx + self.drag_offset[0], my + self.drag_offset[1]
+
+        elif self.game_state == "PAUSED":
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if self.btn_resume.collidepoint(event.pos): 
+                    self.game_state = "PLAYING"
+                elif self.btn_restart.collidepoint(event.pos):
+                    self.new_round()
+                elif self.btn_exit.collidepoint(event.pos): 
+                    self.game_state = "START"
+
+        elif self.game_state == "GAMEOVER":
+            if event.type == pygame.MOUSEBUTTONDOWN: 
+                self.game_state = "START"
+
+    def record_drop(self, result):
+        if result.reaction is not None: self.session.record(result.outcome, result.item[1], result.reaction)
+
+    def high_score(self, mode):
+        return self.store.high_score(mode) if self.store else 0
+
+    def finish_session(self):
+        # เรียกตอนหมดเวลา: ส่งผลให้เธรดเบื้องหลังเขียนลงดิสก์ ไม่รอ I/O
+        engine = self.engine
+        self.prev_best = self.high_score(self.mode)
+        self.session.finish(engine.score, engine.elapsed, getattr(engine, 'missed', 0))
+        if self.store: self.store.submit(self.session)
+        if self.leaderboard: self.leaderboard.submit(self.mode, engine.score)
+
+    def class_rank(self):
+        # (อันดับ, จำนวนผู้เล่น) ในตารางของห้องหลังส่งคะแนนรอบล่าสุด | None ถ้ายังไม่ได้คำตอบ
+        return self.leaderboard.rank(self.mode) if self.leaderboard else None
+
+    def handle_rush_event(self, event):
+        engine, (mx, my) = self.engine, self.mouse_pos
+        # รับเฉพาะปุ่มซ้าย (ปุ่มขวา/ล้อเมาส์ก็ส่ง MOUSEBUTTONDOWN) และจับได้ทีละชิ้น
+        # ไม่อย่างนั้นชิ้นที่ถืออยู่จะค้าง held ลอยนิ่งกลางจอตลอดรอบ
+        if getattr(event, 'button', 1) != 1: return
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.held_id is not None: return
+            result = engine.step(Pick(mx, my))
+            if result.outcome == 'picked':
+                item = engine.items[result.item_id]
+                self.held_id, self.drag_offset = result.item_id, (item.x - mx, item.y - my)
+                ASSETS.play('drag')
+        elif self.held_id is None:
+            return
+        elif event.type == pygame.MOUSEMOTION:
+            engine.step(MoveItem(self.held_id, mx + self.drag_offset[0], my + self.drag_offset[1]))
+        elif event.type == pygame.MOUSEBUTTONUP:
+            item = engine.items[self.held_id]
+            result = engine.step(Drop(item.rect, self.held_id))
+            self.held_id = None
+            self.record_drop(result)
+            if result.outcome == 'correct':
+                ASSETS.play('correct')
+                self.particles.emit(int(item.x) + ITEM_SIZE[0] // 2, int(item.y) + ITEM_SIZE[1] // 2,
+                                    self.bins[result.bin_index].colors['light'], self.quality['particles'])
+            elif result.outcome == 'wrong':
+                ASSETS.play('wrong')
+
+    # --- จำลองเกม 1 step ---
+    def update(self):
+        self.steps += 1
+        self.sim_time += STEP
+        paused = (self.game_state == "PAUSED")
+        self.prev_bg_shift = self.bg_shift
+        if self.game_state == "PLAYING" and self.quality['parallax']: self.bg_shift -= 0.5
+        if not paused:
+            for c in self.clouds: c.update(WIDTH)
+
+        if self.game_state == "PLAYING":
+            mark = self.profiler.mark
+            if self.mode == "rush":
+                held = self.engine.items.get(self.held_id)
+                hovered = self.engine.bin_grid.query_rect(held.rect) if held else ()
+                for i, b in enumerate(self.bins): b.update(i in hovered)
+            else:
+                for b in self.bins: b.update(b.rect.colliderect(self.trash.rect))
+            mark("update")
+            self.particles.update()
+            mark("particles")
+            if self.mode == "classic": self.trash.update(self.sim_time)
+            if self.engine.step(Tick(STEP)).outcome == 'timeout':
+                self.game_state = "GAMEOVER"
+                self.finish_session()
+        self.profiler.mark("update")
+
+    # --- วาดภาพ (blend = สัดส่วนเวลาระหว่าง step ก่อนหน้ากับปัจจุบัน) ---
+    def draw(self, blend=1.0):
+        screen, renderer, game_state = self.screen, self.renderer, self.game_state
         is_paused = (game_state == "PAUSED")
-        draw_bg(SCREEN, clouds, bg_shift, paused=is_paused)
+        if is_paused: blend = 1.0
+        if game_state != self.last_state:
+            renderer.invalidate()
+            self.last_state = game_state
+            if game_state in self.scenes: self.scenes[game_state].enter(self)
+
+        if not is_paused:
+            bg_shift = self.prev_bg_shift + (self.bg_shift - self.prev_bg_shift) * blend
+            renderer.extend(draw_bg(screen, self.clouds[:self.quality['clouds']], bg_shift, blend=blend,
+                                    parallax=self.quality['parallax']))
+        self.profiler.mark("draw_bg")
+        if game_state == "PLAYING":
+            self.draw_playfield(screen, blend=blend)
+        else:
+            self.scenes[game_state].draw(screen, self)
+            self.profiler.mark("scene")
+
+    def draw_playfield(self, screen, paused=False, blend=1.0):
+        renderer, trash, score, time_left = self.renderer, self.trash, self.score, self.time_left
+        btn_pause, mark = self.btn_pause, self.profiler.mark
+        for b in self.bins: 
+            renderer.add(b.draw(screen, paused=paused, blend=blend, glow=self.quality['glow']))
+        mark("bins")
+        p_rects = self.particles.draw(screen, blend)
+        if not paused: renderer.extend(p_rects)
+        mark("particles")
+        if self.mode == "rush":
+            renderer.extend(self.draw_rush_items(screen, paused, blend))
+        else:
+            renderer.add(trash.draw(screen, paused=paused, blend=blend, glow=self.quality['glow']))
+        mark("trash")
         
-        if game_state == "START":
-            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0,10,30,180))
-            SCREEN.blit(overlay, (0,0))
-            draw_text_with_shadow(SCREEN, "ฮีโร่รักษ์โลก", font_xl, GOLD, (WIDTH//2, 220), (5,5))
-            draw_beveled_rect(SCREEN, btn_start, (46, 180, 80) if btn_start.collidepoint(mx,my) else (36, 140, 60), 25)
-            draw_text_with_shadow(SCREEN, "เริ่มภารกิจ", font_lg, WHITE, btn_start.center)
-            draw_beveled_rect(SCREEN, btn_knowledge, (30, 120, 220) if btn_knowledge.collidepoint(mx,my) else (20, 90, 180), 25)
-            draw_text_with_shadow(SCREEN, "ศูนย์การเรียนรู้", font_lg, WHITE, btn_knowledge.center)
-            
-        elif game_state == "KNOWLEDGE":
-            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0,15,40,230))
-            SCREEN.blit(overlay, (0,0))
-            
-            # --- ปรับปรุงหน้าต่าง Knowledge UI ใหม่ ---
-            panel = pygame.Rect(80, 100, 864, 568) # ขยาย Panel
-            draw_beveled_rect(SCREEN, panel, (245, 250, 255), 35, 8)
-            draw_text_with_shadow(SCREEN, "ศูนย์การเรียนรู้เรื่องขยะ", font_lg, (20, 50, 100), (WIDTH//2, 150))
-            
-            btn_back.topleft = (100, 120)
-            draw_beveled_rect(SCREEN, btn_back, (220, 60, 60) if btn_back.collidepoint(mx,my) else (180, 50, 50), 10)
-            draw_text_with_shadow(SCREEN, "ย้อนกลับ", font_sm, WHITE, btn_back.center)
-
-         # --- นำโค้ดชุดนี้ไปวางแทนที่ ---
-            k_data = [
-                {"type": "organic", "title": "ขยะเปียก (Organic)", "info": "เศษอาหาร, กล้วย, ใบไม้", "use": ["นำไปทำปุ๋ยหมัก", "หรือก๊าซชีวภาพ"]},
-                {"type": "recycle", "title": "รีไซเคิล (Recycle)", "info": "ขวดพลาสติก, กระป๋องแก้ว", "use": ["นำไปแปรรูปเพื่อ", "นำกลับมาใช้ใหม่"]},
-                {"type": "general", "title": "ทั่วไป (General)", "info": "ถุงพลาสติก, โฟม, ทิชชู่", "use": ["ฝังกลบหรือกำจัด", "อย่างถูกวิธี"]},
-                {"type": "hazardous", "title": "อันตราย (Hazardous)", "info": "ถ่านไฟฉาย,หลอดไฟ", "use": ["คัดแยกเพื่อป้องกัน", "สารพิษรั่วไหล"]}
-            ]
-            
-            for i, d in enumerate(k_data):
-                col, row = i % 2, i // 2
-                x, y = 112 + (col * 420), 220 + (row * 210)
-                c_rect = pygame.Rect(x, y, 380, 180) 
-                color = BIN_COLORS[d['type']]
-                
-                pygame.draw.rect(SCREEN, WHITE, c_rect, border_radius=15)
-                pygame.draw.rect(SCREEN, color['base'], c_rect, 4, border_radius=15)
-                pygame.draw.rect(SCREEN, color['base'], (x, y, 380, 45), border_top_left_radius=15, border_top_right_radius=15)
-                draw_text_with_shadow(SCREEN, d['title'], font_md, WHITE, (x + 190, y + 22), (1,1))
-                
-                SCREEN.blit(font_sm.render(f"ตัวอย่าง:", True, (100,100,100)), (x + 20, y + 65))
-                SCREEN.blit(font_sm.render(d['info'], True, BLACK), (x + 110, y + 65))
-                
-                SCREEN.blit(font_sm.render(f"วิธีจัดการ:", True, (100,100,100)), (x + 20, y + 105))
-                
-                for line_idx, line_text in enumerate(d['use']):
-                    SCREEN.blit(font_sm.render(line_text, True, BLACK), (x + 110, y + 105 + (line_idx * 28)))
-
-        elif game_state in ["PLAYING", "PAUSED"]:
-            for b in bins: 
-                b.draw(SCREEN, b.rect.colliderect(trash.rect), paused=is_paused)
-            for p in particles[:]:
-                if not is_paused: p.update()
-                if p.life <= 0: particles.remove(p)
-                else: p.draw(SCREEN)
-            trash.draw(SCREEN, paused=is_paused)
-            
-            ui_rect = pygame.Rect(0,0,WIDTH,70)
-            pygame.draw.rect(SCREEN, (0,0,0, 150), ui_rect)
-            pygame.draw.line(SCREEN, GOLD, (0,70), (WIDTH,70), 3)
-            
-            draw_beveled_rect(SCREEN, btn_pause, (200, 60, 60) if btn_pause.collidepoint(mx,my) else (150, 40, 40), 10)
-            pygame.draw.rect(SCREEN, WHITE, (btn_pause.x + 15, btn_pause.y + 12, 6, 26))
-            pygame.draw.rect(SCREEN, WHITE, (btn_pause.x + 29, btn_pause.y + 12, 6, 26))
-            
-            draw_text_with_shadow(SCREEN, f"คะแนน: {score}", font_md, GOLD, (160, 35))
-            time_col = WHITE if time_left > 10 else (255, 50, 50)
-            draw_text_with_shadow(SCREEN, f"เวลา: {int(max(0, time_left))}", font_md, time_col, (WIDTH//2 - 20, 35))
-            
-            draw_text_with_shadow(SCREEN, "ถัดไป:", font_sm, WHITE, (WIDTH - 220, 35))
-            for i, data in enumerate(upcoming_trash):
+        ui_rect = pygame.Rect(0,0,WIDTH,70)
+        pygame.draw.rect(screen, (0,0,0, 150), ui_rect)
+        pygame.draw.line(screen, GOLD, (0,70), (WIDTH,70), 3)
+        
+        renderer.add(draw_beveled_rect(screen, btn_pause, (200, 60, 60) if btn_pause.collidepoint(self.mouse_pos) else (150, 40, 40), 10))
+        pygame.draw.rect(screen, WHITE, (btn_pause.x + 15, btn_pause.y + 12, 6, 26))
+        pygame.draw.rect(screen, WHITE, (btn_pause.x + 29, btn_pause.y + 12, 6, 26))
+        
+        renderer.add(draw_number_with_shadow(screen, "คะแนน: ", score, ASSETS.font('md'), GOLD, (160, 35)))
+        time_col = WHITE if time_left > 10 else (255, 50, 50)
+        renderer.add(draw_number_with_shadow(screen, "เวลา: ", int(max(0, time_left)), ASSETS.font('md'), time_col, (WIDTH//2 - 20, 35)))
+        
+        if self.mode == "rush":
+            renderer.add(draw_number_with_shadow(screen, "หลุด: ", self.engine.missed, ASSETS.font('md'), WHITE, (WIDTH - 140, 35)))
+        else:
+            draw_text_with_shadow(screen, "ถัดไป:", ASSETS.font('sm'), WHITE, (WIDTH - 220, 35))
+            for i, data in enumerate(self.upcoming_trash):
                 box_rect = pygame.Rect(WIDTH - 170 + (i * 55), 12, 46, 46)
-                draw_beveled_rect(SCREEN, box_rect, (40, 40, 60), 8)
-                SCREEN.blit(get_preview_surf(data), (box_rect.x, box_rect.y))
-            
-            if not is_paused:
-                time_left -= 1/60
-                if time_left <= 0: game_state = "GAMEOVER"
-                
-            if is_paused:
-                overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-                overlay.fill((0,0,0,200))
-                SCREEN.blit(overlay, (0,0))
-                draw_text_with_shadow(SCREEN, "หยุดพัก", font_xl, WHITE, (WIDTH//2, 160), (4,4))
-                draw_beveled_rect(SCREEN, btn_resume, (46, 180, 80) if btn_resume.collidepoint(mx,my) else (36, 140, 60), 20)
-                draw_text_with_shadow(SCREEN, "ทำต่อ (Resume)", font_md, WHITE, btn_resume.center)
-                draw_beveled_rect(SCREEN, btn_restart, (255, 140, 0) if btn_restart.collidepoint(mx,my) else (200, 100, 0), 20)
-                draw_text_with_shadow(SCREEN, "เริ่มใหม่ (Restart)", font_md, WHITE, btn_restart.center)
-                draw_beveled_rect(SCREEN, btn_exit, (220, 60, 60) if btn_exit.collidepoint(mx,my) else (180, 50, 50), 20)
-                draw_text_with_shadow(SCREEN, "ออก (Exit)", font_md, WHITE, btn_exit.center)
-
-        elif game_state == "GAMEOVER":
-            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0,0,0,220))
-            SCREEN.blit(overlay, (0,0))
-            draw_text_with_shadow(SCREEN, "จบภารกิจ!", font_xl, (255, 80, 80), (WIDTH//2, 280), (4,4))
-            draw_text_with_shadow(SCREEN, f"คะแนนรวม: {score}", font_xl, GOLD, (WIDTH//2, 380), (4,4))
-            if pygame.time.get_ticks() % 1000 < 500:
-                draw_text_with_shadow(SCREEN, "- คลิกเพื่อเริ่มใหม่ -", font_sm, OFF_WHITE, (WIDTH//2, 520))
-
-        pygame.display.flip()
-        clock.tick(60)
+                draw_beveled_rect(screen, box_rect, (40, 40, 60), 8)
+                screen.blit(get_preview_surf(data), (box_rect.x, box_rect.y))
+                renderer.add(box_rect)
+        mark("hud")
+
+    def draw_rush_items(self, screen, paused=False, blend=1.0):
+        # วาดทุกชิ้นด้วย blits ครั้งเดียว (เรียงตาม id ชิ้นใหม่อยู่บน) ชิ้นที่ถืออยู่วาดทับสุดพร้อมชื่อ
+        if paused: blend = 1.0
+        t = self.sim_time - STEP * (1 - blend)
+        cx, cy = ITEM_SIZE[0] / 2, ITEM_SIZE[1] / 2
+        held, batch = None, []
+        for item in self.engine.items.values():
+            if item.id == self.held_id:
+                held = item
+                continue
+            frame = get_atlas(item.data).frame(item.spin * t)
+            x = item.px + (item.x - item.px) * blend + cx
+            y = item.py + (item.y - item.py) * blend + cy
+            batch.append((frame, (int(x - frame.get_width() / 2), int(y - frame.get_height() / 2))))
+        rects = screen.blits(batch)
+        if held:
+            if self.quality['glow'] and not paused:
+                rects.append(screen.blit(get_drag_glow_surf(), (int(held.x + cx) - 75, int(held.y + cy) - 75)))
+            frame = get_atlas(held.data).frame(held.spin * t)
+            rects.append(screen.blit(frame, frame.get_rect(center=(int(held.x + cx), int(held.y + cy)))))
+            rects.append(draw_text_with_shadow(screen, held.data[0], ASSETS.font('sm'), WHITE, (int(held.x + cx), int(held.y) - 30)))
+        return [] if paused else rects
+
+    def apply_quality(self, tier):
+        self.quality = QUALITY_TIERS[tier]
+        rotation_step = self.base_rotation_step * self.quality['rotation_scale']
+        if rotation_step != ROTATION_STEP: set_rotation_step(rotation_step)
+        self.atlas_ready = False
+        self.invalidate_scenes()
+
+    def toggle_profiler_overlay(self):
+        if not self.profiler.enabled: self.profiler = FrameProfiler()
+        self.profiler.toggle_overlay()
+        self.renderer.invalidate()
+
+    def invalidate_scenes(self):
+        # เรียกเมื่อสิ่งที่เลเยอร์นิ่งใช้วาดเปลี่ยนไป (ตอนนี้คือระดับคุณภาพจาก apply_quality) เพื่อให้วาดใหม่
+        for scene in self.scenes.values(): scene.invalidate()
+        self.renderer.invalidate()
+
+    # --- วนลูปหลัก ---
+    # target_fps = 0 คือไม่จำกัดเฟรมเรต | realtime=False จะเดิน 1 step ต่อเฟรมเสมอ
+    # (ใช้รันเร็วกว่าเวลาจริงตอนทดสอบ)
+    def run(self, target_fps=60, realtime=True, max_frames=None):
+        clock = pygame.time.Clock()
+        accumulator, frames = 0.0, 0
+        while self.running and (max_frames is None or frames < max_frames):
+            profiler = self.profiler
+            profiler.begin_frame()
+            for event in pygame.event.get():
+                if self.recorder: self.recorder.record(self.steps, event)
+                self.handle_event(event)
+            profiler.mark("events")
+            if realtime:
+                while accumulator >= STEP:
+                    self.update()
+                    accumulator -= STEP
+                self.draw(accumulator / STEP)
+            else:
+                self.update()
+                self.draw()
+            if profiler.overlay:
+                self.renderer.add(profiler.draw_overlay(self.screen, self.renderer))
+                profiler.mark("overlay")
+            self.renderer.present()
+            profiler.mark("flip+tick")
+            if self.deferred:
+                self.deferred.pop(0)()
+            elif self.game_state == "START" and not self.atlas_ready:
+                self.atlas_ready = warm_up_atlases()
+            profiler.mark("deferred")
+            frame_time = clock.tick(target_fps) / 1000
+            profiler.mark("flip+tick")
+            if self.governor and self.game_state == "PLAYING":
+                tier = self.governor.observe(clock.get_rawtime())
+                if tier is not None:
+                    self.apply_quality(tier)
+                    save_quality_tier(tier)
+            profiler.end_frame()
+            accumulator += min(frame_time, MAX_FRAME_TIME)
+            frames += 1
+
+def main(dirty_rects=False, target_fps=60, realtime=True, rotation_step=ROTATION_STEP, startup_report=False,
+         record=None, profile_log=None, quality="auto", display="window", smooth=False, leaderboard=None, player=None):
+    set_rotation_step(rotation_step)
+    screen = init_display(mode=display, smooth=smooth)
+    STARTUP.mark("open display")
+    get_sprite_sheet()
+    STARTUP.mark("sprite sheet")
+    seed = None
+    if record is not None:
+        # seed เดียวกันทั้งกติกาและ random กลาง (เมฆ/อนุภาค) เพื่อให้เล่นซ้ำได้ภาพเดิม
+        seed = int.from_bytes(os.urandom(4), 'little')
+        random.seed(seed)
+    game = Game(screen, dirty_rects=dirty_rects, seed=seed)
+    if record is not None:
+        game.recorder = Recorder(record or new_record_path(), seed)
+        print(f"recording to {game.recorder.path}")
+    if profile_log: game.profiler = FrameProfiler(profile_log)
+    game.store = ScoreStore()
+    if leaderboard:
+        from leaderboard import LeaderboardClient  # import เฉพาะเมื่อใช้ (leaderboard.py ดึง asyncio มาด้วย ~24 ms)
+        game.leaderboard = LeaderboardClient(leaderboard, player)
+    if quality == "auto":
+        # เริ่มจากระดับที่เครื่องนี้ใช้ครั้งก่อน แล้วให้ governor ปรับต่อ
+        game.governor = QualityGovernor(load_quality_tier(), target_fps)
+        game.apply_quality(game.governor.tier)
+    else:
+        game.apply_quality(QUALITY_NAMES.index(quality))
+    STARTUP.mark("create game")
+    game.deferred = [lambda: STARTUP.mark("first frame shown"),
+                     ASSETS.preload_sounds, lambda: STARTUP.mark("sounds (deferred)")]
+    if startup_report:
+        game.deferred.append(lambda: print(STARTUP.report()))
+    try:
+        game.run(target_fps=target_fps, realtime=realtime)
+    finally:
+        if game.recorder: game.recorder.close(game)
+        game.profiler.close()
+        game.store.close()
+        if game.leaderboard: game.leaderboard.close()
+    pygame.quit()
+    sys.exit()
+
+def positive_float(text):
+    value = float(text)
+    if not value > 0: raise argparse.ArgumentTypeError(f"must be greater than 0: {text}")
+    return value
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Eco Hero: Ultra Thai Edition")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="อัปเดตจอเฉพาะส่วนที่เปลี่ยน (ประหยัด CPU/แบตเตอรี่ในโหมด kiosk)")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="เฟรมเรตสูงสุด (0 = ไม่จำกัด) ความเร็วเกมไม่ขึ้นกับค่านี้")
+    parser.add_argument("--rotation-step", type=positive_float, default=ROTATION_STEP,
+                        help="ความละเอียดของภาพหมุนล่วงหน้า (องศา)")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="แสดงเวลาที่ใช้ในแต่ละช่วงของการเปิดเกม")
+    parser.add_argument("--atlas-report", action="store_true",
+                        help="สร้างภาพหมุนทั้งหมดแล้วแสดงขนาดหน่วยความจำที่ใช้ จากนั้นออก")
+    parser.add_argument("--record", nargs="?", const="", metavar="FILE",
+                        help="บันทึก input ทั้งหมดลงไฟล์ .ecorec (ไม่ระบุชื่อ = เก็บในโฟลเดอร์ cache) เล่นซ้ำด้วย replay.py")
+    parser.add_argument("--quality", choices=["auto"] + QUALITY_NAMES, default="auto",
+                        help="ระดับเอฟเฟกต์ (auto = ปรับตามความเร็วเครื่องและจำค่าไว้)")
+    parser.add_argument("--profile-log", metavar="FILE",
+                        help="บันทึกเวลาของแต่ละช่วงในทุกเฟรมลงไฟล์ .csv หรือ .jsonl (กด F3 เพื่อดูบนจอ)")
+    parser.add_argument("--display", choices=DISPLAY_MODES, default="window",
+                        help="scaled/fullscreen = ขยายภาพให้เต็มจอโปรเจกเตอร์/4K โดยเกมยังวาดที่ 1024x720 (F11 สลับเต็มจอ)")
+    parser.add_argument("--smooth", action="store_true",
+                        help="ขยายภาพแบบ linear (เนียนกว่าเมื่อขยายไม่ลงตัว เช่น 1.5 เท่า)")
+    parser.add_argument("--leaderboard", metavar="HOST[:PORT]",
+                        help="ส่งคะแนนทุกรอบไปยังตารางคะแนนของห้อง (python leaderboard.py serve บนเครื่องครู)")
+    parser.add_argument("--player", help="ชื่อที่แสดงในตารางคะแนนของห้อง (ค่าเริ่มต้นคือชื่อเครื่อง)")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.atlas_report:
+        init_display()
+        set_rotation_step(args.rotation_step)
+        while not warm_up_atlases(budget=1.0): pass
+        report = atlas_memory_report()
+        for name, a in report['atlases'].items():
+            print(f"{name:40s} {a['frame_count']:4d} frames {a['bytes'] / 1024:9.1f} KiB")
+        print(f"sprite sheet {report['sheet_bytes'] / 1024:9.1f} KiB")
+        print(f"rotation step {report['rotation_step']}°  total {report['total_bytes'] / 1024 / 1024:.2f} MiB")
+        sys.exit()
+    main(dirty_rects=args.dirty_rects, target_fps=args.fps, rotation_step=args.rotation_step,
+         startup_report=args.startup_report, record=args.record,
+         profile_log=args.profile_log, quality=args.quality, display=args.display, smooth=args.smooth,
+         leaderboard=args.leaderboard, player=args.player)
\ No newline at end of file
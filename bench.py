@@ -0,0 +1,305 @@
+# --- ชุดวัดประสิทธิภาพ (รันแบบไม่มีหน้าจอด้วย SDL dummy driver) ---
+# python bench.py -o bench.json                    วัดทุกรายการแล้วบันทึกผลเป็น JSON
+# python bench.py --only draw_bg frame_PLAYING     วัดเฉพาะบางรายการ
+# python bench.py --baseline old.json              เทียบกับผลเดิม (exit code 1 ถ้าช้าลงเกินกำหนด)
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+import pygame
+import Echo
+import content
+import engine as engine_mod
+from simulate import percentile
+
+BENCHMARKS = {}
+
+def benchmark(name):
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+def time_calls(fn, iterations, warmup=5):
+    for _ in range(warmup): fn()
+    timings = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    return timings
+
+def summarize(timings):
+    ms = sorted(t * 1000 for t in timings)
+    return {'frames': len(ms), 'mean_ms': sum(ms) / len(ms) if ms else 0.0,
+            'min_ms': ms[0] if ms else 0.0, 'max_ms': ms[-1] if ms else 0.0,
+            'p50_ms': percentile(ms, 50), 'p90_ms': percentile(ms, 90),
+            'p95_ms': percentile(ms, 95), 'p99_ms': percentile(ms, 99)}
+
+# --- เครื่องมือช่วยสร้างสถานะเกม ---
+def make_game(state="START", dirty_rects=False):
+    random.seed(1234)
+    game = Echo.Game(Echo.SCREEN, dirty_rects=dirty_rects)
+    if state != "START":
+        game.new_round()
+        for _ in range(30): game.update()
+        game.game_state = state
+    return game
+
+def frame(game):
+    game.update()
+    game.draw()
+    game.renderer.present()
+
+def mouse(kind, pos):
+    if kind == pygame.MOUSEMOTION:
+        return pygame.event.Event(kind, pos=pos, rel=(0, 0), buttons=(1, 0, 0))
+    return pygame.event.Event(kind, pos=pos, button=1)
+
+# --- จุดที่ถูกเรียกทุกเฟรม ---
+def _bench_draw_bg(quality):
+    def bench(iterations):
+        clouds = [Echo.Cloud(random.randint(0, Echo.WIDTH), random.randint(50, 150)) for _ in range(quality['clouds'])]
+        shift = [0.0]
+        def run():
+            for c in clouds: c.update(Echo.WIDTH)
+            shift[0] -= 0.5
+            Echo.draw_bg(Echo.SCREEN, clouds, shift[0], parallax=quality['parallax'])
+        return time_calls(run, iterations)
+    return bench
+
+benchmark("draw_bg")(_bench_draw_bg(Echo.QUALITY_TIERS[-1]))
+benchmark("draw_bg_low")(_bench_draw_bg(Echo.QUALITY_TIERS[0]))
+
+def _bench_bin(iterations, hover):
+    b = Echo.Bin(*Echo.BIN_LAYOUT[1])
+    def run():
+        b.update(hover)
+        b.draw(Echo.SCREEN)
+    return time_calls(run, iterations)
+
+@benchmark("bin_draw")
+def bench_bin_draw(iterations):
+    return _bench_bin(iterations, False)
+
+@benchmark("bin_draw_hover")
+def bench_bin_draw_hover(iterations):
+    return _bench_bin(iterations, True)
+
+@benchmark("trash_draw_rotating")
+def bench_trash_draw(iterations):
+    trash = Echo.TrashItem()
+    trash.load_item(Echo.TRASH_TYPES[0])
+    step = [0]
+    def run():
+        step[0] += 1
+        trash.update(step[0] * Echo.STEP)
+        trash.draw(Echo.SCREEN)
+    return time_calls(run, iterations)
+
+def _bench_shape(data):
+    def bench(iterations):
+        trash = Echo.TrashItem()
+        trash.shape = data[3]
+        surf = pygame.Surface((100, 100), pygame.SRCALPHA)
+        def run():
+            surf.fill((0, 0, 0, 0))
+            trash.draw_to_surface(surf, data[2])
+        return time_calls(run, iterations)
+    return bench
+
+for _data in Echo.TRASH_TYPES:
+    benchmark(f"draw_to_surface_{_data[3]}")(_bench_shape(_data))
+
+@benchmark("particle_burst")
+def bench_particle_burst(iterations):
+    # 4 ชุดพร้อมกัน (ผู้เล่นวางถูกติดกันเร็วๆ) แล้วอัปเดต+วาดจนหมด
+    def run():
+        particles = Echo.ParticleSystem()
+        for k in range(4): particles.emit(200 + k * 150, 400, (165, 214, 167), 25)
+        while len(particles):
+            particles.update()
+            particles.draw(Echo.SCREEN)
+    return time_calls(run, iterations, warmup=1)
+
+# --- sprite sheet ของ content pack: ถอดรหัสภาพเดียว เทียบกับวาดทุกรูปทรงใหม่ (build) ---
+SHEET_COUNTS = [len(Echo.CONTENT.trash_types), 300]
+
+def synthetic_pack(count):
+    # ขยะ count ชนิดจากรูปทรงเดิมแต่สีต่างกัน (จำลอง content pack ขนาดใหญ่)
+    with open(content.DEFAULT_PACK, encoding='utf-8') as f: data = json.load(f)
+    rng = random.Random(count)
+    items = data['items']
+    data['items'] = [dict(items[i % len(items)], name=f"item {i}", color=[rng.randrange(256) for _ in range(3)])
+                     for i in range(count)]
+    return content.ContentPack(data)
+
+def _bench_sheet(count, bake):
+    def bench(iterations):
+        pack = synthetic_pack(count)
+        directory = Echo.get_cache_dir('bench_atlas')
+        content.load_atlas(pack, [directory])
+        if bake: run = lambda: content.bake_atlas(pack)
+        else: run = lambda: Echo.optimize_surf(content.load_atlas(pack, [directory])[0], True)
+        return time_calls(run, min(iterations, 20), warmup=1)
+    return bench
+
+for _count in SHEET_COUNTS:
+    benchmark(f"sprite_sheet_load_{_count}")(_bench_sheet(_count, False))
+    benchmark(f"sprite_sheet_bake_{_count}")(_bench_sheet(_count, True))
+
+# --- เฟรมเต็มของแต่ละหน้าจอ ---
+def _bench_state(state):
+    def bench(iterations):
+        game = make_game(state)
+        def run():
+            frame(game)
+            game.game_state = state  # กันเวลาหมดระหว่างวัด
+            game.engine.time_left = max(game.engine.time_left, 30)
+        return time_calls(run, iterations)
+    return bench
+
+for _state in ["START", "KNOWLEDGE", "PLAYING", "PAUSED", "GAMEOVER"]:
+    benchmark(f"frame_{_state}")(_bench_state(_state))
+
+# --- โหมดเร่งด่วน: เวลาต่อเฟรมเมื่อจำนวนชิ้นบนจอเพิ่มขึ้น ---
+RUSH_COUNTS = [10, 50, 100, 200, 400]
+
+def make_rush_game(count):
+    game = make_game()
+    game.new_round("rush")
+    engine = game.engine
+    engine.max_items = count
+    rng = random.Random(count)
+    while len(engine.items) < count:
+        engine.spawn(y=rng.uniform(engine_mod.RUSH_TOP, engine_mod.RUSH_FLOOR - 10))
+    return game
+
+def _bench_rush_frame(count):
+    def bench(iterations):
+        game = make_rush_game(count)
+        engine, rng = game.engine, random.Random(1)
+        def run():
+            frame(game)
+            engine.time_left = max(engine.time_left, 30)
+            while len(engine.items) < count: engine.spawn(y=rng.uniform(engine_mod.RUSH_TOP, engine_mod.RUSH_FLOOR - 10))
+        return time_calls(run, iterations)
+    return bench
+
+def _bench_rush_pick(count):
+    # จับ + ปล่อยนอกถัง 100 ครั้ง (ค้นหาชิ้นบนสุดใต้เมาส์และหาถังด้วย spatial grid)
+    def bench(iterations):
+        engine = make_rush_game(count).engine
+        rng = random.Random(2)
+        points = [(rng.uniform(0, Echo.WIDTH), rng.uniform(engine_mod.RUSH_TOP, engine_mod.RUSH_FLOOR)) for _ in range(100)]
+        def run():
+            for x, y in points:
+                result = engine.step(engine_mod.Pick(x, y))
+                if result.item_id is not None:
+                    engine.step(engine_mod.Drop(engine.items[result.item_id].rect, result.item_id))
+        return time_calls(run, iterations)
+    return bench
+
+for _count in RUSH_COUNTS:
+    benchmark(f"frame_RUSH_{_count}")(_bench_rush_frame(_count))
+    benchmark(f"rush_pick_{_count}")(_bench_rush_pick(_count))
+
+# --- เล่นตามสคริปต์ (ลาก-วางทั้งถูกและผิดถัง) ผ่าน handle_event/update/draw เหมือน main() ---
+def scripted_events(game, rng, error_rate=0.2):
+    # generator คืนรายการ event ของแต่ละเฟรม
+    yield [mouse(pygame.MOUSEBUTTONDOWN, game.btn_start.center)]
+    while True:
+        for _ in range(rng.randint(5, 20)): yield []
+        trash = game.trash
+        start = trash.rect.center
+        yield [mouse(pygame.MOUSEBUTTONDOWN, start)]
+        bins = [b for b in game.bins if b.type == trash.type]
+        if rng.random() < error_rate: bins = [b for b in game.bins if b.type != trash.type]
+        target = rng.choice(bins).rect.center
+        for i in range(1, 21):
+            t = i / 20
+            pos = (int(start[0] + (target[0] - start[0]) * t), int(start[1] + (target[1] - start[1]) * t))
+            yield [mouse(pygame.MOUSEMOTION, pos)]
+        yield [mouse(pygame.MOUSEBUTTONUP, target)]
+
+RENDERER_STATS = {}  # ชื่อรายการ -> DirtyRenderer.stats() ของรายการที่เปิด dirty rects
+
+def _bench_scripted_session(name, dirty_rects):
+    def bench(iterations):
+        game = make_game(dirty_rects=dirty_rects)
+        events = scripted_events(game, random.Random(99))
+        def run():
+            for event in next(events): game.handle_event(event)
+            frame(game)
+            if game.game_state == "GAMEOVER": game.new_round()
+        timings = time_calls(run, iterations, warmup=0)
+        if dirty_rects: RENDERER_STATS[name] = game.renderer.stats()
+        return timings
+    return bench
+
+benchmark("scripted_session")(_bench_scripted_session("scripted_session", False))
+benchmark("scripted_session_dirty")(_bench_scripted_session("scripted_session_dirty", True))
+
+def run_benchmarks(names, iterations):
+    results = {}
+    for name in names:
+        timings = BENCHMARKS[name](iterations)
+        results[name] = summarize(timings)
+        print(f"{name:32s} mean {results[name]['mean_ms']:8.3f} ms   p95 {results[name]['p95_ms']:8.3f} ms   p99 {results[name]['p99_ms']:8.3f} ms")
+    return results
+
+def compare(results, baseline, tolerance, metric='p95_ms'):
+    regressions = []
+    for name, stats in results.items():
+        old = baseline.get('results', {}).get(name)
+        if old and old[metric] > 0 and stats[metric] > old[metric] * (1 + tolerance):
+            regressions.append((name, old[metric], stats[metric]))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eco Hero benchmark suite")
+    parser.add_argument("-n", "--iterations", type=int, default=300)
+    parser.add_argument("-o", "--output", help="ไฟล์ JSON สำหรับบันทึกผล")
+    parser.add_argument("--only", nargs="*", help="ชื่อรายการที่จะวัด")
+    parser.add_argument("--list", action="store_true", help="แสดงรายชื่อรายการทั้งหมด")
+    parser.add_argument("--baseline", help="ไฟล์ JSON ผลเดิมสำหรับเทียบ")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="ช้าลงได้ไม่เกินกี่เท่า (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+    names = args.only or list(BENCHMARKS)
+    Echo.init_display()
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown: parser.error(f"unknown benchmark: {', '.join(unknown)}")
+
+    report = {'python': platform.python_version(), 'pygame': pygame.version.ver,
+              'platform': platform.platform(), 'numpy': Echo.np is not None,
+              'iterations': args.iterations, 'results': run_benchmarks(names, args.iterations)}
+    report['atlas'] = {k: v for k, v in Echo.atlas_memory_report().items() if k != 'atlases'}
+    report['text_cache'] = text = Echo.TEXT_CACHE.stats()
+    print(f"text cache: hit rate {text['hit_rate']:.1%} ({text['hits']} hits, {text['misses']} misses, {text['size']} entries)")
+    if RENDERER_STATS:
+        report['renderer'] = RENDERER_STATS
+        for name, r in RENDERER_STATS.items():
+            print(f"{name}: dirty rects partial {r['partial_ratio']:.1%} ({r['partial_frames']} partial, {r['full_frames']} full)")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f: json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f: baseline = json.load(f)
+        regressions = compare(report['results'], baseline, args.tolerance)
+        for name, old, new in regressions:
+            print(f"REGRESSION {name}: p95 {old:.3f} ms -> {new:.3f} ms")
+        if regressions: return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+# --- ชุดเนื้อหา (content pack): ขยะ ประเภทถัง สีถัง ข้อความศูนย์การเรียนรู้ และรูปทรง อยู่ในไฟล์ JSON ---
+# รูปทรงเป็นรายการคำสั่ง pygame.draw ถูกวาดครั้งเดียวตอน build ลง atlas PNG + index (แคชตาม hash ของเนื้อหา)
+# ตอนเล่นจึงโหลดภาพเดียวแล้วตัดเป็น subsurface ไม่ต้องวาดใหม่
+# python content.py build                        สร้าง atlas ของ packs/default.json ลง packs/baked/
+# python content.py check packs/my_pack.json     ตรวจว่าทุกขยะอ้างประเภท/รูปทรงที่มีอยู่จริง และถังครบ 4 ประเภท
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+
+PACK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'packs')
+DEFAULT_PACK = os.path.join(PACK_DIR, 'default.json')
+BAKED_DIR = os.path.join(PACK_DIR, 'baked')
+ATLAS_VERSION = 1
+MODEL_SIZE, PREVIEW_SIZE = 100, 45
+# ประเภทถังที่เกมรองรับ: ตำแหน่งถัง (engine.BIN_LAYOUT) และไอคอนบนถัง (Echo.Bin) ออกแบบไว้สำหรับ 4 ประเภทนี้
+CATEGORY_KEYS = ("organic", "recycle", "general", "hazardous")
+COLOR_KEYS = ("base", "light", "dark", "glow", "icon")
+DRAW_OPS = {'rect', 'polygon', 'circle', 'ellipse', 'line', 'lines', 'arc'}
+
+# รูปแบบคำสั่งวาด: [ฟังก์ชันใน pygame.draw, สี หรือ "$color" (สีของขยะชิ้นนั้น), อาร์กิวเมนต์..., {keyword}]
+class ContentPack:
+    def __init__(self, data):
+        self.name = data.get('name', '')
+        self.categories = {c['key']: c for c in data['categories']}
+        self.bin_colors = {c['key']: {k: tuple(v) for k, v in c['colors'].items()} for c in data['categories']}
+        self.knowledge = [dict(type=c['key'], **c['knowledge']) for c in data['categories'] if 'knowledge' in c]
+        self.shapes = data['shapes']
+        self.trash_types = [(i['name'], i['category'], tuple(i['color']), i['shape']) for i in data['items']]
+        self.check()
+
+    def check(self):
+        if sorted(self.categories) != sorted(CATEGORY_KEYS):
+            raise ValueError(f"categories must be exactly {', '.join(CATEGORY_KEYS)}")
+        for key, c in self.categories.items():
+            if not c.get('name'): raise ValueError(f"category {key}: missing name (ป้ายบนถัง)")
+            missing = [k for k in COLOR_KEYS if k not in c['colors']]
+            if missing: raise ValueError(f"category {key}: missing colors {', '.join(missing)}")
+        for name, category, color, shape in self.trash_types:
+            if category not in self.categories: raise ValueError(f"{name}: unknown category {category!r}")
+            if len(color) not in (3, 4): raise ValueError(f"{name}: color must be RGB or RGBA")
+            if shape not in self.shapes: raise ValueError(f"{name}: unknown shape {shape!r}")
+        for shape, ops in self.shapes.items():
+            for op in ops:
+                if op[0] not in DRAW_OPS: raise ValueError(f"shape {shape}: unknown draw op {op[0]!r}")
+
+    def shape_ops(self, shape):
+        return self.shapes[shape]
+
+    def sprites(self):
+        # (รูปทรง, สี) ที่ไม่ซ้ำกัน ตามลำดับในไฟล์
+        return list(dict.fromkeys((shape, color) for _, _, color, shape in self.trash_types))
+
+    def atlas_hash(self):
+        # hash เฉพาะสิ่งที่มีผลกับภาพ: แก้ชื่อหรือข้อความความรู้ไม่ต้อง build ใหม่
+        sprites = [[shape, color, self.shape_ops(shape)] for shape, color in self.sprites()]
+        return hashlib.sha1(json.dumps([ATLAS_VERSION, MODEL_SIZE, PREVIEW_SIZE, sprites]).encode()).hexdigest()[:16]
+
+PACK_CACHE = {}
+def default_pack_path():
+    return os.environ.get('ECO_HERO_PACK') or DEFAULT_PACK
+
+def load_pack(path=None):
+    path = path or default_pack_path()
+    if path not in PACK_CACHE:
+        with open(path, encoding='utf-8') as f: PACK_CACHE[path] = ContentPack(json.load(f))
+    return PACK_CACHE[path]
+
+def sprite_key(shape, color):
+    return f"{shape}:{','.join(map(str, color))}"
+
+# --- build: วาดทุกรูปทรงลงภาพเดียว (ต้องใช้ pygame) ---
+def draw_shape(surf, ops, color):
+    import pygame
+    for fn, c, *args in ops:
+        kwargs = args.pop() if args and isinstance(args[-1], dict) else {}
+        getattr(pygame.draw, fn)(surf, color if c == "$color" else c, *args, **kwargs)
+
+def pack_rects(sizes, width):
+    # shelf packing: เรียงจากสูงไปต่ำ วางซ้ายไปขวาทีละแถว | คืนค่า (ตำแหน่งตามลำดับเดิม, ความสูงรวม)
+    pos, x, y, shelf = [None] * len(sizes), 0, 0, 0
+    for i in sorted(range(len(sizes)), key=lambda i: -sizes[i][1]):
+        w, h = sizes[i]
+        if x + w > width: x, y, shelf = 0, y + shelf, 0
+        pos[i] = (x, y)
+        x, shelf = x + w, max(shelf, h)
+    return pos, y + shelf
+
+def bake_atlas(pack):
+    # เก็บเฉพาะส่วนที่ใช้จริง: ภาพตัดขอบใส (ใช้หมุน) และภาพคิว 45x45 อัดชิดกัน | คืนค่า (Surface, index)
+    import pygame
+    sprites, half = pack.sprites(), MODEL_SIZE // 2
+    models, crops = [], []
+    for shape, color in sprites:
+        model = pygame.Surface((MODEL_SIZE, MODEL_SIZE), pygame.SRCALPHA)
+        draw_shape(model, pack.shape_ops(shape), color)
+        # ตัดขอบใสออกแบบสมมาตรรอบจุดกึ่งกลาง ภาพหมุนจะเล็กลงแต่จุดหมุนยังอยู่ที่เดิม
+        br = model.get_bounding_rect()
+        hx = max(1, half - br.left, br.right - half)
+        hy = max(1, half - br.top, br.bottom - half)
+        models.append(model)
+        crops.append(pygame.Rect(half - hx, half - hy, hx * 2, hy * 2))
+    sizes = [c.size for c in crops] + [(PREVIEW_SIZE, PREVIEW_SIZE)] * len(sprites)
+    width = max([w for w, _ in sizes] + [math.ceil(math.sqrt(sum(w * h for w, h in sizes)) * 1.1)])
+    pos, height = pack_rects(sizes, width)
+    sheet = pygame.Surface((width, max(1, height)), pygame.SRCALPHA)
+    index = {'version': ATLAS_VERSION, 'hash': pack.atlas_hash(), 'size': sheet.get_size(), 'sprites': {}}
+    for i, ((shape, color), model, crop) in enumerate(zip(sprites, models, crops)):
+        (sx, sy), (px, py) = pos[i], pos[len(sprites) + i]
+        sheet.blit(model, (sx, sy), crop)
+        pygame.transform.scale(model, (PREVIEW_SIZE, PREVIEW_SIZE), sheet.subsurface((px, py, PREVIEW_SIZE, PREVIEW_SIZE)))
+        index['sprites'][sprite_key(shape, color)] = {'sprite': [sx, sy, crop.w, crop.h],
+                                                      'preview': [px, py, PREVIEW_SIZE, PREVIEW_SIZE]}
+    return sheet, index
+
+def atlas_paths(directory, pack):
+    base = os.path.join(directory, pack.atlas_hash())
+    return base + '.png', base + '.json'
+
+def atomic_write(path, writer, mode='wb'):
+    # writer(f) เขียนลงไฟล์ชั่วคราวก่อนแล้วค่อย os.replace: ผู้อ่านเห็นแต่ไฟล์เดิมหรือไฟล์ที่ครบแล้ว
+    # เขียนไม่สำเร็จ (ดิสก์เต็ม/ไม่มีสิทธิ์) ลบไฟล์ชั่วคราวทิ้ง ไม่ให้ค้างในโฟลเดอร์แคช
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, mode, encoding=None if 'b' in mode else 'utf-8') as f: writer(f)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+def save_atlas(directory, sheet, index):
+    import pygame
+    os.makedirs(directory, exist_ok=True)
+    png, idx = os.path.join(directory, index['hash'] + '.png'), os.path.join(directory, index['hash'] + '.json')
+    atomic_write(png, lambda f: pygame.image.save(sheet, f, 'PNG'))
+    # index เขียนทีหลัง: มี index แปลว่า PNG ครบแล้ว
+    atomic_write(idx, lambda f: json.dump(index, f, ensure_ascii=False), 'w')
+    return png, idx
+
+def load_atlas(pack, dirs, save=True):
+    # หาไฟล์ที่ build ไว้แล้วตามลำดับ dirs (ถอดรหัสภาพครั้งเดียว) ไม่เจอจึงวาดเองแล้วเก็บลง dirs[-1] (ถ้า save)
+    import pygame
+    for directory in dirs:
+        png, idx = atlas_paths(directory, pack)
+        if os.path.exists(idx):
+            try:
+                with open(idx, encoding='utf-8') as f: index = json.load(f)
+                return pygame.image.load(png), index
+            except (OSError, ValueError, pygame.error):
+                pass
+    sheet, index = bake_atlas(pack)
+    if not save: return sheet, index
+    try:
+        save_atlas(dirs[-1], sheet, index)
+    except OSError:
+        pass  # โฟลเดอร์เขียนไม่ได้: ใช้ภาพที่เพิ่งวาดไปก่อน รอบหน้าวาดใหม่
+    return sheet, index
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eco Hero content packs")
+    parser.add_argument("command", choices=["build", "check"])
+    parser.add_argument("pack", nargs="?", default=None, help="ไฟล์ JSON (ค่าเริ่มต้น packs/default.json)")
+    parser.add_argument("-o", "--out", default=BAKED_DIR, help="โฟลเดอร์เก็บ atlas")
+    parser.add_argument("--force", action="store_true", help="build ใหม่แม้มีไฟล์ของ hash นี้แล้ว")
+    args = parser.parse_args(argv)
+
+    try:
+        pack = load_pack(args.pack)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"invalid pack: {e!r}", file=sys.stderr)
+        return 1
+    print(f"{pack.name}: {len(pack.trash_types)} items, {len(pack.categories)} categories, "
+          f"{len(pack.sprites())} sprites, atlas {pack.atlas_hash()}")
+    if args.command == "check": return 0
+
+    png, idx = atlas_paths(args.out, pack)
+    if os.path.exists(idx) and not args.force:
+        print(f"up to date: {png}")
+        return 0
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    t0 = time.perf_counter()
+    sheet, index = bake_atlas(pack)
+    png, idx = save_atlas(args.out, sheet, index)
+    print(f"{png} {sheet.get_width()}x{sheet.get_height()} in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,11 @@
 
 
 a = Analysis(
-    ['basic.py'],
+    ['Echo.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    # content pack (และ atlas ที่ build ไว้ด้วย python content.py build) ต้องมีตอน import engine
+    datas=[('packs', 'packs')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
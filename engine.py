@@ -0,0 +1,314 @@
+# --- กติกาเกมล้วนๆ (ไม่ใช้ pygame) ---
+# หน้าจอใน Echo.py และตัวจำลองใน simulate.py ขับเคลื่อนเกมผ่าน GameState.step(action) ชุดเดียวกัน
+import random
+from collections import defaultdict
+from typing import NamedTuple, Optional, Tuple
+
+from content import CATEGORY_KEYS, load_pack
+
+WIDTH, HEIGHT = 1024, 720
+STEP = 1 / 60
+
+ROUND_TIME = 60.0
+CORRECT_SCORE = 20
+WRONG_PENALTY = 8.0
+QUEUE_LENGTH = 3  # จำนวนชิ้นในคิว "ถัดไป"
+
+# ขยะประเภทต่างๆ: (ชื่อ, ประเภทถัง, สี, รูปทรง) มาจาก content pack (packs/default.json หรือ $ECO_HERO_PACK)
+CONTENT = load_pack()
+TRASH_TYPES = CONTENT.trash_types
+
+# วางถัง 4 ใบให้กระจายพอดีหน้าจอ 1024px (ตั้ง y ต่ำลงเพื่อให้บาลานซ์): (x, y, ประเภท, ชื่อจาก content pack)
+BIN_SIZE = (170, 220)
+BIN_LAYOUT = [(x, 480, key, CONTENT.categories[key]['name']) for x, key in zip((75, 310, 545, 780), CATEGORY_KEYS)]
+
+ITEM_SIZE = (90, 90)
+ITEM_HOME = (WIDTH//2 - 45, 250)
+
+# --- โหมดเร่งด่วน (rush): ขยะหลายชิ้นลอยลงมาพร้อมกัน ถังย่อขนาด 2 ใบต่อประเภท ---
+RUSH_BIN_SCALE = 0.6
+RUSH_BIN_SIZE = (int(BIN_SIZE[0] * RUSH_BIN_SCALE), int(BIN_SIZE[1] * RUSH_BIN_SCALE))
+RUSH_BIN_LAYOUT = [(24 + i * 124, HEIGHT - RUSH_BIN_SIZE[1] - 10, type_key, name)
+                   for i, (_, _, type_key, name) in enumerate(BIN_LAYOUT * 2)]
+RUSH_TOP, RUSH_FLOOR = 90, HEIGHT - RUSH_BIN_SIZE[1] - 10  # ขยะที่ตกเลยพื้นโดยไม่มีใครจับ = หลุดไป
+RUSH_MAX_ITEMS = 20
+RUSH_SPAWN_INTERVAL = 0.8
+RUSH_FALL_SPEED = (25.0, 60.0)  # px ต่อวินาที
+RUSH_GRID_CELL = 96
+
+def rects_overlap(a, b):
+    # เหมือน pygame.Rect.colliderect: ขอบแตะกันพอดีไม่นับว่าชน
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+# --- ตารางแบ่งช่องสม่ำเสมอ: หาวัตถุที่ทับจุด/สี่เหลี่ยมโดยไม่ต้องไล่ทุกชิ้น ---
+class SpatialGrid:
+    def __init__(self, cell_size=RUSH_GRID_CELL):
+        self.cell_size = cell_size
+        self.cells = defaultdict(set)  # (cx, cy) -> key
+        self.entries = {}              # key -> (rect, ช่วงช่องที่อยู่ (cx0, cx1, cy0, cy1))
+
+    def _span(self, rect):
+        # ช่องสุดท้ายคือ ceil((x + w) / size) - 1 เพราะขอบขวา/ล่างไม่นับ (ใช้ได้กับพิกัดทศนิยม)
+        x, y, w, h = rect
+        size = self.cell_size
+        return int(x // size), int(-(-(x + w) // size)), int(y // size), int(-(-(y + h) // size))
+
+    def insert(self, key, rect):
+        span = self._span(rect)
+        old = self.entries.get(key)
+        self.entries[key] = (rect, span)
+        if old:
+            if old[1] == span: return  # ยังอยู่ช่องเดิม (กรณีส่วนใหญ่ตอนลอยลง)
+            self._unlink(key, old[1])
+        cells = self.cells
+        for cx in range(span[0], span[1]):
+            for cy in range(span[2], span[3]): cells[(cx, cy)].add(key)
+
+    move = insert
+
+    def _unlink(self, key, span):
+        cells = self.cells
+        for cx in range(span[0], span[1]):
+            for cy in range(span[2], span[3]):
+                bucket = cells[(cx, cy)]
+                bucket.discard(key)
+                if not bucket: del cells[(cx, cy)]
+
+    def remove(self, key):
+        self._unlink(key, self.entries.pop(key)[1])
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+
+    def query_point(self, px, py):
+        # เหมือน pygame.Rect.collidepoint: ขอบขวา/ล่างไม่นับ
+        bucket = self.cells.get((int(px // self.cell_size), int(py // self.cell_size)), ())
+        hits = []
+        for key in bucket:
+            x, y, w, h = self.entries[key][0]
+            if x <= px < x + w and y <= py < y + h: hits.append(key)
+        return hits
+
+    def query_rect(self, rect):
+        cells, found = self.cells, set()
+        x0, x1, y0, y1 = self._span(rect)
+        for cx in range(x0, x1):
+            for cy in range(y0, y1): found.update(cells.get((cx, cy), ()))
+        return [key for key in found if rects_overlap(self.entries[key][0], rect)]
+
+    def __len__(self):
+        return len(self.entries)
+
+# --- action ที่ส่งให้ step() ---
+class NewRound(NamedTuple):
+    pass
+
+class Tick(NamedTuple):
+    dt: float = STEP
+
+class Drop(NamedTuple):
+    rect: Tuple[float, float, float, float]  # ตำแหน่งขยะตอนปล่อยเมาส์ (x, y, w, h)
+    item_id: Optional[int] = None            # โหมด rush: ชิ้นที่ถืออยู่
+
+class Pick(NamedTuple):  # โหมด rush: จับชิ้นบนสุดที่อยู่ใต้เมาส์
+    x: float
+    y: float
+
+class MoveItem(NamedTuple):  # โหมด rush: ย้ายชิ้นที่ถืออยู่ (มุมซ้ายบน)
+    item_id: int
+    x: float
+    y: float
+
+class StepResult(NamedTuple):
+    outcome: str  # 'none', 'correct', 'wrong', 'miss', 'timeout', 'picked'
+    bin_index: Optional[int] = None
+    item: Optional[tuple] = None
+    item_id: Optional[int] = None
+    reaction: Optional[float] = None  # วินาทีตั้งแต่ชิ้นนี้ปรากฏ (หรือวางผิดครั้งก่อน) จนถึงตอนวาง
+
+class GameState:
+    bin_size = BIN_SIZE
+
+    def __init__(self, seed=None, trash_types=TRASH_TYPES, bins=BIN_LAYOUT, round_time=ROUND_TIME):
+        self.rng = random.Random(seed)
+        self.trash_types, self.round_time = list(trash_types), round_time
+        self.bins = [(x, y, type_key) for x, y, type_key, *_ in bins]
+        self.bin_rects = [(x, y) + self.bin_size for x, y, _ in self.bins]
+        self.bin_grid = SpatialGrid(self.bin_size[0])
+        for i, rect in enumerate(self.bin_rects): self.bin_grid.insert(i, rect)
+        self.score, self.time_left, self.elapsed = 0, float(round_time), 0.0
+        self.current, self.upcoming = None, []
+        self.shown_at, self.over = 0.0, False
+
+    def draw_item(self):
+        return self.rng.choice(self.trash_types)
+
+    def step(self, action):
+        if isinstance(action, Tick): return self._tick(action.dt)
+        if isinstance(action, Drop): return self._drop(action.rect, action.item_id)
+        if isinstance(action, NewRound): return self._new_round()
+        raise TypeError(f"unknown action: {action!r}")
+
+    def _new_round(self):
+        self.score, self.time_left, self.elapsed, self.over = 0, float(self.round_time), 0.0, False
+        self.shown_at = 0.0
+        self.upcoming = [self.draw_item() for _ in range(QUEUE_LENGTH)]
+        self.current = self.upcoming.pop(0)
+        self.upcoming.append(self.draw_item())
+        return StepResult('none', item=self.current)
+
+    def _tick(self, dt):
+        if self.over: return StepResult('none')
+        self.time_left -= dt
+        self.elapsed += dt
+        if self.time_left <= 0:
+            self.over = True
+            return StepResult('timeout')
+        return StepResult('none')
+
+    def bin_at(self, rect):
+        # ถ้าทับหลายใบ ใช้ใบที่อยู่ก่อนในรายการ (เหมือนการไล่ทีละใบแบบเดิม)
+        hits = self.bin_grid.query_rect(rect)
+        return min(hits) if hits else None
+
+    def _drop(self, rect, item_id=None):
+        if self.over or self.current is None: return StepResult('none')
+        item = self.current
+        i = self.bin_at(rect)
+        if i is None: return StepResult('miss', item=item)
+        reaction, self.shown_at = self.elapsed - self.shown_at, self.elapsed
+        if self.bins[i][2] == item[1]:
+            self.score += CORRECT_SCORE
+            self.current = self.upcoming.pop(0)
+            self.upcoming.append(self.draw_item())
+            return StepResult('correct', i, item, reaction=reaction)
+        self.time_left -= WRONG_PENALTY
+        return StepResult('wrong', i, item, reaction=reaction)
+
+    def bin_index_for(self, type_key):
+        return next(i for i, (_, _, t) in enumerate(self.bins) if t == type_key)
+
+    def drop_rect_on(self, bin_index):
+        # ตำแหน่งขยะเมื่อวางกึ่งกลางถังใบที่ระบุ (ใช้โดยบอทในตัวจำลอง)
+        x, y, w, h = self.bin_rects[bin_index]
+        return (x + (w - ITEM_SIZE[0]) / 2, y + (h - ITEM_SIZE[1]) / 2) + ITEM_SIZE
+
+# --- โหมดเร่งด่วน ---
+class RushItem:
+    __slots__ = ('id', 'data', 'x', 'y', 'px', 'py', 'vx', 'vy', 'spin', 'held', 'home', 'shown_at')
+
+    def __init__(self, item_id, data, x, y, vx, vy, spin, shown_at=0.0):
+        self.id, self.data = item_id, data
+        self.x = self.px = x
+        self.y = self.py = y
+        self.vx, self.vy, self.spin = vx, vy, spin
+        self.held, self.home = False, (x, y)
+        self.shown_at = shown_at
+
+    @property
+    def rect(self):
+        return (self.x, self.y) + ITEM_SIZE
+
+class RushState(GameState):
+    # ชิ้นที่ id มากกว่าถูกวาดทีหลัง จึงอยู่บนสุดเมื่อซ้อนกัน
+    bin_size = RUSH_BIN_SIZE
+
+    def __init__(self, seed=None, trash_types=TRASH_TYPES, bins=RUSH_BIN_LAYOUT, round_time=ROUND_TIME,
+                 max_items=RUSH_MAX_ITEMS, spawn_interval=RUSH_SPAWN_INTERVAL):
+        super().__init__(seed, trash_types, bins, round_time)
+        self.max_items, self.spawn_interval = max_items, spawn_interval
+        self.items, self.grid = {}, SpatialGrid()
+        self.next_id, self.spawn_timer, self.missed = 0, spawn_interval, 0
+
+    def step(self, action):
+        if isinstance(action, Pick): return self._pick(action.x, action.y)
+        if isinstance(action, MoveItem): return self._move(action.item_id, action.x, action.y)
+        return super().step(action)
+
+    def spawn(self, x=None, y=None):
+        rng = self.rng
+        data = self.draw_item()
+        if x is None: x = rng.uniform(0, WIDTH - ITEM_SIZE[0])
+        if y is None: y = RUSH_TOP
+        item = RushItem(self.next_id, data, x, y, rng.uniform(-20, 20), rng.uniform(*RUSH_FALL_SPEED),
+                        rng.choice((-1, 1)) * rng.uniform(60, 180), self.elapsed)
+        self.next_id += 1
+        self.items[item.id] = item
+        self.grid.insert(item.id, item.rect)
+        return item
+
+    def remove(self, item_id):
+        self.grid.remove(item_id)
+        return self.items.pop(item_id)
+
+    def _new_round(self):
+        super()._new_round()
+        self.current, self.upcoming = None, []
+        self.items.clear()
+        self.grid.clear()
+        self.spawn_timer, self.missed = self.spawn_interval, 0
+        for _ in range(min(3, self.max_items)): self.spawn()
+        return StepResult('none')
+
+    def _tick(self, dt):
+        result = super()._tick(dt)
+        if self.over: return result
+        self.spawn_timer -= dt
+        if self.spawn_timer <= 0:
+            self.spawn_timer += self.spawn_interval
+            if len(self.items) < self.max_items: self.spawn()
+        grid, max_x = self.grid, WIDTH - ITEM_SIZE[0]
+        for item in list(self.items.values()):
+            item.px, item.py = item.x, item.y
+            if item.held: continue
+            item.x += item.vx * dt
+            item.y += item.vy * dt
+            if not 0 <= item.x <= max_x:
+                item.vx = -item.vx
+                item.x = min(max(item.x, 0), max_x)
+            if item.y > RUSH_FLOOR:
+                self.remove(item.id)
+                self.missed += 1
+            else:
+                grid.move(item.id, item.rect)
+        return result
+
+    def item_at(self, x, y):
+        hits = self.grid.query_point(x, y)
+        return max(hits) if hits else None
+
+    def _pick(self, x, y):
+        if self.over: return StepResult('none')
+        item_id = self.item_at(x, y)
+        if item_id is None: return StepResult('none')
+        item = self.items[item_id]
+        item.held, item.home = True, (item.x, item.y)
+        return StepResult('picked', item=item.data, item_id=item_id)
+
+    def _move(self, item_id, x, y):
+        item = self.items.get(item_id)
+        if item is None: return StepResult('none')
+        item.x, item.y = item.px, item.py = x, y
+        self.grid.move(item_id, item.rect)
+        return StepResult('none', item_id=item_id)
+
+    def _drop(self, rect, item_id=None):
+        item = self.items.get(item_id)
+        if self.over or item is None: return StepResult('none')
+        item.held = False
+        i = self.bin_at(rect)
+        if i is None:
+            return StepResult('miss', item=item.data, item_id=item_id)
+        reaction, item.shown_at = self.elapsed - item.shown_at, self.elapsed
+        if self.bins[i][2] == item.data[1]:
+            self.score += CORRECT_SCORE
+            self.remove(item_id)
+            return StepResult('correct', i, item.data, item_id, reaction)
+        # วางผิดถัง: หักเวลาแล้วกลับไปลอยที่เดิม
+        self.time_left -= WRONG_PENALTY
+        item.x, item.y = item.px, item.py = item.home
+        self.grid.move(item_id, item.rect)
+        return StepResult('wrong', i, item.data, item_id, reaction)
@@ -0,0 +1,271 @@
+# --- ตารางคะแนนของห้องเรียน: เซิร์ฟเวอร์ asyncio บนเครื่องครู + ไคลเอนต์ในเกม (ไม่ใช้ pygame) ---
+# โปรโตคอล: TCP ส่ง JSON ทีละบรรทัด ตอบกลับ 1 บรรทัดต่อ 1 คำขอ
+#   {"op": "submit", "player": "PC-07", "mode": "classic", "score": 420}  -> {"ok": true, "rank": 3, "players": 28, "best": 460}
+#   {"op": "top", "mode": "classic", "n": 10}                             -> {"ok": true, "top": [["PC-12", 610], ...]}
+# python leaderboard.py serve --host 0.0.0.0            เปิดบนเครื่องครู (เครื่องนักเรียนรัน Echo.py --leaderboard IP:8765)
+# python leaderboard.py top --host 192.168.1.10         ดูอันดับจากเครื่องไหนก็ได้
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import queue
+import signal
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from scores import MODES, get_data_dir
+
+DEFAULT_PORT = 8765
+FLUSH_INTERVAL = 0.5  # วินาที: คะแนนที่ส่งเข้ามาในช่วงนี้เขียนลงดิสก์ใน transaction เดียว
+FLUSH_BATCH = 500     # ครบจำนวนนี้เขียนทันทีไม่ต้องรอรอบ
+MAX_NAME = 32
+MAX_SCORE = 1_000_000  # คะแนนจริงต่อรอบไม่กี่พัน ค่าที่เกินนี้ถือว่าคำขอผิด
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leaderboard (
+    mode TEXT NOT NULL,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (mode, player)
+);
+"""
+
+def default_path():
+    return os.path.join(get_data_dir(), 'leaderboard.sqlite3')
+
+def parse_address(address):
+    host, _, port = address.rpartition(':')
+    return (host or 'localhost', int(port)) if port.isdigit() else (address, DEFAULT_PORT)
+
+# --- ดัชนีในหน่วยความจำ: คะแนนดีที่สุดของแต่ละคน เรียงไว้แล้วต่อโหมด ---
+class Leaderboard:
+    def __init__(self):
+        self.best = {}                   # (mode, player) -> score
+        self.ranked = defaultdict(list)  # mode -> [(-score, player)] เรียงจากมากไปน้อย
+
+    def submit(self, mode, player, score):
+        # คืนค่า True ถ้าเป็นคะแนนใหม่ที่ดีกว่าเดิม (ต้องเขียนลงดิสก์)
+        old = self.best.get((mode, player))
+        if old is not None and score <= old: return False
+        ranked = self.ranked[mode]
+        if old is not None: del ranked[bisect.bisect_left(ranked, (-old, player))]
+        bisect.insort(ranked, (-score, player))
+        self.best[(mode, player)] = score
+        return True
+
+    def rank(self, mode, player):
+        score = self.best.get((mode, player))
+        if score is None: return None
+        return bisect.bisect_left(self.ranked[mode], (-score, '')) + 1  # คะแนนเท่ากันได้อันดับเดียวกัน
+
+    def top(self, mode, n=10):
+        return [[player, -neg] for neg, player in self.ranked[mode][:n]]
+
+    def players(self, mode):
+        return len(self.ranked[mode])
+
+# --- เซิร์ฟเวอร์ ---
+class LeaderboardServer:
+    def __init__(self, db_path=None, flush_interval=FLUSH_INTERVAL, flush_batch=FLUSH_BATCH):
+        self.db = sqlite3.connect(db_path or default_path(), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.board = Leaderboard()
+        for mode, player, score in self.db.execute("SELECT mode, player, score FROM leaderboard"):
+            self.board.submit(mode, player, score)
+        self.flush_interval, self.flush_batch = flush_interval, flush_batch
+        self.pending = {}  # (mode, player) -> score ส่งซ้ำหลายครั้งก่อน flush เหลือแถวเดียว
+        self.wake, self.closing, self.writers = None, False, set()
+        self.stats = {'requests': 0, 'submits': 0, 'writes': 0, 'flushes': 0, 'clients': 0, 'errors': 0}
+
+    async def start(self, host='localhost', port=DEFAULT_PORT):
+        self.wake = asyncio.Event()
+        self.flusher = asyncio.create_task(self.flush_loop())
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server
+
+    async def close(self):
+        # หยุดรับ ปิดการเชื่อมต่อที่ค้าง แล้วรอเขียนชุดสุดท้ายให้เสร็จก่อนปิดฐานข้อมูล
+        self.server.close()
+        for writer in list(self.writers): writer.close()
+        self.closing = True
+        self.wake.set()
+        await self.flusher
+        await self.flush()
+        self.db.close()
+
+    async def handle(self, reader, writer):
+        self.stats['clients'] += 1
+        self.writers.add(writer)
+        try:
+            while line := await reader.readline():
+                writer.write(json.dumps(self.dispatch(line), ensure_ascii=False).encode() + b'\n')
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError, OverflowError):
+            pass
+        finally:
+            self.stats['clients'] -= 1
+            self.writers.discard(writer)
+            writer.close()
+
+    def dispatch(self, line):
+        self.stats['requests'] += 1
+        try:
+            req = json.loads(line)
+            op, mode = req.get('op'), req.get('mode', MODES[0])
+            if mode not in MODES: raise ValueError(f"unknown mode {mode!r}")
+            if op == 'submit':
+                player, score = str(req['player'])[:MAX_NAME], req['score']
+                if type(score) is not int or not 0 <= score <= MAX_SCORE:
+                    raise ValueError(f"score must be an integer in 0..{MAX_SCORE}")
+                self.stats['submits'] += 1
+                if self.board.submit(mode, player, score):
+                    self.pending[(mode, player)] = score
+                    if len(self.pending) >= self.flush_batch: self.wake.set()
+                return {'ok': True, 'rank': self.board.rank(mode, player), 'players': self.board.players(mode),
+                        'best': self.board.best[(mode, player)]}
+            if op == 'top':
+                return {'ok': True, 'top': self.board.top(mode, max(0, min(int(req.get('n', 10)), 100)))}
+            if op == 'stats':
+                return {'ok': True, **self.stats, 'pending': len(self.pending)}
+            raise ValueError(f"unknown op {op!r}")
+        except (ValueError, KeyError, TypeError, AttributeError, OverflowError) as e:
+            return {'ok': False, 'error': str(e)}
+
+    async def flush_loop(self):
+        while not self.closing:
+            try:
+                await asyncio.wait_for(self.wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wake.clear()
+            await self.flush()
+
+    async def flush(self):
+        # สลับชุดที่ค้างออกมาก่อน แล้วเขียนในเธรดแยก ระหว่างเขียน event loop ยังรับคำขอต่อได้
+        if not self.pending: return
+        batch, self.pending = self.pending, {}
+        now = time.time()
+        rows = [(mode, player, score, now) for (mode, player), score in batch.items()]
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.write, rows)
+        except sqlite3.Error as e:
+            # ดิสก์เต็ม/ไฟล์ล็อก: คืนชุดนี้เข้าคิว (เก็บค่าที่มากกว่าถ้ามีคะแนนใหม่เข้ามาระหว่างนั้น) แล้วลองใหม่รอบหน้า
+            print(f"leaderboard write failed: {e}", file=sys.stderr)
+            for key, score in batch.items(): self.pending[key] = max(score, self.pending.get(key, score))
+            self.stats['errors'] += 1
+            return
+        self.stats['writes'] += len(rows)
+        self.stats['flushes'] += 1
+
+    def write(self, rows):
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO leaderboard VALUES (?, ?, ?, ?) ON CONFLICT (mode, player) DO UPDATE SET"
+                " score = MAX(score, excluded.score), updated_at = excluded.updated_at", rows)
+
+async def serve(host, port, db_path):
+    server = LeaderboardServer(db_path)
+    await server.start(host, port)
+    print(f"leaderboard on {host}:{port} ({sum(server.board.players(m) for m in MODES)} players loaded)")
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            asyncio.get_running_loop().add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: Ctrl+C มาเป็น KeyboardInterrupt แทน
+    try:
+        await stop.wait()
+    finally:
+        await server.close()
+
+# --- ไคลเอนต์ในเกม: เธรดเบื้องหลังส่งคะแนน ลูปเกมไม่ต้องรอเครือข่าย ---
+class LeaderboardClient:
+    MAX_UNSENT = 20
+
+    def __init__(self, address, player=None, timeout=2.0):
+        self.address, self.timeout = parse_address(address), timeout
+        self.player = (player or socket.gethostname())[:MAX_NAME]
+        self.queue = queue.Queue()
+        self.ranks = {}  # mode -> (อันดับ, จำนวนผู้เล่น) จากการส่งครั้งล่าสุด
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="leaderboard", daemon=True)
+        self.thread.start()
+
+    def submit(self, mode, score):
+        self.ranks.pop(mode, None)
+        self.queue.put({'op': 'submit', 'player': self.player, 'mode': mode, 'score': score})
+
+    def rank(self, mode):
+        return self.ranks.get(mode)
+
+    def close(self, timeout=2.0):
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+    def _run(self):
+        sock = stream = None
+        unsent = []  # ส่งไม่สำเร็จ (เซิร์ฟเวอร์ปิดอยู่): ลองใหม่พร้อมคะแนนถัดไป
+        while True:
+            req = self.queue.get()
+            if req is None: break
+            unsent = (unsent + [req])[-self.MAX_UNSENT:]
+            # การเชื่อมต่อเดิมอาจตายไปแล้ว (เซิร์ฟเวอร์รีสตาร์ต) จึงลองใหม่อีกครั้งด้วยการเชื่อมต่อใหม่
+            for _ in range(2 if sock is not None else 1):
+                try:
+                    if sock is None:
+                        sock = socket.create_connection(self.address, self.timeout)
+                        stream = sock.makefile('rwb')
+                    while unsent:
+                        stream.write(json.dumps(unsent[0], ensure_ascii=False).encode() + b'\n')
+                        stream.flush()
+                        reply = json.loads(stream.readline() or b'null')
+                        if reply is None: raise ConnectionError("server closed the connection")
+                        if reply.get('ok'): self.ranks[unsent[0]['mode']], self.error = (reply['rank'], reply['players']), None
+                        else: self.error = reply.get('error')
+                        unsent.pop(0)
+                    break
+                except (OSError, ValueError) as e:
+                    self.error = e
+                    if sock is not None: sock.close()
+                    sock = stream = None
+        if sock is not None: sock.close()
+
+def request(address, req, timeout=5.0):
+    with socket.create_connection(parse_address(address), timeout) as sock, sock.makefile('rwb') as stream:
+        stream.write(json.dumps(req, ensure_ascii=False).encode() + b'\n')
+        stream.flush()
+        return json.loads(stream.readline())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eco Hero classroom leaderboard")
+    parser.add_argument("command", choices=["serve", "top", "stats"])
+    parser.add_argument("--host", default="localhost", help="serve: ที่อยู่ที่รับการเชื่อมต่อ (0.0.0.0 = ทุกเครื่องในวง LAN)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--db", default=None, help="ไฟล์ฐานข้อมูลของเซิร์ฟเวอร์")
+    parser.add_argument("--mode", choices=MODES, default=MODES[0])
+    parser.add_argument("-n", type=int, default=10, help="จำนวนอันดับ")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.host, args.port, args.db))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    address = f"{args.host}:{args.port}"
+    if args.command == "stats":
+        print(request(address, {'op': 'stats'}))
+        return 0
+    for i, (player, score) in enumerate(request(address, {'op': 'top', 'mode': args.mode, 'n': args.n})['top'], 1):
+        print(f"{i:3d}. {score:6d}  {player}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
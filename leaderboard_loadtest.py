@@ -0,0 +1,97 @@
+# --- ทดสอบโหลดของเซิร์ฟเวอร์ตารางคะแนน: จำลองเครื่องนักเรียนหลายร้อยเครื่องส่งคะแนนพร้อมกัน ---
+# python leaderboard_loadtest.py --clients 300 --submits 20     เปิดเซิร์ฟเวอร์ชั่วคราวบน localhost ในโปรเซสนี้แล้วยิง
+# python leaderboard_loadtest.py --connect 192.168.1.10:8765     ยิงเซิร์ฟเวอร์ที่เปิดอยู่แล้ว (ข้ามการตรวจผล)
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+import leaderboard
+from scores import MODES
+from simulate import percentile
+
+async def run_client(i, address, args, latencies, expected):
+    rng = random.Random(args.seed * 100003 + i)
+    player = f"load-{i:04d}"
+    reader, writer = await asyncio.open_connection(*address)
+    try:
+        for _ in range(args.submits):
+            await asyncio.sleep(rng.uniform(0, args.think * 2))
+            if rng.random() < args.query_ratio:
+                kind, req = 'top', {'op': 'top', 'mode': rng.choice(MODES), 'n': 10}
+            else:
+                mode, score = rng.choice(MODES), rng.randrange(0, 1000, 4)
+                kind, req = 'submit', {'op': 'submit', 'player': player, 'mode': mode, 'score': score}
+                expected[(mode, player)] = max(expected.get((mode, player), score), score)
+            t0 = time.perf_counter()
+            writer.write(json.dumps(req).encode() + b'\n')
+            await writer.drain()
+            reply = json.loads(await reader.readline())
+            latencies[kind].append(time.perf_counter() - t0)
+            if not reply.get('ok'): raise RuntimeError(f"{player}: {reply}")
+    finally:
+        writer.close()
+
+def report(kind, timings, wall):
+    ms = sorted(t * 1000 for t in timings)
+    if not ms: return
+    print(f"{kind:8s} {len(ms):7d} req  {len(ms) / wall:8.0f} req/s  p50 {percentile(ms, 50):7.2f} ms  "
+          f"p95 {percentile(ms, 95):7.2f} ms  p99 {percentile(ms, 99):7.2f} ms  max {ms[-1]:7.2f} ms")
+
+async def run(args):
+    server = None
+    if args.connect:
+        address = leaderboard.parse_address(args.connect)
+    else:
+        db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='eco_lb_'), 'leaderboard.sqlite3')
+        server = leaderboard.LeaderboardServer(db_path)
+        await server.start('localhost', 0)
+        address = server.server.sockets[0].getsockname()[:2]
+    latencies, expected = {'submit': [], 'top': []}, {}
+    t0 = time.perf_counter()
+    # ทยอยเชื่อมต่อเหมือนนักเรียนเปิดเกมไม่พร้อมกันเป๊ะ
+    tasks = []
+    for i in range(args.clients):
+        tasks.append(asyncio.create_task(run_client(i, address, args, latencies, expected)))
+        await asyncio.sleep(args.ramp / max(1, args.clients))
+    await asyncio.gather(*tasks)
+    wall = time.perf_counter() - t0
+
+    print(f"{args.clients} clients x {args.submits} requests in {wall:.2f}s")
+    report('submit', latencies['submit'], wall)
+    report('top', latencies['top'], wall)
+    if server is None: return 0
+
+    await server.close()
+    stats = server.stats
+    print(f"server: {stats['submits']} submits -> {stats['writes']} rows written in {stats['flushes']} batches "
+          f"(ส่งซ้ำในรอบเดียวกันรวมเป็นแถวเดียว และเขียนเฉพาะคะแนนที่ดีขึ้น)")
+    # ตรวจว่าดัชนีในหน่วยความจำและฐานข้อมูลตรงกับคะแนนดีที่สุดที่ส่งไปจริง
+    db = sqlite3.connect(db_path)
+    stored = {(m, p): s for m, p, s in db.execute("SELECT mode, player, score FROM leaderboard")}
+    db.close()
+    board = {key: score for key, score in server.board.best.items() if key in expected}
+    ok = board == expected and {k: stored.get(k) for k in expected} == expected
+    print("consistency:", "OK" if ok else "MISMATCH")
+    return 0 if ok else 1
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eco Hero leaderboard load test")
+    parser.add_argument("--clients", type=int, default=300)
+    parser.add_argument("--submits", type=int, default=20, help="จำนวนคำขอต่อไคลเอนต์")
+    parser.add_argument("--think", type=float, default=0.05, help="เวลาเฉลี่ยระหว่างคำขอ (วินาที)")
+    parser.add_argument("--query-ratio", type=float, default=0.2, help="สัดส่วนคำขอที่เป็นการดูอันดับ")
+    parser.add_argument("--ramp", type=float, default=1.0, help="เวลาที่ใช้ทยอยเชื่อมต่อจนครบ (วินาที)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--connect", metavar="HOST:PORT", help="ใช้เซิร์ฟเวอร์ที่เปิดอยู่แล้ว")
+    parser.add_argument("--db", help="ไฟล์ฐานข้อมูลของเซิร์ฟเวอร์ชั่วคราว (ค่าเริ่มต้นคือโฟลเดอร์ temp)")
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+if __name__ == "__main__":
+    sys.exit(main())
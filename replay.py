@@ -0,0 +1,87 @@
+# --- เล่นซ้ำไฟล์ที่บันทึกด้วย `python Echo.py --record` แบบไม่มีหน้าจอและไม่จำกัดเฟรมเรต ---
+# python replay.py recordings/                     เล่นซ้ำทุกไฟล์ .ecorec แล้วตรวจคะแนน/หน้าจอตอนจบ
+# python replay.py a.ecorec --no-render            เดินเฉพาะกติกา (เร็วที่สุด)
+# python replay.py recordings/ -o replay.json      บันทึกผลพร้อมเวลาต่อ step (ใช้เป็น performance test)
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import json
+import random
+import sys
+import time
+
+import Echo
+from bench import summarize
+
+def find_recordings(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith('.ecorec'))
+        else:
+            files.append(path)
+    return files
+
+def replay(path, render=True):
+    rec = Echo.Recording.load(path)
+    random.seed(rec.seed)
+    game = Echo.Game(Echo.SCREEN, seed=rec.seed)
+    timings = []
+
+    def advance():
+        t0 = time.perf_counter()
+        game.update()
+        if render:
+            game.draw()
+            game.renderer.present()
+        timings.append(time.perf_counter() - t0)
+
+    # event ถูกส่งเข้า handle_event ที่ step เดิมกับตอนบันทึก ลำดับเดียวกับ Game.run()
+    t0 = time.perf_counter()
+    for step, _, event in rec.events:
+        while game.steps < step: advance()
+        game.handle_event(event)
+    end_step = rec.end_step if rec.complete else game.steps
+    while game.steps < end_step: advance()
+    wall = time.perf_counter() - t0
+
+    result = {'file': path, 'seed': rec.seed, 'events': len(rec.events), 'steps': game.steps,
+              'score': game.score, 'state': game.game_state, 'wall_s': wall,
+              'speedup': game.steps * Echo.STEP / wall if wall > 0 else 0.0, 'step': summarize(timings)}
+    if not rec.complete:
+        # ไฟล์ไม่มี record ปิดท้าย (เกมค้าง/ถูกปิดทิ้ง): รายงานว่าหยุดที่ไหน
+        last_ms = rec.events[-1][1] if rec.events else 0
+        result.update(status='INCOMPLETE', last_event_s=last_ms / 1000)
+    elif (game.score, game.game_state) == (rec.score, rec.state):
+        result['status'] = 'OK'
+    else:
+        result.update(status='MISMATCH', expected_score=rec.score, expected_state=rec.state)
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eco Hero headless replay")
+    parser.add_argument("paths", nargs="+", help="ไฟล์ .ecorec หรือโฟลเดอร์")
+    parser.add_argument("--no-render", action="store_true", help="ไม่วาดภาพ เดินเฉพาะกติกา")
+    parser.add_argument("-o", "--output", help="บันทึกผลเป็น JSON")
+    args = parser.parse_args(argv)
+
+    files = find_recordings(args.paths)
+    if not files: parser.error("no recordings found")
+    Echo.init_display()
+    results = []
+    for path in files:
+        r = replay(path, render=not args.no_render)
+        results.append(r)
+        line = (f"{r['status']:10s} {os.path.basename(path):28s} score {r['score']:5d}  {r['state']:9s} "
+                f"{r['steps']:6d} steps in {r['wall_s']:6.2f}s ({r['speedup']:5.1f}x)  p99 {r['step']['p99_ms']:6.2f} ms")
+        if r['status'] == 'MISMATCH': line += f"  expected {r['expected_score']} {r['expected_state']}"
+        if r['status'] == 'INCOMPLETE': line += f"  last input at {r['last_event_s']:.1f}s"
+        print(line)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f: json.dump(results, f, indent=2)
+    return 1 if any(r['status'] == 'MISMATCH' for r in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+# --- คะแนนสูงสุดและสถิติของแต่ละรอบ (SQLite, ไม่ใช้ pygame) ---
+# เกมส่งผลแต่ละรอบเข้าคิว แล้วเธรดเบื้องหลังเป็นผู้เขียนลงดิสก์ ลูปเกมจึงไม่ต้องรอ I/O
+# python scores.py --top 10 --worst 3        ดูสถิติ (สำหรับครู) จากเครื่องที่ใช้ร่วมกันทั้งห้อง
+import argparse
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    ended_at REAL NOT NULL,
+    mode TEXT NOT NULL,
+    seed INTEGER,
+    score INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    items_sorted INTEGER NOT NULL,
+    mistakes INTEGER NOT NULL,
+    missed INTEGER NOT NULL,
+    reaction_mean REAL
+);
+CREATE INDEX IF NOT EXISTS sessions_mode_score ON sessions (mode, score DESC);
+CREATE INDEX IF NOT EXISTS sessions_score ON sessions (score DESC);
+CREATE TABLE IF NOT EXISTS session_categories (
+    session_id INTEGER NOT NULL REFERENCES sessions (id),
+    category TEXT NOT NULL,
+    sorted INTEGER NOT NULL,
+    mistakes INTEGER NOT NULL,
+    reaction_sum REAL NOT NULL,
+    reaction_count INTEGER NOT NULL,
+    PRIMARY KEY (session_id, category)
+);
+-- ยอดรวมต่อประเภท อัปเดตใน transaction เดียวกับการบันทึกรอบ: ถามประเภทที่ผิดบ่อยที่สุดได้ทันทีไม่ต้องรวมทั้งตาราง
+CREATE TABLE IF NOT EXISTS category_totals (
+    category TEXT PRIMARY KEY,
+    sorted INTEGER NOT NULL,
+    mistakes INTEGER NOT NULL,
+    reaction_sum REAL NOT NULL,
+    reaction_count INTEGER NOT NULL
+);
+"""
+
+def get_data_dir(*parts):
+    base = (os.environ.get('ECO_HERO_DATA_DIR') or os.environ.get('APPDATA') or os.environ.get('XDG_DATA_HOME')
+            or os.path.join(os.path.expanduser('~'), '.local', 'share'))
+    path = os.path.join(base, 'eco_hero', *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def default_path():
+    return os.path.join(get_data_dir(), 'scores.sqlite3')
+
+def connect(path):
+    db = sqlite3.connect(path, timeout=10)
+    db.execute("PRAGMA journal_mode=WAL")  # ผู้อ่าน (เช่น scores.py --top) ไม่ต้องรอผู้เขียน
+    db.executescript(SCHEMA)
+    return db
+
+# --- เก็บสถิติระหว่างเล่น 1 รอบ ---
+class SessionStats:
+    def __init__(self, mode, seed=None):
+        self.mode, self.seed = mode, seed
+        self.categories = {}  # category -> [sorted, mistakes, reaction_sum, reaction_count]
+        self.score, self.duration, self.missed = 0, 0.0, 0
+
+    def record(self, outcome, category, reaction):
+        # outcome: 'correct' หรือ 'wrong' | reaction: วินาทีตั้งแต่ขยะชิ้นนั้นปรากฏ/ถูกวางครั้งก่อน
+        c = self.categories.setdefault(category, [0, 0, 0.0, 0])
+        c[0 if outcome == 'correct' else 1] += 1
+        c[2] += reaction
+        c[3] += 1
+
+    def finish(self, score, duration, missed=0):
+        self.score, self.duration, self.missed = score, duration, missed
+        return self
+
+    @property
+    def items_sorted(self):
+        return sum(c[0] for c in self.categories.values())
+
+    @property
+    def mistakes(self):
+        return sum(c[1] for c in self.categories.values())
+
+    @property
+    def reaction_mean(self):
+        count = sum(c[3] for c in self.categories.values())
+        return sum(c[2] for c in self.categories.values()) / count if count else None
+
+def save_session(db, stats, ended_at=None):
+    with db:
+        cur = db.execute(
+            "INSERT INTO sessions (ended_at, mode, seed, score, duration, items_sorted, mistakes, missed, reaction_mean)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (ended_at or time.time(), stats.mode, stats.seed, stats.score, stats.duration,
+             stats.items_sorted, stats.mistakes, stats.missed, stats.reaction_mean))
+        rows = [(cur.lastrowid, category, *c) for category, c in stats.categories.items()]
+        db.executemany("INSERT INTO session_categories VALUES (?, ?, ?, ?, ?, ?)", rows)
+        db.executemany(
+            "INSERT INTO category_totals VALUES (?, ?, ?, ?, ?) ON CONFLICT (category) DO UPDATE SET"
+            " sorted = sorted + excluded.sorted, mistakes = mistakes + excluded.mistakes,"
+            " reaction_sum = reaction_sum + excluded.reaction_sum, reaction_count = reaction_count + excluded.reaction_count",
+            [row[1:] for row in rows])
+    return cur.lastrowid
+
+# --- คำถามที่ใช้ index ---
+MODES = ("classic", "rush")
+
+def high_scores(db, modes=MODES):
+    # คะแนนสูงสุดของแต่ละโหมด (MAX บน index (mode, score) ไม่ต้องไล่ทั้งตาราง)
+    best = {m: db.execute("SELECT MAX(score) FROM sessions WHERE mode = ?", (m,)).fetchone()[0] for m in modes}
+    return {m: score for m, score in best.items() if score is not None}
+
+def top_scores(db, n=10, mode=None):
+    sql = "SELECT score, mode, ended_at, items_sorted, mistakes FROM sessions"
+    if mode: return db.execute(sql + " WHERE mode = ? ORDER BY score DESC LIMIT ?", (mode, n)).fetchall()
+    return db.execute(sql + " ORDER BY score DESC LIMIT ?", (n,)).fetchall()
+
+def worst_categories(db, n=3):
+    # ประเภทที่วางผิดบ่อยที่สุด (สัดส่วนผิดต่อครั้งที่วาง) พร้อมเวลาตอบสนองเฉลี่ย
+    return db.execute(
+        "SELECT category, mistakes, sorted, CAST(mistakes AS REAL) / (sorted + mistakes) AS error_rate,"
+        " reaction_sum / reaction_count AS reaction_mean FROM category_totals WHERE sorted + mistakes > 0"
+        " ORDER BY error_rate DESC LIMIT ?", (n,)).fetchall()
+
+# --- เขียนแบบไม่บล็อก ---
+class ScoreStore:
+    def __init__(self, path=None):
+        self.path = path  # None = ไฟล์ในโฟลเดอร์ข้อมูลของเกม (สร้างโฟลเดอร์ในเธรดเบื้องหลัง)
+        self.queue = queue.Queue()
+        self.best = {}  # mode -> คะแนนสูงสุด (เธรดเบื้องหลังอัปเดต ลูปเกมอ่านได้ทันที)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="score-store", daemon=True)
+        self.thread.start()
+
+    def submit(self, stats):
+        self.queue.put(stats)
+
+    def high_score(self, mode):
+        return self.best.get(mode, 0)
+
+    def close(self, timeout=5.0):
+        # รอให้เขียนรายการที่ค้างในคิวจนหมดก่อนออกจากเกม
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+    def _run(self):
+        try:
+            self.path = self.path or default_path()
+            db = connect(self.path)
+            self.best = high_scores(db)
+        except (OSError, sqlite3.Error) as e:
+            # สร้างโฟลเดอร์/เปิดฐานข้อมูลไม่ได้: เล่นต่อได้ตามปกติแต่ไม่บันทึกคะแนน
+            self.error, db = e, None
+        while True:
+            stats = self.queue.get()
+            if stats is None: break
+            if db is None: continue
+            try:
+                save_session(db, stats)
+                self.best[stats.mode] = max(self.best.get(stats.mode) or 0, stats.score)
+            except sqlite3.Error as e:
+                self.error = e
+        if db is not None: db.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eco Hero score statistics")
+    parser.add_argument("--db", default=None, help="ไฟล์ฐานข้อมูล (ค่าเริ่มต้นอยู่ในโฟลเดอร์ข้อมูลของเกม)")
+    parser.add_argument("--top", type=int, default=10, help="จำนวนอันดับคะแนนที่จะแสดง")
+    parser.add_argument("--mode", choices=MODES)
+    parser.add_argument("--worst", type=int, default=4, help="จำนวนประเภทขยะที่ผิดบ่อยที่สุด")
+    args = parser.parse_args(argv)
+
+    db = connect(args.db or default_path())
+    total = db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+    print(f"{total} sessions")
+    for i, (score, mode, ended_at, items, mistakes) in enumerate(top_scores(db, args.top, args.mode), 1):
+        print(f"{i:3d}. {score:6d}  {mode:8s} {time.strftime('%Y-%m-%d %H:%M', time.localtime(ended_at))}"
+              f"  sorted {items:3d}  mistakes {mistakes:3d}")
+    for category, mistakes, sorted_, rate, reaction in worst_categories(db, args.worst):
+        print(f"{category:10s} error rate {rate:6.1%}  ({mistakes} wrong / {sorted_} correct)  reaction {reaction:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+# --- จำลองการเล่นหลายพันรอบด้วยบอท เพื่อปรับความยากตามช่วงอายุ (ไม่ต้องเปิดหน้าจอ) ---
+# python simulate.py -n 5000 --policy perfect random error:0.2 --think-time 1.8
+# python simulate.py --policy mybots:SlowReader -o result.json     ใช้ policy ของตัวเอง (module:callable)
+import argparse
+import importlib
+import json
+import math
+import multiprocessing
+import random
+import sys
+import time
+from collections import defaultdict
+
+from engine import GameState, NewRound, Tick, Drop, STEP, ROUND_TIME
+
+# --- policy ของบอท: เลือกถังที่จะวางขยะชิ้นปัจจุบัน ---
+class PerfectPolicy:
+    def __init__(self, rng):
+        self.rng = rng
+
+    def choose_bin(self, state):
+        return state.bin_index_for(state.current[1])
+
+class RandomPolicy(PerfectPolicy):
+    def choose_bin(self, state):
+        return self.rng.randrange(len(state.bins))
+
+class ErrorRatePolicy(PerfectPolicy):
+    def __init__(self, rng, error_rate=0.1):
+        super().__init__(rng)
+        self.error_rate = error_rate
+
+    def choose_bin(self, state):
+        correct = state.bin_index_for(state.current[1])
+        if self.rng.random() >= self.error_rate: return correct
+        return self.rng.choice([i for i in range(len(state.bins)) if i != correct])
+
+POLICIES = {'perfect': PerfectPolicy, 'random': RandomPolicy, 'error': ErrorRatePolicy}
+
+def make_policy(spec, rng):
+    # 'perfect' | 'random' | 'error:0.2' | 'package.module:callable[:arg]'
+    name, _, arg = spec.partition(':')
+    if name in POLICIES:
+        return POLICIES[name](rng, float(arg)) if arg else POLICIES[name](rng)
+    module_name, _, rest = spec.partition(':')
+    attr, _, arg = rest.partition(':')
+    factory = getattr(importlib.import_module(module_name), attr)
+    return factory(rng, float(arg)) if arg else factory(rng)
+
+# --- 1 รอบการเล่น ---
+def run_session(task):
+    seed, policy_spec, think_time, think_jitter, round_time = task
+    rng = random.Random(seed * 7919 + 1)
+    policy = make_policy(policy_spec, rng)
+    state = GameState(seed, round_time=round_time)
+    state.step(NewRound())
+    correct = wrong = 0
+    while not state.over:
+        # เวลาคิดก่อนวาง 1 ชิ้น เดินเวลาทีละ STEP เหมือนในเกมจริง
+        delay = max(STEP, rng.gauss(think_time, think_jitter))
+        for _ in range(max(1, round(delay / STEP))):
+            if state.step(Tick(STEP)).outcome == 'timeout': break
+        if state.over: break
+        outcome = state.step(Drop(state.drop_rect_on(policy.choose_bin(state)))).outcome
+        if outcome == 'correct': correct += 1
+        elif outcome == 'wrong': wrong += 1
+        if state.time_left <= 0: state.step(Tick(0))
+    return {'policy': policy_spec, 'seed': seed, 'score': state.score,
+            'duration': state.elapsed, 'correct': correct, 'wrong': wrong}
+
+# --- สรุปผล ---
+def percentile(sorted_values, q):
+    if not sorted_values: return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+def distribution(values):
+    values = sorted(values)
+    n = len(values)
+    mean = sum(values) / n
+    std = math.sqrt(sum((v - mean) ** 2 for v in values) / n)
+    return {'mean': mean, 'std': std, 'min': values[0], 'max': values[-1],
+            **{f'p{q}': percentile(values, q) for q in (10, 25, 50, 75, 90)}}
+
+def histogram(values, width):
+    counts = defaultdict(int)
+    for v in values: counts[int(v // width * width)] += 1
+    return {str(k): counts[k] for k in sorted(counts)}
+
+def summarize(sessions):
+    by_policy = defaultdict(list)
+    for s in sessions: by_policy[s['policy']].append(s)
+    summary = {}
+    for policy, runs in by_policy.items():
+        drops = sum(r['correct'] + r['wrong'] for r in runs)
+        summary[policy] = {
+            'sessions': len(runs),
+            'score': distribution([r['score'] for r in runs]),
+            'score_histogram': histogram([r['score'] for r in runs], 40),
+            'duration': distribution([r['duration'] for r in runs]),
+            'accuracy': sum(r['correct'] for r in runs) / drops if drops else 0.0,
+        }
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eco Hero batch simulator")
+    parser.add_argument("-n", "--sessions", type=int, default=1000, help="จำนวนรอบต่อ policy")
+    parser.add_argument("--policy", nargs="+", default=["perfect", "random", "error:0.2"])
+    parser.add_argument("--think-time", type=float, default=1.5, help="เวลาเฉลี่ยที่ใช้ต่อ 1 ชิ้น (วินาที)")
+    parser.add_argument("--think-jitter", type=float, default=0.5, help="ส่วนเบี่ยงเบนมาตรฐานของเวลาต่อชิ้น")
+    parser.add_argument("--round-time", type=float, default=ROUND_TIME)
+    parser.add_argument("--seed", type=int, default=0, help="seed ของรอบแรก (รอบถัดไป +1)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="จำนวน process (0 = ไม่ใช้ pool)")
+    parser.add_argument("-o", "--output", help="บันทึกผลสรุปเป็น JSON")
+    args = parser.parse_args(argv)
+
+    tasks = [(args.seed + i, policy, args.think_time, args.think_jitter, args.round_time)
+             for policy in args.policy for i in range(args.sessions)]
+    t0 = time.perf_counter()
+    if args.workers == 0:
+        sessions = [run_session(t) for t in tasks]
+    else:
+        with multiprocessing.Pool(args.workers) as pool:
+            sessions = list(pool.imap_unordered(run_session, tasks, chunksize=max(1, len(tasks) // 64)))
+    elapsed = time.perf_counter() - t0
+
+    summary = summarize(sessions)
+    for policy, s in summary.items():
+        sc, du = s['score'], s['duration']
+        print(f"{policy:16s} score mean {sc['mean']:7.1f} ± {sc['std']:5.1f}  p10 {sc['p10']:5.0f}  p50 {sc['p50']:5.0f}  "
+              f"p90 {sc['p90']:5.0f}  | time mean {du['mean']:5.1f}s  | accuracy {s['accuracy']:.0%}")
+    print(f"{len(sessions)} sessions in {elapsed:.2f}s")
+    if args.output:
+        report = {'params': vars(args), 'elapsed_s': elapsed, 'summary': summary}
+        with open(args.output, 'w', encoding='utf-8') as f: json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
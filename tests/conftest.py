@@ -0,0 +1,13 @@
+# --- ตั้งค่าก่อน import โมดูลของเกม: ไม่เปิดหน้าจอ/เสียงจริง และไม่เขียนแคช/คะแนนลงโฟลเดอร์ของผู้ใช้ ---
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path: sys.path.insert(0, ROOT)
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+_tmp = tempfile.mkdtemp(prefix='eco_hero_tests_')
+os.environ['ECO_HERO_CACHE_DIR'] = os.path.join(_tmp, 'cache')
+os.environ['ECO_HERO_DATA_DIR'] = os.path.join(_tmp, 'data')
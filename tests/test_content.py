@@ -0,0 +1,113 @@
+import json
+import os
+
+import pytest
+
+import content
+
+# --- atomic_write: ไฟล์ปลายทางเปลี่ยนเมื่อเขียนครบเท่านั้น และไม่ทิ้งไฟล์ชั่วคราวไว้ ---
+def test_atomic_write_replaces_file(tmp_path):
+    path = tmp_path / 'a.json'
+    path.write_text('old')
+    content.atomic_write(str(path), lambda f: f.write('new'), 'w')
+    assert path.read_text() == 'new' and os.listdir(tmp_path) == ['a.json']
+
+def test_atomic_write_failure_keeps_old_file_and_removes_tmp(tmp_path):
+    path = tmp_path / 'a.bin'
+    path.write_bytes(b'old')
+
+    def fail(f):
+        f.write(b'partial')
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        content.atomic_write(str(path), fail)
+    assert path.read_bytes() == b'old' and os.listdir(tmp_path) == ['a.bin']
+
+def test_atomic_write_failed_replace_removes_tmp(tmp_path):
+    target = tmp_path / 'dir'
+    target.mkdir()
+    (target / 'x').write_text('')  # os.replace ทับโฟลเดอร์ที่ไม่ว่างไม่ได้
+    with pytest.raises(OSError):
+        content.atomic_write(str(target), lambda f: f.write(b'data'))
+    assert sorted(os.listdir(tmp_path)) == ['dir']
+
+# --- ContentPack.check: ไฟล์ที่ครูแก้ผิดต้องถูกปฏิเสธตอนโหลด ไม่ใช่ไปพังกลางเกม ---
+def load_data():
+    with open(content.DEFAULT_PACK, encoding='utf-8') as f: return json.load(f)
+
+def test_default_pack_is_valid():
+    pack = content.ContentPack(load_data())
+    assert sorted(pack.categories) == sorted(content.CATEGORY_KEYS)
+    assert all(shape in pack.shapes for _, _, _, shape in pack.trash_types)
+
+def drop_category(d): d['categories'].pop()
+def extra_category(d): d['categories'].append(dict(d['categories'][0], key='glass'))
+def missing_name(d): d['categories'][0]['name'] = ''
+def missing_color(d): del d['categories'][1]['colors']['glow']
+def unknown_category(d): d['items'][0]['category'] = 'glass'
+def unknown_shape(d): d['items'][0]['shape'] = 'botle'
+def bad_color(d): d['items'][0]['color'] = [1, 2]
+def bad_op(d): d['shapes']['can'][0][0] = 'blit'
+
+@pytest.mark.parametrize("mutate", [drop_category, extra_category, missing_name, missing_color,
+                                    unknown_category, unknown_shape, bad_color, bad_op])
+def test_check_rejects(mutate):
+    data = load_data()
+    mutate(data)
+    with pytest.raises(ValueError):
+        content.ContentPack(data)
+
+def test_atlas_hash_ignores_text():
+    data = load_data()
+    before = content.ContentPack(data).atlas_hash()
+    data['name'] = 'other'
+    data['items'][0]['name'] = 'อื่น'
+    assert content.ContentPack(data).atlas_hash() == before
+    data['items'][0]['color'] = [1, 2, 3]
+    assert content.ContentPack(data).atlas_hash() != before
+
+# --- atlas: build แล้วโหลดกลับได้ภาพและ index เดิม ---
+@pytest.fixture(scope='module')
+def pygame_ready():
+    import pygame
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    return pygame
+
+def test_pack_rects_do_not_overlap():
+    sizes = [(30, 50), (70, 20), (45, 45), (100, 10), (10, 90), (45, 45)]
+    pos, height = content.pack_rects(sizes, 120)
+    rects = [(x, y, w, h) for (x, y), (w, h) in zip(pos, sizes)]
+    for i, (x, y, w, h) in enumerate(rects):
+        assert x + w <= 120 and y + h <= height
+        for bx, by, bw, bh in rects[i + 1:]:
+            assert not (x < bx + bw and bx < x + w and y < by + bh and by < y + h)
+
+def test_bake_save_load_round_trip(tmp_path, pygame_ready):
+    pygame = pygame_ready
+    pack = content.ContentPack(load_data())
+    sheet, index = content.bake_atlas(pack)
+    assert index['hash'] == pack.atlas_hash()
+    assert set(index['sprites']) == {content.sprite_key(s, c) for s, c in pack.sprites()}
+    bounds = sheet.get_rect()
+    for entry in index['sprites'].values():
+        assert bounds.contains(pygame.Rect(entry['sprite'])) and bounds.contains(pygame.Rect(entry['preview']))
+
+    png, idx = content.save_atlas(str(tmp_path), sheet, index)
+    assert (png, idx) == content.atlas_paths(str(tmp_path), pack)
+    loaded, loaded_index = content.load_atlas(pack, [str(tmp_path)])
+    assert loaded_index == json.loads(json.dumps(index))
+    assert loaded.get_size() == sheet.get_size()
+    x, y, w, h = index['sprites'][content.sprite_key(*pack.sprites()[0])]['sprite']
+    assert pygame.image.tobytes(loaded.subsurface((x, y, w, h)), 'RGBA') == \
+        pygame.image.tobytes(sheet.subsurface((x, y, w, h)), 'RGBA')
+
+def test_load_atlas_rebakes_without_saving(tmp_path, pygame_ready):
+    pack = content.ContentPack(load_data())
+    png, idx = content.atlas_paths(str(tmp_path), pack)
+    with open(idx, 'w') as f: f.write('{broken')
+    sheet, index = content.load_atlas(pack, [str(tmp_path)], save=False)
+    assert index['hash'] == pack.atlas_hash() and not os.path.exists(png)
+    content.load_atlas(pack, [str(tmp_path)])
+    assert os.path.exists(png)
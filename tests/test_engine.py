@@ -0,0 +1,144 @@
+import random
+
+import pytest
+
+from engine import (GameState, RushState, NewRound, Tick, Drop, Pick, SpatialGrid, rects_overlap,
+                    BIN_LAYOUT, ITEM_SIZE, STEP)
+from simulate import percentile, run_session
+
+# --- seed เดียวกันต้องได้ผลเหมือนกันทุกครั้ง (replay และ simulate อาศัยข้อนี้) ---
+def play_classic(seed):
+    state, trace = GameState(seed), []
+    trace.append(state.step(NewRound()))
+    bot = random.Random(1)
+    while not state.over:
+        for _ in range(bot.randrange(10, 120)): trace.append(state.step(Tick(STEP)))
+        trace.append(state.step(Drop(state.drop_rect_on(bot.randrange(len(state.bins))))))
+    return trace, state.score, state.elapsed
+
+def play_rush(seed, steps=1800):
+    state, trace = RushState(seed), []
+    state.step(NewRound())
+    for n in range(steps):
+        state.step(Tick(STEP))
+        if n % 30 == 0 and state.items:
+            item = state.items[min(state.items)]
+            picked = state.step(Pick(item.x + 1, item.y + 1))
+            if picked.item_id is not None:
+                target = state.drop_rect_on(state.bin_index_for(picked.item[1]))
+                trace.append(state.step(Drop(target, picked.item_id)))
+    items = [(i.id, i.data, round(i.x, 6), round(i.y, 6)) for i in state.items.values()]
+    return trace, state.score, state.missed, items
+
+@pytest.mark.parametrize("seed", [0, 7, 2024])
+def test_classic_is_deterministic(seed):
+    assert play_classic(seed) == play_classic(seed)
+
+def test_classic_seed_changes_items():
+    assert play_classic(1)[0] != play_classic(2)[0]
+
+@pytest.mark.parametrize("seed", [0, 7])
+def test_rush_is_deterministic(seed):
+    first = play_rush(seed)
+    assert first == play_rush(seed)
+    assert first[1] > 0
+
+def test_run_session_is_deterministic():
+    task = (42, 'error:0.2', 1.5, 0.5, 60.0)
+    assert run_session(task) == run_session(task)
+
+def test_perfect_drop_scores():
+    state = GameState(3)
+    state.step(NewRound())
+    item = state.current
+    result = state.step(Drop(state.drop_rect_on(state.bin_index_for(item[1]))))
+    assert result.outcome == 'correct' and result.item == item and state.score > 0
+
+def test_miss_outside_bins():
+    state = GameState(3)
+    state.step(NewRound())
+    assert state.step(Drop((0, 0) + ITEM_SIZE)).outcome == 'miss'
+
+# --- SpatialGrid ต้องตอบเหมือนการไล่เช็กทุกชิ้น ---
+def brute_point(rects, px, py):
+    return sorted(k for k, (x, y, w, h) in rects.items() if x <= px < x + w and y <= py < y + h)
+
+def brute_rect(rects, rect):
+    return sorted(k for k, r in rects.items() if rects_overlap(r, rect))
+
+def random_rect(rng):
+    return (rng.uniform(-50, 1000), rng.uniform(-50, 700), rng.uniform(1, 200), rng.uniform(1, 200))
+
+def test_grid_matches_brute_force():
+    rng, grid, rects = random.Random(5), SpatialGrid(96), {}
+    for key in range(200):
+        rects[key] = random_rect(rng)
+        grid.insert(key, rects[key])
+    for _ in range(300):
+        # ย้าย/ลบ/เพิ่มปนกัน แล้วถามทั้งจุดและสี่เหลี่ยม
+        key = rng.randrange(250)
+        if key in rects and rng.random() < 0.3:
+            grid.remove(key)
+            del rects[key]
+        else:
+            rects[key] = random_rect(rng)
+            grid.move(key, rects[key])
+        px, py = rng.uniform(-50, 1100), rng.uniform(-50, 800)
+        assert sorted(grid.query_point(px, py)) == brute_point(rects, px, py)
+        query = random_rect(rng)
+        assert sorted(grid.query_rect(query)) == brute_rect(rects, query)
+    assert len(grid) == len(rects)
+
+def test_grid_edges_are_exclusive():
+    grid = SpatialGrid(100)
+    grid.insert('a', (0, 0, 100, 100))
+    assert grid.query_point(99.5, 99.5) == ['a']
+    assert grid.query_point(100, 50) == []
+    assert grid.query_rect((100, 0, 10, 10)) == []
+    assert grid.query_rect((99.9, 99.9, 10, 10)) == ['a']
+
+def test_grid_float_rect_spanning_cell_boundary():
+    grid = SpatialGrid(96)
+    grid.insert(1, (95.5, 10.0, 0.75, 10.0))
+    assert grid.query_point(96.1, 15) == [1]
+    grid.move(1, (10.0, 10.0, 5.0, 5.0))
+    assert grid.query_point(96.1, 15) == [] and grid.query_point(12, 12) == [1]
+    grid.clear()
+    assert len(grid) == 0 and grid.query_point(12, 12) == []
+
+def test_bin_at_prefers_first_bin():
+    state = GameState(0)
+    x, y = BIN_LAYOUT[1][:2]
+    assert state.bin_at((x - 5, y, 20, 20)) == 1
+    assert state.bin_at((x - 300, y - 300, 10, 10)) is None
+
+def test_percentile():
+    values = list(range(101))
+    assert [percentile(values, q) for q in (0, 50, 90, 100)] == [0, 50, 90, 100]
+    assert percentile([], 50) == 0.0
+
+# --- หน้าจอโหมดเร่งด่วน: ปุ่มอื่นระหว่างลากต้องไม่ทำให้ชิ้นที่ถืออยู่ค้าง ---
+def test_rush_ignores_other_buttons_while_dragging():
+    import pygame
+    import Echo
+    Echo.init_display()
+    game = Echo.Game(Echo.SCREEN, seed=4)
+    game.new_round("rush")
+    engine = game.engine
+    a, b = sorted(engine.items.values(), key=lambda i: i.id)[:2]
+
+    def send(kind, pos, button=1):
+        game.handle_event(pygame.event.Event(kind, pos=pos, button=button))
+
+    send(pygame.MOUSEBUTTONDOWN, (a.x + 1, a.y + 1))
+    assert game.held_id == a.id
+    for button in (4, 5, 3):
+        send(pygame.MOUSEBUTTONDOWN, (b.x + 1, b.y + 1), button)
+        send(pygame.MOUSEBUTTONUP, (b.x + 1, b.y + 1), button)
+    send(pygame.MOUSEBUTTONDOWN, (b.x + 1, b.y + 1))  # คลิกซ้ายซ้ำโดยยังไม่ปล่อย
+    assert game.held_id == a.id and not b.held
+    send(pygame.MOUSEBUTTONUP, (10, 10))
+    assert game.held_id is None and not a.held
+    y = a.y
+    for _ in range(60): game.update()
+    assert a.id not in engine.items or a.y > y
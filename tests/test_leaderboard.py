@@ -0,0 +1,99 @@
+import asyncio
+import json
+import sqlite3
+
+import pytest
+
+import leaderboard
+from leaderboard import Leaderboard, LeaderboardServer
+
+# --- ดัชนีในหน่วยความจำ: เก็บคะแนนดีที่สุดคนละแถว และคะแนนเท่ากันได้อันดับเดียวกัน ---
+def test_submit_keeps_best_score_per_player():
+    board = Leaderboard()
+    assert board.submit('classic', 'a', 100)
+    assert not board.submit('classic', 'a', 80)
+    assert not board.submit('classic', 'a', 100)
+    assert board.submit('classic', 'a', 150)
+    assert board.best[('classic', 'a')] == 150
+    assert board.ranked['classic'] == [(-150, 'a')]
+    assert board.players('classic') == 1 and board.players('rush') == 0
+
+def test_rank_moves_when_score_improves():
+    board = Leaderboard()
+    for player, score in [('a', 300), ('b', 200), ('c', 100)]: board.submit('classic', player, score)
+    assert [board.rank('classic', p) for p in 'abc'] == [1, 2, 3]
+    board.submit('classic', 'c', 250)
+    assert [board.rank('classic', p) for p in 'acb'] == [1, 2, 3]
+    assert board.top('classic', 2) == [['a', 300], ['c', 250]]
+    assert board.rank('classic', 'nobody') is None and board.rank('rush', 'a') is None
+
+def test_ties_share_rank_and_list_by_name():
+    board = Leaderboard()
+    for player, score in [('dan', 200), ('bee', 300), ('amy', 200), ('cat', 300), ('eve', 100)]:
+        board.submit('classic', player, score)
+    assert board.top('classic') == [['bee', 300], ['cat', 300], ['amy', 200], ['dan', 200], ['eve', 100]]
+    assert [board.rank('classic', p) for p in ('bee', 'cat', 'amy', 'dan', 'eve')] == [1, 1, 3, 3, 5]
+
+def test_modes_are_independent():
+    board = Leaderboard()
+    board.submit('classic', 'a', 500)
+    board.submit('rush', 'a', 50)
+    board.submit('rush', 'b', 60)
+    assert board.rank('classic', 'a') == 1 and board.rank('rush', 'a') == 2
+
+# --- เซิร์ฟเวอร์: ตรวจคำขอ รวมคะแนนก่อนเขียน และโหลดกลับจากฐานข้อมูล ---
+def request(server, **req):
+    return server.dispatch(json.dumps(req).encode())
+
+@pytest.mark.parametrize("score", [-1, leaderboard.MAX_SCORE + 1, 1.5, True, "10", None, 10 ** 30])
+def test_dispatch_rejects_bad_scores(tmp_path, score):
+    server = LeaderboardServer(str(tmp_path / 'lb.sqlite3'))
+    reply = request(server, op='submit', player='a', mode='classic', score=score)
+    assert reply['ok'] is False and not server.pending
+    server.db.close()
+
+def test_dispatch_rejects_bad_requests(tmp_path):
+    server = LeaderboardServer(str(tmp_path / 'lb.sqlite3'))
+    assert not server.dispatch(b'{not json')['ok']
+    assert not request(server, op='submit', player='a', mode='tetris', score=1)['ok']
+    assert not request(server, op='delete')['ok']
+    assert not request(server, op='submit', mode='classic', score=1)['ok']
+    server.db.close()
+
+def test_flush_batches_and_reloads(tmp_path):
+    path = str(tmp_path / 'lb.sqlite3')
+
+    async def run():
+        server = LeaderboardServer(path)
+        for score in (100, 300, 200):
+            reply = request(server, op='submit', player='a', mode='classic', score=score)
+        assert reply == {'ok': True, 'rank': 1, 'players': 1, 'best': 300}
+        request(server, op='submit', player='b', mode='rush', score=40)
+        assert server.pending == {('classic', 'a'): 300, ('rush', 'b'): 40}
+        await server.flush()
+        assert not server.pending and server.stats['writes'] == 2 and server.stats['flushes'] == 1
+        server.db.close()
+
+    asyncio.run(run())
+    reloaded = LeaderboardServer(path)
+    assert reloaded.board.best == {('classic', 'a'): 300, ('rush', 'b'): 40}
+    reloaded.db.close()
+
+def test_failed_flush_requeues_batch(tmp_path):
+    async def run():
+        server = LeaderboardServer(str(tmp_path / 'lb.sqlite3'))
+        request(server, op='submit', player='a', mode='classic', score=100)
+
+        def broken(rows): raise sqlite3.OperationalError("database is locked")
+        server.write = broken
+        await server.flush()
+        assert server.pending == {('classic', 'a'): 100} and server.stats['errors'] == 1
+        # คะแนนใหม่ที่เข้ามาระหว่างนั้นยังอยู่ และเขียนได้เมื่อฐานข้อมูลกลับมา
+        request(server, op='submit', player='a', mode='classic', score=120)
+        del server.write
+        await server.flush()
+        assert not server.pending
+        assert server.db.execute("SELECT score FROM leaderboard").fetchall() == [(120,)]
+        server.db.close()
+
+    asyncio.run(run())
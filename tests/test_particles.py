@@ -0,0 +1,60 @@
+import pytest
+
+import Echo
+
+P = Echo.ParticleSystem
+
+@pytest.fixture(params=['numpy', 'array'])
+def system(request, monkeypatch):
+    if request.param == 'numpy':
+        if Echo.np is None: pytest.skip("numpy not installed")
+    else:
+        monkeypatch.setattr(Echo, 'np', None)
+    return lambda capacity=256: P(capacity)
+
+def tag(ps, lives):
+    # ให้แต่ละอนุภาคมี id ใน X (ไม่เคลื่อนในแนวนอน) และอายุตามที่กำหนด
+    d = ps.data
+    for i, life in enumerate(lives):
+        d[P.X][i], d[P.VX][i], d[P.LIFE][i] = float(i), 0.0, float(life)
+
+def alive(ps):
+    return sorted(int(ps.data[P.X][i]) for i in range(ps.count))
+
+def test_swap_remove_keeps_every_survivor(system):
+    ps = system()
+    ps.emit(0, 0, (255, 0, 0), 12)
+    # อนุภาคที่อายุ <= 8 ตายใน update ครั้งนี้: ทั้งกลางอาร์เรย์และท้ายอาร์เรย์
+    lives = [255, 8, 255, 4, 255, 255, 8, 255, 255, 8, 255, 1]
+    tag(ps, lives)
+    ps.update()
+    expected = [i for i, life in enumerate(lives) if life > 8]
+    assert len(ps) == len(expected) and alive(ps) == expected
+    assert all(ps.data[P.LIFE][i] > 0 for i in range(ps.count))
+
+def test_all_dead_and_none_dead(system):
+    ps = system()
+    ps.emit(0, 0, (0, 255, 0), 5)
+    tag(ps, [255] * 5)
+    ps.update()
+    assert alive(ps) == [0, 1, 2, 3, 4]
+    tag(ps, [8] * 5)
+    ps.update()
+    assert len(ps) == 0
+
+def test_particles_expire_after_their_life(system):
+    ps = system()
+    ps.emit(100, 100, (0, 0, 255), 25)
+    for _ in range(255 // P.ALPHA_STEP): ps.update()
+    assert len(ps) == 25
+    ps.update()
+    assert len(ps) == 0
+
+def test_emit_grows_capacity_and_keeps_data(system):
+    ps = system(capacity=4)
+    ps.emit(0, 0, (1, 2, 3), 3)
+    tag(ps, [200, 201, 202])
+    ps.emit(5, 5, (4, 5, 6), 10)
+    assert ps.capacity >= 13 and len(ps) == 13
+    assert [ps.data[P.LIFE][i] for i in range(3)] == [200, 201, 202]
+    assert ps.palette == [(1, 2, 3), (4, 5, 6)] and ps.data[P.COLOR][12] == 1
@@ -0,0 +1,69 @@
+import Echo
+from Echo import QualityGovernor as G
+
+TOP = len(Echo.QUALITY_TIERS) - 1
+
+def feed(governor, ms, frames):
+    # คืนค่ารายการ (เฟรมที่, ระดับใหม่) ที่ governor สั่งเปลี่ยน
+    changes = []
+    for i in range(frames):
+        tier = governor.observe(ms)
+        if tier is not None: changes.append((i, tier))
+    return changes
+
+def test_ignores_cooldown_frames():
+    g = G(TOP)
+    assert feed(g, 100.0, G.COOLDOWN) == [] and not g.samples
+
+def test_steps_down_once_per_window():
+    g = G(TOP)  # งบ 16.7 ms
+    changes = feed(g, 30.0, (G.COOLDOWN + G.DOWN_WINDOW) * 3)
+    first = G.COOLDOWN + G.DOWN_WINDOW - 1
+    assert changes[0] == (first, TOP - 1)
+    # หลังเปลี่ยนต้องรอ cooldown + หน้าต่างใหม่ครบก่อนลดอีกขั้น และไม่ต่ำกว่า 0
+    assert [t for _, t in changes] == list(range(TOP - 1, -1, -1))
+    assert changes[1][0] - changes[0][0] == G.COOLDOWN + G.DOWN_WINDOW
+    assert feed(g, 30.0, 1000) == [] and g.tier == 0
+
+def test_band_between_thresholds_holds_tier():
+    g = G(1)
+    budget = g.budget_ms
+    assert feed(g, budget * 0.7, 5000) == [] and g.tier == 1
+
+def test_occasional_spikes_do_not_step_down():
+    g = G(TOP)
+    # 1 ใน 20 เฟรมช้ามาก: p90 ยังอยู่ในงบ
+    changes = []
+    for i in range(2000):
+        tier = g.observe(50.0 if i % 20 == 0 else 8.0)
+        if tier is not None: changes.append(tier)
+    assert changes == []
+
+def test_steps_up_after_quiet_window_and_backs_off_after_failure():
+    g = G(0)
+    fast = g.budget_ms * 0.3
+    changes = feed(g, fast, G.COOLDOWN + G.UP_WINDOW)
+    assert changes == [(G.COOLDOWN + G.UP_WINDOW - 1, 1)]
+    # ระดับ 1 ช้าเกินไป: ลดกลับลง แล้วรอบหน้าต้องเงียบนานขึ้นเท่าตัวก่อนลองระดับ 1 อีก
+    assert feed(g, 30.0, G.COOLDOWN + G.DOWN_WINDOW)[-1][1] == 0
+    assert g.failures[1] == 1
+    assert feed(g, fast, G.COOLDOWN + G.UP_WINDOW * 2 - 1) == []
+    assert g.observe(fast) == 1
+
+def test_quiet_streak_resets_on_slow_frame():
+    g = G(0)
+    feed(g, 1.0, G.COOLDOWN + G.UP_WINDOW - 1)
+    assert g.observe(g.budget_ms) is None and g.quiet == 0
+    assert feed(g, 1.0, G.UP_WINDOW - 1) == [] and g.observe(1.0) == 1
+
+def test_budget_follows_target_fps():
+    assert G(0, target_fps=30).budget_ms == 1000 / 30
+    assert G(0, target_fps=0).budget_ms == 1000 / 60
+
+def test_tier_round_trips_through_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('ECO_HERO_CACHE_DIR', str(tmp_path))
+    assert Echo.load_quality_tier() == TOP
+    Echo.save_quality_tier(0)
+    assert Echo.load_quality_tier() == 0
+    (tmp_path / 'eco_hero' / 'quality.json').write_text('{"tier": "ultra"}')
+    assert Echo.load_quality_tier(default=1) == 1
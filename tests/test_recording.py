@@ -0,0 +1,96 @@
+import random
+import types
+
+import pygame
+import pytest
+
+import Echo
+import replay
+
+@pytest.fixture(scope='module', autouse=True)
+def display():
+    Echo.init_display()
+    yield
+    pygame.display.quit()
+
+def motion(pos):
+    return pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0))
+
+def click(kind, pos, button=1):
+    return pygame.event.Event(kind, pos=pos, button=button)
+
+# --- รูปแบบไฟล์: สิ่งที่ Recorder เขียน Recording.load ต้องอ่านกลับได้ครบ ---
+def test_events_round_trip(tmp_path):
+    path = str(tmp_path / 'a.ecorec')
+    events = [(0, motion((10, 20))), (3, click(pygame.MOUSEBUTTONDOWN, (500, 430))),
+              (4, click(pygame.MOUSEBUTTONUP, (500, 430), button=3)), (9, motion((-40000, 40000))),
+              (12, pygame.event.Event(pygame.QUIT)), (12, pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a))]
+    rec = Echo.Recorder(path, seed=2**40 + 5)
+    for step, event in events: rec.record(step, event)
+    rec.close(types.SimpleNamespace(steps=15, score=120, game_state="GAMEOVER"))
+
+    loaded = Echo.Recording.load(path)
+    assert loaded.seed == 2**40 + 5 and loaded.complete
+    assert (loaded.end_step, loaded.score, loaded.state) == (15, 120, "GAMEOVER")
+    # KEYDOWN ไม่ถูกบันทึก | พิกัดเกินช่วง int16 ถูกตัดให้อยู่ในช่วง
+    got = [(step, e.type, getattr(e, 'pos', None), getattr(e, 'button', None)) for step, _, e in loaded.events]
+    assert got == [(0, pygame.MOUSEMOTION, (10, 20), None), (3, pygame.MOUSEBUTTONDOWN, (500, 430), 1),
+                   (4, pygame.MOUSEBUTTONUP, (500, 430), 3), (9, pygame.MOUSEMOTION, (-32768, 32767), None),
+                   (12, pygame.QUIT, None, None)]
+    assert [ms for _, ms, _ in loaded.events] == sorted(ms for _, ms, _ in loaded.events)
+
+def test_truncated_recording_is_incomplete(tmp_path):
+    path = tmp_path / 'b.ecorec'
+    rec = Echo.Recorder(str(path), seed=1)
+    rec.record(2, motion((1, 2)))
+    rec.record(5, click(pygame.MOUSEBUTTONDOWN, (3, 4)))
+    rec.close(types.SimpleNamespace(steps=9, score=0, game_state="START"))
+    # ตัดกลาง record ท้ายไฟล์ (เหมือนเกมถูกปิดทิ้งระหว่างเขียน)
+    path.write_bytes(path.read_bytes()[:-Echo.RECORD_END.size - 3])
+    loaded = Echo.Recording.load(str(path))
+    assert not loaded.complete and len(loaded.events) == 2
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'c.ecorec'
+    path.write_bytes(b'PNG\x00' + bytes(20))
+    with pytest.raises(ValueError):
+        Echo.Recording.load(str(path))
+
+# --- เล่นเกมจริงพร้อมบันทึก แล้วเล่นซ้ำแบบไม่วาดภาพ ต้องได้คะแนนและหน้าจอตอนจบเหมือนเดิม ---
+def test_recorded_game_replays_identically(tmp_path):
+    path = str(tmp_path / 'game.ecorec')
+    random.seed(11)  # เหมือน replay.replay
+    game = Echo.Game(Echo.SCREEN, seed=11)
+    game.recorder = Echo.Recorder(path, game.seed)
+
+    def send(event):
+        game.recorder.record(game.steps, event)
+        game.handle_event(event)
+
+    def advance(steps):
+        for _ in range(steps): game.update()
+
+    start = game.btn_start.center
+    send(click(pygame.MOUSEBUTTONDOWN, start))
+    send(click(pygame.MOUSEBUTTONUP, start))
+    advance(5)
+    # ลากขยะลงถังที่ถูก ยกเว้นทุกชิ้นที่ 4 วางถังถัดไป (ผิด)
+    assert game.game_state == "PLAYING"
+    for i in range(12):
+        item = game.trash.rect.center
+        correct = game.engine.bin_index_for(game.engine.current[1])
+        target = Echo.BIN_LAYOUT[(correct + (i % 4 == 3)) % 4]
+        drop = (target[0] + Echo.BIN_SIZE[0] // 2, target[1] + Echo.BIN_SIZE[1] // 2)
+        send(click(pygame.MOUSEBUTTONDOWN, item))
+        advance(2)
+        send(motion(drop))
+        advance(2)
+        send(click(pygame.MOUSEBUTTONUP, drop))
+        advance(30)
+    game.recorder.close(game)
+
+    assert game.game_state == "PLAYING" and game.score > 0
+
+    result = replay.replay(path, render=False)
+    assert result['status'] == 'OK'
+    assert (result['score'], result['state']) == (game.score, game.game_state)
@@ -0,0 +1,29 @@
+import pygame
+import pytest
+
+import Echo
+
+@pytest.fixture(scope='module', autouse=True)
+def display():
+    Echo.init_display()
+    yield
+    pygame.display.quit()
+
+def test_counts_full_and_partial_frames():
+    r = Echo.DirtyRenderer((1000, 500))
+    r.present()                      # เฟรมแรกส่งทั้งจอ
+    r.add((10, 10, 20, 20))
+    r.present()
+    r.present()                      # ยังต้องลบตำแหน่งเดิมของเฟรมก่อน
+    r.add((0, 0, 800, 400))          # เกิน full_ratio ของพื้นที่จอ
+    r.present()
+    r.invalidate()
+    r.add((10, 10, 20, 20))
+    r.present()
+    assert r.stats() == {'full_frames': 3, 'partial_frames': 2, 'partial_ratio': 0.4}
+
+def test_disabled_renderer_counts_nothing():
+    r = Echo.DirtyRenderer((100, 100), enabled=False)
+    r.add((0, 0, 10, 10))
+    r.present()
+    assert r.rects == [] and r.stats() == {'full_frames': 0, 'partial_frames': 0, 'partial_ratio': 0.0}
@@ -0,0 +1,75 @@
+import sqlite3
+
+import pytest
+
+import scores
+from scores import ScoreStore, SessionStats
+
+def session(mode, score, records, missed=0):
+    stats = SessionStats(mode, seed=1)
+    for outcome, category, reaction in records: stats.record(outcome, category, reaction)
+    return stats.finish(score, 60.0, missed)
+
+@pytest.fixture
+def db(tmp_path):
+    db = scores.connect(str(tmp_path / 'scores.sqlite3'))
+    yield db
+    db.close()
+
+def test_session_stats_totals():
+    stats = session('classic', 40, [('correct', 'organic', 1.0), ('wrong', 'organic', 2.0), ('correct', 'recycle', 0.5)])
+    assert (stats.items_sorted, stats.mistakes) == (2, 1)
+    assert stats.reaction_mean == pytest.approx(3.5 / 3)
+    assert SessionStats('classic').reaction_mean is None
+
+# --- category_totals ต้องเท่ากับผลรวมของ session_categories เสมอ (อัปเดตใน transaction เดียวกัน) ---
+def test_category_totals_upsert(db):
+    scores.save_session(db, session('classic', 40, [('correct', 'organic', 1.0), ('wrong', 'hazardous', 3.0)]))
+    scores.save_session(db, session('rush', 60, [('correct', 'organic', 0.5), ('correct', 'organic', 0.5),
+                                                 ('wrong', 'organic', 1.0)]))
+    totals = {row[0]: row[1:] for row in db.execute("SELECT * FROM category_totals")}
+    assert totals == {'organic': (3, 1, 3.0, 4), 'hazardous': (0, 1, 3.0, 1)}
+    summed = {row[0]: row[1:] for row in db.execute(
+        "SELECT category, SUM(sorted), SUM(mistakes), SUM(reaction_sum), SUM(reaction_count)"
+        " FROM session_categories GROUP BY category")}
+    assert summed == totals
+
+def test_failed_session_leaves_totals_untouched(db):
+    scores.save_session(db, session('classic', 20, [('correct', 'organic', 1.0)]))
+    bad = session('classic', 20, [('correct', 'organic', 1.0)])
+    bad.categories[None] = [1, 0, 1.0, 1]  # category NOT NULL: แถวนี้ต้องทำให้ทั้ง transaction ย้อนกลับ
+    with pytest.raises(sqlite3.IntegrityError):
+        scores.save_session(db, bad)
+    assert db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 1
+    assert db.execute("SELECT sorted FROM category_totals WHERE category = 'organic'").fetchone()[0] == 1
+
+def test_queries(db):
+    scores.save_session(db, session('classic', 40, [('correct', 'organic', 1.0), ('wrong', 'recycle', 1.0)]))
+    scores.save_session(db, session('classic', 90, [('correct', 'recycle', 1.0)]))
+    scores.save_session(db, session('rush', 70, [('correct', 'general', 1.0)]))
+    assert scores.high_scores(db) == {'classic': 90, 'rush': 70}
+    assert [row[0] for row in scores.top_scores(db, 2)] == [90, 70]
+    assert [row[0] for row in scores.top_scores(db, 5, 'classic')] == [90, 40]
+    worst = scores.worst_categories(db, 1)[0]
+    assert worst[0] == 'recycle' and worst[3] == pytest.approx(0.5)
+
+# --- ScoreStore: เขียนจากเธรดเบื้องหลัง ---
+def test_store_writes_in_background(tmp_path):
+    path = str(tmp_path / 'scores.sqlite3')
+    store = ScoreStore(path)
+    store.submit(session('classic', 40, [('correct', 'organic', 1.0)]))
+    store.submit(session('classic', 80, [('correct', 'organic', 1.0)]))
+    store.close()
+    assert store.error is None and store.high_score('classic') == 80 and store.high_score('rush') == 0
+    reopened = ScoreStore(path)
+    reopened.close()
+    assert reopened.best == {'classic': 80}
+
+def test_store_without_data_dir_disables_persistence(tmp_path, monkeypatch):
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    monkeypatch.setenv('ECO_HERO_DATA_DIR', str(blocker))  # โฟลเดอร์ข้อมูลสร้างไม่ได้ (เป็นไฟล์)
+    store = ScoreStore()
+    store.submit(session('classic', 40, []))
+    store.close()
+    assert isinstance(store.error, OSError) and store.high_score('classic') == 0